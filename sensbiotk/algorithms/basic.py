@@ -20,7 +20,7 @@ Basic algo for sensors data
 """
 
 import numpy as np
-from scipy import signal
+from sensbiotk import precision
 
 # disabling pylint errors 'E1101' no-member, false positive from pylint
 # pylint:disable=I0011,E1101
@@ -51,6 +51,7 @@ def find_peaks(sig_raw, min_peak_height, min_peak_distance, max_peak_distance):
      detected peaks locations
 
     """
+    from scipy import signal
 
     # find extremas location
     loc_extrema = signal.argrelextrema(sig_raw, np.greater)[0]
@@ -185,7 +186,7 @@ def cut_signal(sig_time, sig_raw, time0, timef):
     return [sig_time[tc_i:tc_f, :], sig_raw[tc_i:tc_f, 0:3]]
 
 
-def lowpass_filter(sig_raw, cuttoff_freq, samp_freq):
+def lowpass_filter(sig_raw, cuttoff_freq, samp_freq, dtype=None):
     """ Low pass filter (butterworth order 6) on a signal
 
     Parameters :
@@ -196,20 +197,25 @@ def lowpass_filter(sig_raw, cuttoff_freq, samp_freq):
      cut-off frequency
     samp_freq: float
      sampling frequency
+    dtype : numpy dtype
+     dtype of the filtered signal, None for the package dtype
+     (see sensbiotk.precision), the filter runs in float64
 
     Returns
     -------
     sig_filt : numpy array of float of dim N
     signal filtered
     """
+    from scipy import signal
     norm_pass = cuttoff_freq / (samp_freq / 2)
     (param_b, param_a) = signal.butter(6, norm_pass)
     sig_filt = signal.filtfilt(param_b, param_a, sig_raw)
+    sig_filt = precision.asfloat(sig_filt, dtype)
 
     return sig_filt
 
 
-def lowpass_filter2(sig_raw, cuttoff_freq, samp_freq):
+def lowpass_filter2(sig_raw, cuttoff_freq, samp_freq, dtype=None):
     """ Simple low pass filter on a signal
 
     Parameters :
@@ -220,6 +226,8 @@ def lowpass_filter2(sig_raw, cuttoff_freq, samp_freq):
      cut-off frequency
     samp_freq: float
      sampling frequency
+    dtype : numpy dtype
+     dtype of the filtered signal, None for the package dtype
 
     Returns
     -------
@@ -232,7 +240,7 @@ def lowpass_filter2(sig_raw, cuttoff_freq, samp_freq):
 
     print "ALPHA", alpha
 
-    sig_filt = np.zeros(len(sig_raw))
+    sig_filt = np.zeros(len(sig_raw), dtype=precision.get_dtype(dtype))
     sig_filt[0] = sig_raw[0]
     for i in range(1, len(sig_raw)):
         sig_filt[i] = sig_filt[i-1] + alpha * (sig_raw[i] - sig_filt[i-1])
@@ -273,39 +281,123 @@ def window_mean(sig_time, sig_raw, time0, timef):
     return sig_mean
 
 
-def moving_average(sig_raw, fen):
+def moving_average(sig_raw, fen, dtype=None):
     """ Moving Average on a signal
 
+    sig_filt[i] is the mean of sig_raw[i:i + fen], except for the first
+    fen and the last fen samples which are kept unfiltered. The window
+    sums are differences of cumulative sums (O(N) whatever fen).
+
     Parameters :
     ------------
-    sig_raw : numpy array of float of dim N
-    signal to be filtered
+    sig_raw : numpy array of float of dim N or (N, C)
+    signal to be filtered, the C channels are filtered at once
     fen  : size index  of the windows for the moving average
+    dtype : numpy dtype
+    dtype of the filtered signal, None for the package dtype
 
     Returns
     -------
     sig_filt : numpy array of float
     signal filtered
     """
-    lensig = len(sig_raw)
-    sig_filt = np.zeros(lensig)
+    stream = MovingAverage(fen, dtype)
+    sig_filt = stream.update(sig_raw)
+    return np.concatenate([sig_filt, stream.finish()])
 
-    for i in range(lensig-fen):
-        moy = 0.0
-        for j in range(i, i + fen):
-            moy = moy + sig_raw[j]
-        sig_filt[i] = moy / fen
 
-    for i in range(0, fen):
-        sig_filt[i] = sig_raw[i]
-    for i in range(lensig-fen, lensig):
-        sig_filt[i] = sig_raw[i]
+class MovingAverage(object):
+    """ Moving Average on a signal received by chunks
 
-   # return sig_filt[fen-1:-fen+1]
-    return sig_filt
+    The concatenation of the update outputs and of the finish output is
+    moving_average(signal, fen, dtype). Each update returns the samples
+    that are known, the last fen samples received are kept until the
+    next update.
 
+    Parameters :
+    ------------
+    fen  : size index  of the windows for the moving average
+    dtype : numpy dtype
+    dtype of the filtered signal, None for the package dtype
+
+    Examples
+    --------
+    >>> stream = MovingAverage(30)
+    >>> acc_filt = [stream.update(acc) for acc in chunks]
+    >>> acc_filt.append(stream.finish())
+    """
 
-def moving_average2(sig_raw, fen):
+    def __init__(self, fen, dtype=None):
+        self.fen = fen
+        self.dtype = precision.get_dtype(dtype)
+        self.reset()
+
+    def reset(self):
+        """ Forget the samples received
+        """
+        # Number of samples received and returned
+        self.count = 0
+        self.count_out = 0
+        # Samples count_out..count, cumulative sum at count_out of the
+        # samples minus the first one (float64)
+        self.buffer = None
+        self.offset = None
+        self.cumsum = None
+
+    def update(self, sig_raw):
+        """ Filter a new chunk of the signal
+
+        Parameters :
+        ------------
+        sig_raw : numpy array of float of dim N or (N, C)
+        new samples
+
+        Returns
+        -------
+        sig_filt : numpy array of float
+        filtered samples count_out.. of the signal, possibly none
+        """
+        sig_raw = np.asarray(sig_raw, dtype=float)
+        if len(sig_raw) == 0:
+            return sig_raw.astype(self.dtype)
+        if self.buffer is None:
+            self.buffer = sig_raw[0:0]
+            self.offset = sig_raw[0:1]
+            self.cumsum = np.zeros((1,) + sig_raw.shape[1:])
+        data = np.concatenate([self.buffer, sig_raw])
+        start = self.count_out
+        self.count = self.count + len(sig_raw)
+        # sig_filt[i] is final once sig_raw[i + fen] is known
+        stop = max(min(self.count, self.fen), self.count - self.fen)
+
+        sig_filt = np.array(data[0:stop - start])
+        cumsum = np.cumsum(np.concatenate([self.cumsum, data - self.offset]),
+                           axis=0)
+        first = max(start, self.fen)
+        if stop > first:
+            index = np.arange(first - start, stop - start)
+            sig_filt[first - start:] = self.offset + \
+                (cumsum[index + self.fen] - cumsum[index]) / self.fen
+        self.cumsum = cumsum[stop - start:stop - start + 1]
+        self.buffer = data[stop - start:]
+        self.count_out = stop
+        return sig_filt.astype(self.dtype)
+
+    def finish(self):
+        """ Last samples of the signal (unfiltered) and reset
+
+        Returns
+        -------
+        sig_filt : numpy array of float
+        samples count_out.. of the signal
+        """
+        sig_filt = np.zeros(0, self.dtype) if self.buffer is None \
+            else self.buffer.astype(self.dtype)
+        self.reset()
+        return sig_filt
+
+
+def moving_average2(sig_raw, fen, dtype=None):
     """ Moving Average using convolution on a signal
 
     Parameters :
@@ -313,14 +405,18 @@ def moving_average2(sig_raw, fen):
     sig_raw : numpy array of float of dim N
     signal to be filtered
     fen  : size index  of the windows for the moving average
+    dtype : numpy dtype
+    dtype of the filtered signal, None for the package dtype
 
     Returns
     -------
     sig_filt : numpy array of float
     signal filtered
     """
-    win = np.ones(fen, 'd')
-    sig_filt = np.convolve(win/win.sum(), sig_raw, mode='same')
+    dtype = precision.get_dtype(dtype)
+    win = np.ones(fen, dtype)
+    sig_filt = np.convolve(win/win.sum(), precision.asfloat(sig_raw, dtype),
+                           mode='same')
 
    # return sig_filt[fen-1:-fen+1]
     return sig_filt
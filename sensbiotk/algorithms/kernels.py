@@ -0,0 +1,405 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Per-sample kernels of the sequential filters
+
+The loops over the samples of the AHRS run_batch functions are written
+once here, with scalar code only, so that they are run:
+
+- by the 'numpy' backend: as plain Python on lists of floats,
+- by the 'numba' backend: compiled by numba.njit on numpy arrays (at
+  their first call in the process).
+
+The backend is $SENSBIOTK_BACKEND (default 'auto': 'numba' if numba
+is installed, else 'numpy'), it is changed by set_backend or for a
+block of code by:
+
+>>> with backend("numpy"):
+...     quaternion = madgwick_ahrs.run_batch(data)
+
+Both backends give the same results up to the floating point rounding.
+"""
+
+import os
+import math
+import pkgutil
+import contextlib
+import numpy as np
+
+# pylint:disable= I0011, E1101, C0103
+# E1101 no-member false positif
+# C0103 invalid variable name, for the quaternion components q0..q3
+
+BACKENDS = ["auto", "numba", "numpy"]
+BACKEND = {'name': os.environ.get("SENSBIOTK_BACKEND", "auto")}
+# numba is only imported at the first compilation (slow import)
+HAS_NUMBA = pkgutil.find_loader("numba") is not None
+# numba compiled kernels
+_COMPILED = {}
+
+
+def get_backend():
+    """ Backend running the kernels
+
+    Returns
+    -------
+    name : str
+         'numba' or 'numpy'
+    """
+    name = BACKEND['name']
+    if name not in BACKENDS:
+        raise ValueError("Unknown kernels backend %s" % name)
+    if name == "auto":
+        name = "numba" if HAS_NUMBA else "numpy"
+    elif name == "numba" and not HAS_NUMBA:
+        raise ImportError("numba backend requested but numba is missing")
+    return name
+
+
+def set_backend(name):
+    """ Set the kernels backend
+
+    Parameters
+    ----------
+    name : str
+         'auto', 'numba' or 'numpy'
+    """
+    previous = BACKEND['name']
+    BACKEND['name'] = name
+    try:
+        get_backend()
+    except (ValueError, ImportError):
+        BACKEND['name'] = previous
+        raise
+    return
+
+
+@contextlib.contextmanager
+def backend(name):
+    """ Context setting the kernels backend
+
+    Parameters
+    ----------
+    name : str
+         'auto', 'numba' or 'numpy'
+    """
+    previous = BACKEND['name']
+    set_backend(name)
+    try:
+        yield get_backend()
+    finally:
+        BACKEND['name'] = previous
+
+
+def jit(kernel):
+    """ Kernel run by the current backend
+
+    Parameters
+    ----------
+    kernel : function
+         one of the kernels of this module
+
+    Returns
+    -------
+    kernel : function
+         the numba compiled kernel or the kernel itself
+    """
+    if get_backend() != "numba":
+        return kernel
+    if kernel not in _COMPILED:
+        import numba
+        _COMPILED[kernel] = numba.njit(nogil=True)(kernel)
+    return _COMPILED[kernel]
+
+
+def run(kernel, data, state, params, ncols):
+    """ Runs a per-sample kernel over a record
+
+    Parameters
+    ----------
+    kernel : function
+         kernel(data, state, params, out) of this module
+    data : numpy array
+         (N, C) samples
+    state : sequence of float
+         initial filter state
+    params : tuple of float
+         filter parameters
+    ncols : int
+         number of output values per sample
+
+    Returns
+    -------
+    [out, state] : numpy array, list of float
+         (N, ncols) output of each sample and final filter state
+    """
+    params = tuple([float(val) for val in params])
+    if get_backend() == "numba":
+        rows = np.ascontiguousarray(data, dtype=np.float64)
+        out = np.empty((len(rows), ncols))
+        state = np.array(state, dtype=np.float64)
+        jit(kernel)(rows, state, params, out)
+        return [out, state.tolist()]
+    rows = np.asarray(data, dtype=np.float64).tolist()
+    out = [[0.0] * ncols for _ in rows]
+    state = [float(val) for val in state]
+    kernel(rows, state, params, out)
+    return [np.array(out, dtype=np.float64).reshape(-1, ncols), state]
+
+
+def madgwick(data, state, params, out):
+    """ Madgwick filter, see madgwick_ahrs.update
+
+    data : (N, 9) samples, state : quaternion [q0, q1, q2, q3],
+    params : (beta, sample_period), out : (N, 4) quaternions
+    """
+    [beta, sample_period] = params
+    [q0, q1, q2, q3] = [state[0], state[1], state[2], state[3]]
+    for i in range(len(data)):
+        row = data[i]
+        [ax, ay, az] = [row[0], row[1], row[2]]
+        [mx, my, mz] = [row[3], row[4], row[5]]
+        [gx, gy, gz] = [row[6], row[7], row[8]]
+        # Normalise accelerometer and magnetometer measurements
+        norm_accelero = math.sqrt(ax*ax + ay*ay + az*az)
+        if norm_accelero != 0:
+            ax /= norm_accelero
+            ay /= norm_accelero
+            az /= norm_accelero
+        norm_magneto = math.sqrt(mx*mx + my*my + mz*mz)
+        if norm_magneto != 0:
+            mx /= norm_magneto
+            my /= norm_magneto
+            mz /= norm_magneto
+        # Reference direction of Earth's magnetic field
+        # h = q * (0, m) * conj(q)
+        p0 = mx*q1 + my*q2 + mz*q3
+        p1 = mx*q0 - my*q3 + mz*q2
+        p2 = my*q0 - mz*q1 + mx*q3
+        p3 = mz*q0 - mx*q2 + my*q1
+        h1 = q0*p1 + q1*p0 + q2*p3 - q3*p2
+        h2 = q0*p2 + q2*p0 + q3*p1 - q1*p3
+        b1 = math.sqrt(h1*h1 + h2*h2)
+        b3 = q0*p3 + q3*p0 + q1*p2 - q2*p1
+        # Gradient decent algorithm corrective step
+        [q0q1, q0q2, q0q3] = [q0*q1, q0*q2, q0*q3]
+        [q1q1, q1q3, q2q2, q2q3] = [q1*q1, q1*q3, q2*q2, q2*q3]
+        f0 = 2*(q1q3 - q0q2) - ax
+        f1 = 2*(q0q1 + q2q3) - ay
+        f2 = 2*(0.5 - q1q1 - q2q2) - az
+        f3 = 2*b1*(0.5 - q2q2 - q3*q3) + 2*b3*(q1q3 - q0q2) - mx
+        f4 = 2*b1*(q1*q2 - q0q3) + 2*b3*(q0q1 + q2q3) - my
+        f5 = 2*b1*(q0q2 + q1q3) + 2*b3*(0.5 - q1q1 - q2q2) - mz
+        # step = J' F
+        [b1f3, b1f4, b1f5] = [2*b1*f3, 2*b1*f4, 2*b1*f5]
+        [b3f3, b3f4, b3f5] = [2*b3*f3, 2*b3*f4, 2*b3*f5]
+        s0 = 2*(q1*f1 - q2*f0) - q2*b3f3 + q1*b3f4 - q3*b1f4 + q2*b1f5
+        s1 = 2*(q3*f0 + q0*f1) - 4*q1*f2 + q3*b3f3 + q2*b1f4 + q0*b3f4 + \
+            q3*b1f5 - 2*q1*b3f5
+        s2 = 2*(q3*f1 - q0*f0) - 4*q2*f2 + 2*q2*b1f3 - q0*b3f3 + \
+            q1*b1f4 + q3*b3f4 + q0*b1f5 - 2*q2*b3f5
+        s3 = 2*(q1*f0 + q2*f1) - 2*q3*b1f3 + q1*b3f3 - q0*b1f4 + \
+            q2*b3f4 + q1*b1f5
+        # normalise step magnitude
+        norm_step = math.sqrt(s0*s0 + s1*s1 + s2*s2 + s3*s3)
+        # Rate of change of quaternion q * (0, gyro) / 2 - beta * step
+        d0 = 0.5*(-q1*gx - q2*gy - q3*gz)
+        d1 = 0.5*(q0*gx + q2*gz - q3*gy)
+        d2 = 0.5*(q0*gy + q3*gx - q1*gz)
+        d3 = 0.5*(q0*gz + q1*gy - q2*gx)
+        if norm_step != 0:
+            # no correction when the measurements fit q exactly
+            d0 -= beta*s0/norm_step
+            d1 -= beta*s1/norm_step
+            d2 -= beta*s2/norm_step
+            d3 -= beta*s3/norm_step
+        # Integrate to yield quaternion
+        q0 += d0*sample_period
+        q1 += d1*sample_period
+        q2 += d2*sample_period
+        q3 += d3*sample_period
+        norm_q = math.sqrt(q0*q0 + q1*q1 + q2*q2 + q3*q3)
+        q0 /= norm_q
+        q1 /= norm_q
+        q2 /= norm_q
+        q3 /= norm_q
+        row = out[i]
+        [row[0], row[1], row[2], row[3]] = [q0, q1, q2, q3]
+    [state[0], state[1], state[2], state[3]] = [q0, q1, q2, q3]
+
+
+def mahony(data, state, params, out):
+    """ Mahony filter, see mahony_ahrs.update
+
+    data : (N, 9) samples, state : quaternion and integral error
+    [q0, q1, q2, q3, eix, eiy, eiz], params : (kp, ki, sample_period),
+    out : (N, 4) quaternions
+    """
+    [kp, ki, sample_period] = params
+    [q0, q1, q2, q3] = [state[0], state[1], state[2], state[3]]
+    [eix, eiy, eiz] = [state[4], state[5], state[6]]
+    for i in range(len(data)):
+        row = data[i]
+        [ax, ay, az] = [row[0], row[1], row[2]]
+        [mx, my, mz] = [row[3], row[4], row[5]]
+        [gx, gy, gz] = [row[6], row[7], row[8]]
+        # Normalise accelerometer and magnetometer measurements
+        norm_accelero = math.sqrt(ax*ax + ay*ay + az*az)
+        if norm_accelero != 0:
+            ax /= norm_accelero
+            ay /= norm_accelero
+            az /= norm_accelero
+        norm_magneto = math.sqrt(mx*mx + my*my + mz*mz)
+        if norm_magneto != 0:
+            mx /= norm_magneto
+            my /= norm_magneto
+            mz /= norm_magneto
+        # Reference direction of Earth's magnetic field
+        # h = q * (0, m) * conj(q)
+        p0 = mx*q1 + my*q2 + mz*q3
+        p1 = mx*q0 - my*q3 + mz*q2
+        p2 = my*q0 - mz*q1 + mx*q3
+        p3 = mz*q0 - mx*q2 + my*q1
+        h1 = q0*p1 + q1*p0 + q2*p3 - q3*p2
+        h2 = q0*p2 + q2*p0 + q3*p1 - q1*p3
+        b1 = math.sqrt(h1*h1 + h2*h2)
+        b3 = q0*p3 + q3*p0 + q1*p2 - q2*p1
+        # Estimated direction of gravity and magnetic field
+        [q0q1, q0q2, q0q3] = [q0*q1, q0*q2, q0*q3]
+        [q1q1, q1q3, q2q2, q2q3] = [q1*q1, q1*q3, q2*q2, q2*q3]
+        vx = 2*(q1q3 - q0q2)
+        vy = 2*(q0q1 + q2q3)
+        vz = q0*q0 - q1q1 - q2q2 + q3*q3
+        wx = 2*b1*(0.5 - q2q2 - q3*q3) + 2*b3*(q1q3 - q0q2)
+        wy = 2*b1*(q1*q2 - q0q3) + 2*b3*(q0q1 + q2q3)
+        wz = 2*b1*(q0q2 + q1q3) + 2*b3*(0.5 - q1q1 - q2q2)
+        # Error is sum of cross product between
+        # estimated direction and measured direction of fields
+        ex = (ay*vz - az*vy) + (my*wz - mz*wy)
+        ey = (az*vx - ax*vz) + (mz*wx - mx*wz)
+        ez = (ax*vy - ay*vx) + (mx*wy - my*wx)
+        if ki > 0:
+            eix += ex * sample_period
+            eiy += ey * sample_period
+            eiz += ez * sample_period
+        # Apply feedback terms
+        gx += kp*ex + ki*eix
+        gy += kp*ey + ki*eiy
+        gz += kp*ez + ki*eiz
+        # Integrate the rate of change of quaternion q * (0, gyro) / 2
+        d0 = 0.5*(-q1*gx - q2*gy - q3*gz)
+        d1 = 0.5*(q0*gx + q2*gz - q3*gy)
+        d2 = 0.5*(q0*gy + q3*gx - q1*gz)
+        d3 = 0.5*(q0*gz + q1*gy - q2*gx)
+        q0 += d0*sample_period
+        q1 += d1*sample_period
+        q2 += d2*sample_period
+        q3 += d3*sample_period
+        norm_q = math.sqrt(q0*q0 + q1*q1 + q2*q2 + q3*q3)
+        q0 /= norm_q
+        q1 /= norm_q
+        q2 /= norm_q
+        q3 /= norm_q
+        row = out[i]
+        [row[0], row[1], row[2], row[3]] = [q0, q1, q2, q3]
+    [state[0], state[1], state[2], state[3]] = [q0, q1, q2, q3]
+    [state[4], state[5], state[6]] = [eix, eiy, eiz]
+
+
+def martin(data, state, params, out):
+    """ Martin Salaun observer, see martin_ahrs.martin_ahrs.update
+
+    data : (N, 9) samples, state : quaternion, gyro bias and scale
+    factors [q0, q1, q2, q3, wb1, wb2, wb3, a_s, c_s], params : gains
+    (la, lc, ld, n, o, k, sigma, sample_period), out : (N, 4) rotated
+    quaternions
+    """
+    [la, lc, ld, n, o, k, sigma, sample_period] = params
+    [q0, q1, q2, q3] = [state[0], state[1], state[2], state[3]]
+    [wb1, wb2, wb3] = [state[4], state[5], state[6]]
+    [a_s, c_s] = [state[7], state[8]]
+    for i in range(len(data)):
+        row = data[i]
+        [ax, ay, az] = [row[0], row[1], row[2]]
+        [mx, my, mz] = [row[3], row[4], row[5]]
+        [gx, gy, gz] = [row[6], row[7], row[8]]
+        # q * (0, v) * conj(q) = M v
+        [q0q0, q1q1, q2q2, q3q3] = [q0*q0, q1*q1, q2*q2, q3*q3]
+        [q0q1, q0q2, q0q3] = [q0*q1, q0*q2, q0*q3]
+        [q1q2, q1q3, q2q3] = [q1*q2, q1*q3, q2*q3]
+        m11 = q0q0 + q1q1 - q2q2 - q3q3
+        m22 = q0q0 - q1q1 + q2q2 - q3q3
+        m33 = q0q0 - q1q1 - q2q2 + q3q3
+        [m12, m21] = [2*(q1q2 - q0q3), 2*(q1q2 + q0q3)]
+        [m13, m31] = [2*(q1q3 + q0q2), 2*(q1q3 - q0q2)]
+        [m23, m32] = [2*(q2q3 - q0q1), 2*(q2q3 + q0q1)]
+        # Quaternions products yc = ya * yb, yd = yc * ya
+        [cx, cy, cz] = [ay*mz - az*my, az*mx - ax*mz, ax*my - ay*mx]
+        [dx, dy, dz] = [cy*az - cz*ay, cz*ax - cx*az, cx*ay - cy*ax]
+        # Errors with A = (0, 0, 0, 1), C = (0, 0, 1, 0), D = (0, 1, 0, 0)
+        acs = a_s * c_s
+        ea1 = -(m11*ax + m12*ay + m13*az) / a_s
+        ea2 = -(m21*ax + m22*ay + m23*az) / a_s
+        ea3 = 1 - (m31*ax + m32*ay + m33*az) / a_s
+        ec1 = -(m11*cx + m12*cy + m13*cz) / c_s
+        ec2 = 1 - (m21*cx + m22*cy + m23*cz) / c_s
+        ec3 = -(m31*cx + m32*cy + m33*cz) / c_s
+        ed1 = 1 - (m11*dx + m12*dy + m13*dz) / acs
+        ed2 = -(m21*dx + m22*dy + m23*dz) / acs
+        ed3 = -(m31*dx + m32*dy + m33*dz) / acs
+        sea = ea1*ea1 + ea2*ea2 + ea3*ea3 - ea3
+        sec = ec1*ec1 + ec2*ec2 + ec3*ec3 - ec2
+        sed = ed1*ed1 + ed2*ed2 + ed3*ed3 - ed1
+        # LE = A * EA * la + C * EC * lc + D * ED * ld (vector part)
+        le1 = -ea2*la + ec3*lc
+        le2 = ea1*la - ed3*ld
+        le3 = -ec1*lc + ed2*ld
+        ne = 0.0
+        if la + ld != 0:
+            ne = n / (la + ld) * (la * sea + ld * sed)
+        oe = 0.0
+        if lc + ld != 0:
+            oe = o / (lc + ld) * (lc * sec + ld * sed)
+        # qdot = q * (wm - wb) / 2 + LE * q + k (1 - |q|^2) q
+        [wx, wy, wz] = [gx - wb1, gy - wb2, gz - wb3]
+        kq = k * (1 - (q0q0 + q1q1 + q2q2 + q3q3))
+        dq0 = -0.5*(q1*wx + q2*wy + q3*wz) - \
+            (le1*q1 + le2*q2 + le3*q3) + kq*q0
+        dq1 = 0.5*(q0*wx + q2*wz - q3*wy) + \
+            (le1*q0 + le2*q3 - le3*q2) + kq*q1
+        dq2 = 0.5*(q0*wy + q3*wx - q1*wz) + \
+            (le2*q0 + le3*q1 - le1*q3) + kq*q2
+        dq3 = 0.5*(q0*wz + q1*wy - q2*wx) + \
+            (le3*q0 + le1*q2 - le2*q1) + kq*q3
+        # wbdot = conj(q) * ME * q = -sigma M' LE
+        wb1 -= sigma * (m11*le1 + m21*le2 + m31*le3) * sample_period
+        wb2 -= sigma * (m12*le1 + m22*le2 + m32*le3) * sample_period
+        wb3 -= sigma * (m13*le1 + m23*le2 + m33*le3) * sample_period
+        # Integration
+        q0 += dq0 * sample_period
+        q1 += dq1 * sample_period
+        q2 += dq2 * sample_period
+        q3 += dq3 * sample_period
+        a_s += a_s * ne * sample_period
+        c_s += c_s * oe * sample_period
+        # qrot = (0, 1, 0, 0) * q
+        row = out[i]
+        [row[0], row[1], row[2], row[3]] = [-q1, q0, -q3, q2]
+    [state[0], state[1], state[2], state[3]] = [q0, q1, q2, q3]
+    [state[4], state[5], state[6]] = [wb1, wb2, wb3]
+    [state[7], state[8]] = [a_s, c_s]
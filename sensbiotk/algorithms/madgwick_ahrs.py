@@ -33,11 +33,16 @@ It enables the computation of a quaternion from magneto-inertial measurements.
 import numpy as np
 import math
 from sensbiotk.transforms3d import quaternions as nq
+from sensbiotk import precision
+from sensbiotk.algorithms import kernels
 
 # disabling pylint errors 'E1101' no-member, false positive from pylint
 # disabling pylint errors 'C0103' invalid variable name, for variables : a,b
 # pylint:disable=I0011,E1101,C0103
 
+# Algorithm gain
+BETA = 0.02
+
 def norm(x):
     """
     Computes the norm of x
@@ -48,7 +53,7 @@ def norm(x):
         tmpnorm = tmpnorm + x[i]**2
     return math.sqrt(tmpnorm)
 
-def update(q, z, fs=200):
+def update(q, z, fs=200, beta=BETA):
     """
     Updates the computed q quaternion
     """
@@ -58,7 +63,7 @@ def update(q, z, fs=200):
     gyro = z[6:9]
 
     sample_period = 1./fs
-    Beta = 0.02
+    Beta = beta
 
     # Normalise accelerometer measurement
     norm_accelero = norm(accelero)
@@ -95,8 +100,10 @@ def update(q, z, fs=200):
 
 
     step = (np.dot(np.transpose(J), F))
-    # normalise step magnitude
-    step = step / norm(step)
+    # normalise step magnitude, no correction for a zero step
+    norm_step = norm(step)
+    if norm_step != 0:
+        step = step / norm_step
 
     # Compute rate of change of quaternion
     q_dot = np.dot(
@@ -109,3 +116,212 @@ def update(q, z, fs=200):
     return q / np.linalg.norm(q)
 
 
+def run_batch(data, fs=200, q0=(1.0, 0.0, 0.0, 0.0), beta=BETA, dtype=None):
+    """
+    Computes the quaternions of a whole record
+
+    Same filter as update, run by the madgwick kernel of
+    sensbiotk.algorithms.kernels (numba compiled if available).
+
+    Parameters
+    ----------
+    data : numpy array
+         (N, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz]
+    fs : float
+         sampling frequency in Hz
+    q0 : 4 element sequence
+         initial quaternion
+    beta : float
+         algorithm gain
+    dtype : numpy dtype
+         dtype of the quaternions, None for the package dtype
+         (see sensbiotk.precision)
+
+    Returns
+    -------
+    quaternion : numpy array
+         (N, 4) quaternion after each sample, quaternion[i] is
+         update(quaternion[i-1], data[i], fs)
+    """
+    [quaternion, _] = kernels.run(kernels.madgwick, data, q0,
+                                  (beta, 1./fs), 4)
+    return precision.asfloat(quaternion, dtype)
+
+
+class madgwick_ahrs(object):
+    """
+    Madgwick filter class
+
+    The filter quaternion q and gain beta are attributes of the
+    instance, filters running in parallel do not share any state.
+    """
+    def __init__(self, beta=BETA):
+        # Algorithm gain
+        self.beta = beta
+        # Computed quaternion
+        self.q = np.array([1.0, 0.0, 0.0, 0.0])
+        return
+
+    def update(self, z, fs=200):
+        """ Madgwick filter iteration, see update
+
+        Parameters
+        ----------
+        z : numpy array
+             sample [ax, ay, az, mx, my, mz, gx, gy, gz]
+        fs : float
+             sampling frequency in Hz
+
+        Returns
+        -------
+        q : numpy array
+             updated quaternion
+        """
+        self.q = np.ravel(update(self.q, z, fs, self.beta))
+        return self.q
+
+    def run_batch(self, data, fs=200, dtype=None):
+        """ Madgwick filter over a whole record, see run_batch
+
+        Parameters
+        ----------
+        data : numpy array
+             (N, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz]
+        fs : float
+             sampling frequency in Hz
+        dtype : numpy dtype
+             dtype of the quaternions, None for the package dtype
+             (see sensbiotk.precision)
+
+        Returns
+        -------
+        quaternion : numpy array
+             (N, 4) quaternion after each sample
+        """
+        [quaternion, state] = kernels.run(kernels.madgwick, data, self.q,
+                                          (self.beta, 1./fs), 4)
+        self.q = np.array(state)
+        return precision.asfloat(quaternion, dtype)
+
+    def get_state(self):
+        """ Filter gain and quaternion (JSON serializable)
+        """
+        return {'beta': float(self.beta), 'q': np.ravel(self.q).tolist()}
+
+    def set_state(self, state):
+        """ Restores a filter state returned by get_state
+        """
+        self.beta = state['beta']
+        self.q = np.array(state['q'], dtype=float)
+        return
+
+
+def update_multi(q, z, fs=200, beta=BETA):
+    """
+    Updates the quaternions of K IMUs at once
+
+    Same filter as update, computed with (K,) arrays instead of K calls.
+
+    Parameters
+    ----------
+    q : numpy array
+         (K, 4) quaternions of the K IMUs
+    z : numpy array
+         (K, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz] of the IMUs
+    fs : float
+         sampling frequency in Hz
+    beta : float or numpy array
+         algorithm gain, common or (K,) for each IMU
+
+    Returns
+    -------
+    q : numpy array
+         (K, 4) updated quaternions
+    """
+    sample_period = 1./fs
+    [q0, q1, q2, q3] = np.asarray(q).T
+    [ax, ay, az, mx, my, mz, gx, gy, gz] = np.asarray(z).T
+    # Normalise accelerometer and magnetometer measurements
+    norm_accelero = np.sqrt(ax*ax + ay*ay + az*az)
+    norm_accelero[norm_accelero == 0] = 1
+    [ax, ay, az] = [ax/norm_accelero, ay/norm_accelero, az/norm_accelero]
+    norm_magneto = np.sqrt(mx*mx + my*my + mz*mz)
+    norm_magneto[norm_magneto == 0] = 1
+    [mx, my, mz] = [mx/norm_magneto, my/norm_magneto, mz/norm_magneto]
+    # Reference direction of Earth's magnetic field
+    # h = q * (0, m) * conj(q)
+    p0 = mx*q1 + my*q2 + mz*q3
+    p1 = mx*q0 - my*q3 + mz*q2
+    p2 = my*q0 - mz*q1 + mx*q3
+    p3 = mz*q0 - mx*q2 + my*q1
+    h1 = q0*p1 + q1*p0 + q2*p3 - q3*p2
+    h2 = q0*p2 + q2*p0 + q3*p1 - q1*p3
+    b1 = np.sqrt(h1*h1 + h2*h2)
+    b3 = q0*p3 + q3*p0 + q1*p2 - q2*p1
+    # Gradient decent algorithm corrective step
+    [q0q1, q0q2, q0q3] = [q0*q1, q0*q2, q0*q3]
+    [q1q1, q1q3, q2q2, q2q3] = [q1*q1, q1*q3, q2*q2, q2*q3]
+    f0 = 2*(q1q3 - q0q2) - ax
+    f1 = 2*(q0q1 + q2q3) - ay
+    f2 = 2*(0.5 - q1q1 - q2q2) - az
+    f3 = 2*b1*(0.5 - q2q2 - q3*q3) + 2*b3*(q1q3 - q0q2) - mx
+    f4 = 2*b1*(q1*q2 - q0q3) + 2*b3*(q0q1 + q2q3) - my
+    f5 = 2*b1*(q0q2 + q1q3) + 2*b3*(0.5 - q1q1 - q2q2) - mz
+    # step = J' F
+    [b1f3, b1f4, b1f5] = [2*b1*f3, 2*b1*f4, 2*b1*f5]
+    [b3f3, b3f4, b3f5] = [2*b3*f3, 2*b3*f4, 2*b3*f5]
+    s0 = 2*(q1*f1 - q2*f0) - q2*b3f3 + q1*b3f4 - q3*b1f4 + q2*b1f5
+    s1 = 2*(q3*f0 + q0*f1) - 4*q1*f2 + q3*b3f3 + q2*b1f4 + q0*b3f4 + \
+        q3*b1f5 - 2*q1*b3f5
+    s2 = 2*(q3*f1 - q0*f0) - 4*q2*f2 + 2*q2*b1f3 - q0*b3f3 + \
+        q1*b1f4 + q3*b3f4 + q0*b1f5 - 2*q2*b3f5
+    s3 = 2*(q1*f0 + q2*f1) - 2*q3*b1f3 + q1*b3f3 - q0*b1f4 + \
+        q2*b3f4 + q1*b1f5
+    # normalise step magnitude, no correction for a zero step
+    norm_step = np.sqrt(s0*s0 + s1*s1 + s2*s2 + s3*s3)
+    gain = np.where(norm_step > 0,
+                    beta / np.where(norm_step > 0, norm_step, 1), 0)
+    # Rate of change of quaternion q * (0, gyro) / 2 - beta * step
+    q = np.column_stack([
+        q0 + (0.5*(-q1*gx - q2*gy - q3*gz) - gain*s0)*sample_period,
+        q1 + (0.5*(q0*gx + q2*gz - q3*gy) - gain*s1)*sample_period,
+        q2 + (0.5*(q0*gy + q3*gx - q1*gz) - gain*s2)*sample_period,
+        q3 + (0.5*(q0*gz + q1*gy - q2*gx) - gain*s3)*sample_period])
+    return q / np.sqrt(np.sum(q*q, 1))[:, np.newaxis]
+
+
+def run_multi(data, fs=200, q0=(1.0, 0.0, 0.0, 0.0), beta=BETA, dtype=None):
+    """
+    Computes the quaternions of K IMUs recorded on a shared time base
+
+    Each time step updates the K IMUs with update_multi.
+
+    Parameters
+    ----------
+    data : numpy array
+         (K, N, 9) samples of the IMUs, as returned by
+         sensbiotk.io.iofox.load_multi_imu
+    fs : float
+         sampling frequency in Hz
+    q0 : numpy array
+         initial quaternion, common (4,) or (K, 4) for each IMU
+    beta : float or numpy array
+         algorithm gain, common or (K,) for each IMU
+    dtype : numpy dtype
+         dtype of the quaternions, None for the package dtype
+         (see sensbiotk.precision)
+
+    Returns
+    -------
+    quaternion : numpy array
+         (K, N, 4) quaternion of each IMU after each sample
+    """
+    samples = np.swapaxes(np.asarray(data, dtype=float), 0, 1)
+    quaternion = np.empty((samples.shape[1], len(samples), 4),
+                          dtype=precision.get_dtype(dtype))
+    q = np.empty((samples.shape[1], 4))
+    q[:] = q0
+    for i, z in enumerate(samples):
+        q = update_multi(q, z, fs, beta)
+        quaternion[:, i] = q
+    return quaternion
@@ -31,10 +31,17 @@ It enables the computation of a quaternion from magneto-inertial measurements.
 import numpy as np
 import math
 from sensbiotk.transforms3d import quaternions as nq
+from sensbiotk import precision
+from sensbiotk.algorithms import kernels
 
 # disabling pylint errors 'E1101' no-member, false positive from pylint
 # pylint:disable=I0011,E1101
 
+# Algorithm proportional and integral gains
+KP = 0.01
+KI = 0
+
+# Integral error of update when it is not given a filter state
 class obj:
     eInt = 0
 
@@ -45,15 +52,15 @@ def norm(x):
         tmpnorm = tmpnorm + x[i]**2
     return math.sqrt(tmpnorm)
 
-def update(q, z, fs=200):
+def update(q, z, fs=200, kp=KP, ki=KI, state=obj):
 
     accelero = z[0:3]
     magneto = z[3:6]
     gyro = z[6:9]
 
     sample_period = 1./fs
-    Kp = 0.01 # algorithm proportional gain
-    Ki = 0 # algorithm integral gain
+    Kp = kp # algorithm proportional gain
+    Ki = ki # algorithm integral gain
 
     # Normalise accelerometer measurement
     norm_accelero = norm(accelero)
@@ -83,10 +90,10 @@ def update(q, z, fs=200):
                  np.transpose(magneto), np.transpose(w))
 
     if(Ki > 0):
-        obj.eInt = obj.eInt + e * sample_period
+        state.eInt = state.eInt + e * sample_period
 
     # Apply feedback terms
-    gyro = np.transpose(gyro + Kp * e + Ki * obj.eInt)
+    gyro = np.transpose(gyro + Kp * e + Ki * state.eInt)
 
     # Compute rate of change of quaternion
     q_dot = np.dot(0.5, nq.mult(q, (0, gyro[0], gyro[1], gyro[2])))
@@ -95,3 +102,239 @@ def update(q, z, fs=200):
     q = q + np.transpose((q_dot* sample_period))
 
     return q / np.linalg.norm(q)
+
+
+def run_batch(data, fs=200, q0=(1.0, 0.0, 0.0, 0.0), kp=KP, ki=KI,
+              dtype=None):
+    """
+    Computes the quaternions of a whole record
+
+    Same filter as update, run by the mahony kernel of
+    sensbiotk.algorithms.kernels (numba compiled if available).
+    The integral error starts at zero (it is not shared with update).
+
+    Parameters
+    ----------
+    data : numpy array
+         (N, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz]
+    fs : float
+         sampling frequency in Hz
+    q0 : 4 element sequence
+         initial quaternion
+    kp : float
+         algorithm proportional gain
+    ki : float
+         algorithm integral gain
+    dtype : numpy dtype
+         dtype of the quaternions, None for the package dtype
+         (see sensbiotk.precision)
+
+    Returns
+    -------
+    quaternion : numpy array
+         (N, 4) quaternion after each sample, quaternion[i] is
+         update(quaternion[i-1], data[i], fs)
+    """
+    [quaternion, _] = kernels.run(kernels.mahony, data,
+                                  list(q0) + [0.0, 0.0, 0.0],
+                                  (kp, ki, 1./fs), 4)
+    return precision.asfloat(quaternion, dtype)
+
+
+class mahony_ahrs(object):
+    """
+    Mahony filter class
+
+    The filter quaternion q, integral error eInt and gains kp, ki are
+    attributes of the instance, filters running in parallel do not share
+    any state.
+    """
+    def __init__(self, kp=KP, ki=KI):
+        # Algorithm proportional and integral gains
+        self.kp = kp
+        self.ki = ki
+        # Computed quaternion and integral error
+        self.q = np.array([1.0, 0.0, 0.0, 0.0])
+        self.eInt = np.zeros(3)
+        return
+
+    def update(self, z, fs=200):
+        """ Mahony filter iteration, see update
+
+        Parameters
+        ----------
+        z : numpy array
+             sample [ax, ay, az, mx, my, mz, gx, gy, gz]
+        fs : float
+             sampling frequency in Hz
+
+        Returns
+        -------
+        q : numpy array
+             updated quaternion
+        """
+        self.q = np.ravel(update(self.q, z, fs, self.kp, self.ki, self))
+        self.eInt = np.ravel(self.eInt)
+        return self.q
+
+    def run_batch(self, data, fs=200, dtype=None):
+        """ Mahony filter over a whole record, see run_batch
+
+        The integral error goes on from its current value.
+
+        Parameters
+        ----------
+        data : numpy array
+             (N, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz]
+        fs : float
+             sampling frequency in Hz
+        dtype : numpy dtype
+             dtype of the quaternions, None for the package dtype
+             (see sensbiotk.precision)
+
+        Returns
+        -------
+        quaternion : numpy array
+             (N, 4) quaternion after each sample
+        """
+        [quaternion, state] = kernels.run(
+            kernels.mahony, data, list(self.q) + list(self.eInt),
+            (self.kp, self.ki, 1./fs), 4)
+        self.q = np.array(state[0:4])
+        self.eInt = np.array(state[4:7])
+        return precision.asfloat(quaternion, dtype)
+
+    def get_state(self):
+        """ Filter gains, quaternion and integral error (JSON serializable)
+        """
+        return {'kp': float(self.kp), 'ki': float(self.ki),
+                'q': np.ravel(self.q).tolist(),
+                'eInt': np.ravel(self.eInt).tolist()}
+
+    def set_state(self, state):
+        """ Restores a filter state returned by get_state
+        """
+        [self.kp, self.ki] = [state['kp'], state['ki']]
+        self.q = np.array(state['q'], dtype=float)
+        self.eInt = np.array(state['eInt'], dtype=float)
+        return
+
+
+def update_multi(q, z, fs=200, kp=KP, ki=KI, e_int=None):
+    """
+    Updates the quaternions of K IMUs at once
+
+    Same filter as update, computed with (K,) arrays instead of K calls.
+
+    Parameters
+    ----------
+    q : numpy array
+         (K, 4) quaternions of the K IMUs
+    z : numpy array
+         (K, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz] of the IMUs
+    fs : float
+         sampling frequency in Hz
+    kp : float or numpy array
+         algorithm proportional gain, common or (K,) for each IMU
+    ki : float or numpy array
+         algorithm integral gain, common or (K,) for each IMU
+    e_int : numpy array
+         (K, 3) integral errors of the IMUs, updated in place,
+         required if ki is not 0
+
+    Returns
+    -------
+    q : numpy array
+         (K, 4) updated quaternions
+    """
+    sample_period = 1./fs
+    [q0, q1, q2, q3] = np.asarray(q).T
+    [ax, ay, az, mx, my, mz, gx, gy, gz] = np.asarray(z).T
+    # Normalise accelerometer and magnetometer measurements
+    norm_accelero = np.sqrt(ax*ax + ay*ay + az*az)
+    norm_accelero[norm_accelero == 0] = 1
+    [ax, ay, az] = [ax/norm_accelero, ay/norm_accelero, az/norm_accelero]
+    norm_magneto = np.sqrt(mx*mx + my*my + mz*mz)
+    norm_magneto[norm_magneto == 0] = 1
+    [mx, my, mz] = [mx/norm_magneto, my/norm_magneto, mz/norm_magneto]
+    # Reference direction of Earth's magnetic field
+    # h = q * (0, m) * conj(q)
+    p0 = mx*q1 + my*q2 + mz*q3
+    p1 = mx*q0 - my*q3 + mz*q2
+    p2 = my*q0 - mz*q1 + mx*q3
+    p3 = mz*q0 - mx*q2 + my*q1
+    h1 = q0*p1 + q1*p0 + q2*p3 - q3*p2
+    h2 = q0*p2 + q2*p0 + q3*p1 - q1*p3
+    b1 = np.sqrt(h1*h1 + h2*h2)
+    b3 = q0*p3 + q3*p0 + q1*p2 - q2*p1
+    # Estimated direction of gravity and magnetic field
+    [q0q1, q0q2, q0q3] = [q0*q1, q0*q2, q0*q3]
+    [q1q1, q1q3, q2q2, q2q3] = [q1*q1, q1*q3, q2*q2, q2*q3]
+    vx = 2*(q1q3 - q0q2)
+    vy = 2*(q0q1 + q2q3)
+    vz = q0*q0 - q1q1 - q2q2 + q3*q3
+    wx = 2*b1*(0.5 - q2q2 - q3*q3) + 2*b3*(q1q3 - q0q2)
+    wy = 2*b1*(q1*q2 - q0q3) + 2*b3*(q0q1 + q2q3)
+    wz = 2*b1*(q0q2 + q1q3) + 2*b3*(0.5 - q1q1 - q2q2)
+    # Error is sum of cross product between
+    # estimated direction and measured direction of fields
+    error = np.column_stack([(ay*vz - az*vy) + (my*wz - mz*wy),
+                             (az*vx - ax*vz) + (mz*wx - mx*wz),
+                             (ax*vy - ay*vx) + (mx*wy - my*wx)])
+    # Apply feedback terms
+    gyro = np.column_stack([gx, gy, gz]) + \
+        np.reshape(kp, (-1, 1)) * error
+    if np.any(np.asarray(ki) > 0):
+        e_int += np.where(np.reshape(ki, (-1, 1)) > 0,
+                          error * sample_period, 0)
+        gyro += np.reshape(ki, (-1, 1)) * e_int
+    [gx, gy, gz] = gyro.T
+    # Integrate the rate of change of quaternion q * (0, gyro) / 2
+    q = np.column_stack([
+        q0 + 0.5*(-q1*gx - q2*gy - q3*gz)*sample_period,
+        q1 + 0.5*(q0*gx + q2*gz - q3*gy)*sample_period,
+        q2 + 0.5*(q0*gy + q3*gx - q1*gz)*sample_period,
+        q3 + 0.5*(q0*gz + q1*gy - q2*gx)*sample_period])
+    return q / np.sqrt(np.sum(q*q, 1))[:, np.newaxis]
+
+
+def run_multi(data, fs=200, q0=(1.0, 0.0, 0.0, 0.0), kp=KP, ki=KI,
+              dtype=None):
+    """
+    Computes the quaternions of K IMUs recorded on a shared time base
+
+    Each time step updates the K IMUs with update_multi, the integral
+    errors start at zero.
+
+    Parameters
+    ----------
+    data : numpy array
+         (K, N, 9) samples of the IMUs, as returned by
+         sensbiotk.io.iofox.load_multi_imu
+    fs : float
+         sampling frequency in Hz
+    q0 : numpy array
+         initial quaternion, common (4,) or (K, 4) for each IMU
+    kp : float or numpy array
+         algorithm proportional gain, common or (K,) for each IMU
+    ki : float or numpy array
+         algorithm integral gain, common or (K,) for each IMU
+    dtype : numpy dtype
+         dtype of the quaternions, None for the package dtype
+         (see sensbiotk.precision)
+
+    Returns
+    -------
+    quaternion : numpy array
+         (K, N, 4) quaternion of each IMU after each sample
+    """
+    samples = np.swapaxes(np.asarray(data, dtype=float), 0, 1)
+    quaternion = np.empty((samples.shape[1], len(samples), 4),
+                          dtype=precision.get_dtype(dtype))
+    q = np.empty((samples.shape[1], 4))
+    q[:] = q0
+    e_int = np.zeros((samples.shape[1], 3))
+    for i, z in enumerate(samples):
+        q = update_multi(q, z, fs, kp, ki, e_int)
+        quaternion[:, i] = q
+    return quaternion
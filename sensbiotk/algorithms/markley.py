@@ -24,11 +24,23 @@ Fast Quaternion Attitude Estimation from Accelerometer and Magnetometers
 # sensbio/SensbioTk/SingleSensorMoCapAlgorithm/Markley/Test.py
 
 import numpy as np
+from sensbiotk import precision
 
 # disabling pylint errors 'E1101' no-member, false positive from pylint
 # disabling pylint errors 'C0103' invalid variable name, for variables : a,b
 # pylint:disable=I0011,E1101,C0103
 
+# Gravity vector reference in inertial frame
+G_REF = np.array([0, 1, 0], dtype=float)
+# Magnetometer vector reference in inertial frame
+H_REF = np.array([0, 0.866, -0.5], dtype=float)
+# Components order and signs of the quaternion rotated back in the
+# initial coordinate frame, for each isave value
+ISAVE_ORDER = np.array([[0, 1, 2, 3], [1, 0, 3, 2], [2, 3, 0, 1],
+                        [3, 2, 1, 0]])
+ISAVE_SIGN = np.array([[1, 1, 1, 1], [-1, 1, -1, 1], [-1, 1, 1, -1],
+                       [-1, -1, 1, 1]])
+
 
 def compute(z, a=np.array([0.5, 0.5])):
     """ Fast Quaternion Attitude Estimation from Accelerometer
@@ -53,10 +65,9 @@ def compute(z, a=np.array([0.5, 0.5])):
                 attitude quaternion
     """
 
-    # Gravity vector reference in inertial frame
-    G = np.array([0, 1, 0], dtype=float)
-    # Magnetometer vector reference in inertial frame
-    H = np.array([0, 0.866, -0.5], dtype=float)
+    # Gravity and magnetometer vectors references in inertial frame
+    G = np.array(G_REF)
+    H = np.array(H_REF)
     # Normalized cross-product
     v3 = np.cross(G, H)
     r3 = v3/np.sqrt((v3**2).sum())
@@ -112,3 +123,77 @@ def compute(z, a=np.array([0.5, 0.5])):
         q = np.concatenate([np.array([qopt0]), qoptv])
 
     return q
+
+
+def _dot(u, v):
+    """ Dot products of the rows of u and v """
+    return np.sum(u * v, axis=-1)
+
+
+def compute_batch(z, a=np.array([0.5, 0.5]), dtype=None):
+    """ Fast Quaternion Attitude Estimation of N samples
+
+    Same estimation as compute, the isave and alpha branches of each
+    sample are selected with masks.
+
+    Parameters :
+    ------------
+    z  : numpy array of float (dim N x 6 or N x 9)
+                 measurements: 3 accelerometer values and 3
+                 magnetometer values of each sample (the gyrometer
+                 values of N x 9 AHRS arrays are ignored)
+    a: weighting parameter containing 2 values which should be most (dim 2)
+                 of the time [0.5, 0.5]
+    dtype : numpy dtype
+                 dtype of the quaternions, None for the package dtype
+                 (see sensbiotk.precision)
+
+    Returns
+    -------
+    q : numpy array of float (dim N x 4)
+                attitude quaternions
+    """
+    z = np.atleast_2d(np.asarray(z, dtype=float))
+    if z.ndim != 2 or z.shape[1] not in [6, 9]:
+        raise ValueError("Expected N x 6 or N x 9 measurements, got %s"
+                         % (z.shape,))
+    z = z[:, 0:6]
+    g = z[:, 0:3]
+    h = z[:, 3:6]
+    [a1, a2] = [a[0], a[1]]
+
+    # Normalized cross-products
+    v3 = np.cross(G_REF, H_REF)
+    r3 = v3/np.sqrt((v3**2).sum())
+    v3 = np.cross(g, h)
+    b3 = v3/np.sqrt(_dot(v3, v3))[:, np.newaxis]
+
+    # isave: first maximum of b3.r3, b3[0]*r3[0], b3[1]*r3[1], b3[2]*r3[2]
+    isave = np.argmax(np.column_stack([np.dot(b3, r3), b3 * r3]), axis=1)
+    # references with the components other than isave-1 negated
+    sign = -np.ones((4, 3))
+    sign[0] = 1
+    sign[[1, 2, 3], [0, 1, 2]] = 1
+    sign = sign[isave]
+    [r3, G, H] = [r3 * sign, G_REF * sign, H_REF * sign]
+
+    br = 1 + _dot(b3, r3)
+    b3xr3 = np.cross(b3, r3)
+    gh_cross = a1*np.cross(g, G) + a2*np.cross(h, H)
+    alpha = br*(a1*_dot(g, G) + a2*_dot(h, H)) + _dot(b3xr3, gh_cross)
+    beta = _dot(b3 + r3, gh_cross)
+    gamma = np.sqrt(alpha**2 + beta**2)
+
+    # gamma + |alpha| is gamma + alpha if alpha > 0, else gamma - alpha
+    positive = alpha > 0
+    k = 1/(2*np.sqrt(gamma*(gamma + np.abs(alpha))*br))
+    c1 = np.where(positive, gamma + alpha, beta)
+    c2 = np.where(positive, beta, gamma - alpha)
+    qopt = np.column_stack([
+        k*c1*br, k[:, np.newaxis]*(c1[:, np.newaxis]*b3xr3 +
+                                   c2[:, np.newaxis]*(b3 + r3))])
+
+    #the quaternions are rotated in the initial coordinate frame
+    q = qopt[np.arange(len(qopt))[:, np.newaxis], ISAVE_ORDER[isave]] * \
+        ISAVE_SIGN[isave]
+    return precision.asfloat(q, dtype)
@@ -41,6 +41,11 @@ to converge toward its correct attitude and heading.
 
 import numpy as np
 from sensbiotk.transforms3d import quaternions as nq
+from sensbiotk import precision
+from sensbiotk.algorithms import kernels
+
+# Observer gains and scale factors, attributes of martin_ahrs
+GAINS = ["la", "lc", "ld", "n", "o", "k", "sigma", "a_s", "c_s"]
 
 
 class martin_ahrs(object):
@@ -99,8 +104,8 @@ class martin_ahrs(object):
         yc = nq.normalize(yc)
 
         if ya[3] == 1:
-            self.q = 1
-            self.qinv = 1
+            self.q = np.array([1.0, 0, 0, 0])
+            self.qinv = np.array([1.0, 0, 0, 0])
         else:
             self.qinv = [-ya[2], 1 - ya[3], 0, ya[1]]
             self.qinv = nq.normalize(self.qinv)
@@ -187,3 +192,234 @@ class martin_ahrs(object):
 
         return qrot
 
+    def run_batch(self, data, fs=200, dtype=None):
+        """ Martin Salaun observer over a whole record
+
+        Same iterations as update, run by the martin kernel of
+        sensbiotk.algorithms.kernels (numba compiled if available). The
+        observer state is updated.
+
+        Parameters
+        ----------
+        data : numpy array
+             (N, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz]
+        fs : float
+             sampling frequency in Hz
+        dtype : numpy dtype
+             dtype of the quaternions, None for the package dtype
+             (see sensbiotk.precision)
+
+        Returns
+        -------
+        quaternion : numpy array
+             (N, 4) quaternion returned by update for each sample
+        """
+        state = list(np.ravel(self.q)) + list(self.wb[1:4]) + \
+            [self.a_s, self.c_s]
+        gains = [getattr(self, name) for name in GAINS[:7]]
+        [quaternion, state] = kernels.run(kernels.martin, data, state,
+                                          gains + [1./fs], 4)
+        self.q = np.array(state[0:4])
+        self.qinv = nq.conjugate(self.q)
+        self.wb = np.array([0.0] + state[4:7])
+        [self.a_s, self.c_s] = state[7:9]
+        return precision.asfloat(quaternion, dtype)
+
+    def get_state(self):
+        """ Observer gains and state (JSON serializable)
+        """
+        state = dict([(name, float(getattr(self, name))) for name in GAINS])
+        state['q'] = np.ravel(self.q).tolist()
+        state['wb'] = np.ravel(self.wb).tolist()
+        return state
+
+    def set_state(self, state):
+        """ Restores an observer state returned by get_state
+        """
+        for name in GAINS:
+            setattr(self, name, state[name])
+        self.q = np.array(state['q'], dtype=float)
+        self.qinv = nq.conjugate(self.q)
+        self.wb = np.array(state['wb'], dtype=float)
+        return
+
+
+def run_batch(data, fs=200, q0=None, **gains):
+    """ Martin Salaun observer over a whole record
+
+    Parameters
+    ----------
+    data : numpy array
+         (N, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz]
+    fs : float
+         sampling frequency in Hz
+    q0 : 4 element sequence
+         initial observer quaternion (ex: init_observer output),
+         [1, 0, 0, 0] if None
+    gains : float
+         observer gains and scale factors (see GAINS), the martin_ahrs
+         defaults if not given, and dtype of the quaternions
+
+    Returns
+    -------
+    quaternion : numpy array
+         (N, 4) quaternion of each sample, see martin_ahrs.update
+    """
+    dtype = gains.pop("dtype", None)
+    observer = martin_ahrs()
+    for name in gains:
+        if name not in GAINS:
+            raise TypeError("Unknown gain %s" % name)
+        setattr(observer, name, gains[name])
+    if q0 is not None:
+        observer.q = np.array(q0, dtype=float)
+        observer.qinv = nq.conjugate(observer.q)
+    return observer.run_batch(data, fs, dtype)
+
+
+class martin_ahrs_multi(object):
+    """
+    Martin Salaun observers of K IMUs updated at once
+
+    The observer state of each IMU (quaternion q, gyro bias wb, gravity
+    and magnetic field scale factors a_s, c_s) is a row of the state
+    arrays, the gains are common or (K,) arrays. Each update computes
+    the K observers with (K,) arrays instead of K martin_ahrs calls.
+    """
+    def __init__(self, nimu):
+        observer = martin_ahrs()
+        # Observer gains (HikoB)
+        for name in GAINS[:7]:
+            setattr(self, name, getattr(observer, name))
+        # Gravity and magnetic field scale factors
+        self.a_s = np.ones(nimu) * observer.a_s
+        self.c_s = np.ones(nimu) * observer.c_s
+        # Reconstructed quaternions and gyro biases
+        self.q = np.tile([1.0, 0.0, 0.0, 0.0], (nimu, 1))
+        self.wb = np.zeros((nimu, 3))
+        return
+
+    def init_observer(self, z):
+        """ Martin Salaun init observers
+
+        Parameters
+        ----------
+        z : numpy array
+             (K, 9) initial samples of the IMUs (ex: mean of a static
+             period)
+
+        Returns
+        -------
+        q : numpy array
+             (K, 4) initial quaternions
+        """
+        for index, val in enumerate(z):
+            self.q[index] = martin_ahrs().init_observer(val)
+        return self.q
+
+    def update(self, z, sample_period):
+        """ Martin Salaun iteration of the observers
+
+        Parameters
+        ----------
+        z : numpy array
+             (K, 9) samples [ax, ay, az, mx, my, mz, gx, gy, gz]
+        sample_period : float
+             sample period in s
+
+        Returns
+        -------
+        qrot : numpy array
+             (K, 4) quaternions, see martin_ahrs.update
+        """
+        [la, lc, ld] = [self.la, self.lc, self.ld]
+        [a_s, c_s] = [self.a_s, self.c_s]
+        [q0, q1, q2, q3] = self.q.T
+        [ax, ay, az, mx, my, mz, gx, gy, gz] = np.asarray(z).T
+        # q * (0, v) * conj(q) = M v
+        [q0q0, q1q1, q2q2, q3q3] = [q0*q0, q1*q1, q2*q2, q3*q3]
+        [q0q1, q0q2, q0q3] = [q0*q1, q0*q2, q0*q3]
+        [q1q2, q1q3, q2q3] = [q1*q2, q1*q3, q2*q3]
+        m11 = q0q0 + q1q1 - q2q2 - q3q3
+        m22 = q0q0 - q1q1 + q2q2 - q3q3
+        m33 = q0q0 - q1q1 - q2q2 + q3q3
+        [m12, m21] = [2*(q1q2 - q0q3), 2*(q1q2 + q0q3)]
+        [m13, m31] = [2*(q1q3 + q0q2), 2*(q1q3 - q0q2)]
+        [m23, m32] = [2*(q2q3 - q0q1), 2*(q2q3 + q0q1)]
+        # Quaternions products yc = ya * yb, yd = yc * ya
+        [cx, cy, cz] = [ay*mz - az*my, az*mx - ax*mz, ax*my - ay*mx]
+        [dx, dy, dz] = [cy*az - cz*ay, cz*ax - cx*az, cx*ay - cy*ax]
+        # Errors with A = (0, 0, 0, 1), C = (0, 0, 1, 0), D = (0, 1, 0, 0)
+        acs = a_s * c_s
+        ea1 = -(m11*ax + m12*ay + m13*az) / a_s
+        ea2 = -(m21*ax + m22*ay + m23*az) / a_s
+        ea3 = 1 - (m31*ax + m32*ay + m33*az) / a_s
+        ec1 = -(m11*cx + m12*cy + m13*cz) / c_s
+        ec2 = 1 - (m21*cx + m22*cy + m23*cz) / c_s
+        ec3 = -(m31*cx + m32*cy + m33*cz) / c_s
+        ed1 = 1 - (m11*dx + m12*dy + m13*dz) / acs
+        ed2 = -(m21*dx + m22*dy + m23*dz) / acs
+        ed3 = -(m31*dx + m32*dy + m33*dz) / acs
+        sea = ea1*ea1 + ea2*ea2 + ea3*ea3 - ea3
+        sec = ec1*ec1 + ec2*ec2 + ec3*ec3 - ec2
+        sed = ed1*ed1 + ed2*ed2 + ed3*ed3 - ed1
+        # LE = A * EA * la + C * EC * lc + D * ED * ld (vector part)
+        le1 = -ea2*la + ec3*lc
+        le2 = ea1*la - ed3*ld
+        le3 = -ec1*lc + ed2*ld
+        ne = np.where(la + ld != 0, self.n * (la * sea + ld * sed) /
+                      np.where(la + ld != 0, la + ld, 1), 0)
+        oe = np.where(lc + ld != 0, self.o * (lc * sec + ld * sed) /
+                      np.where(lc + ld != 0, lc + ld, 1), 0)
+        # qdot = q * (wm - wb) / 2 + LE * q + k (1 - |q|^2) q
+        [wx, wy, wz] = [gx - self.wb[:, 0], gy - self.wb[:, 1],
+                        gz - self.wb[:, 2]]
+        kq = self.k * (1 - (q0q0 + q1q1 + q2q2 + q3q3))
+        qdot = np.column_stack([
+            -0.5*(q1*wx + q2*wy + q3*wz) - (le1*q1 + le2*q2 + le3*q3) +
+            kq*q0,
+            0.5*(q0*wx + q2*wz - q3*wy) + (le1*q0 + le2*q3 - le3*q2) +
+            kq*q1,
+            0.5*(q0*wy + q3*wx - q1*wz) + (le2*q0 + le3*q1 - le1*q3) +
+            kq*q2,
+            0.5*(q0*wz + q1*wy - q2*wx) + (le3*q0 + le1*q2 - le2*q1) +
+            kq*q3])
+        # wbdot = conj(q) * ME * q = -sigma M' LE
+        wbdot = -self.sigma * np.column_stack([
+            m11*le1 + m21*le2 + m31*le3,
+            m12*le1 + m22*le2 + m32*le3,
+            m13*le1 + m23*le2 + m33*le3])
+        # Integration
+        self.q = self.q + qdot * sample_period
+        self.wb = self.wb + wbdot * sample_period
+        self.a_s = a_s + a_s * ne * sample_period
+        self.c_s = c_s + c_s * oe * sample_period
+        # qrot = (0, 1, 0, 0) * q
+        return self.q[:, [1, 0, 3, 2]] * [-1, 1, -1, 1]
+
+    def run_batch(self, data, fs=200, dtype=None):
+        """ Martin Salaun observers over K records on a shared time base
+
+        Parameters
+        ----------
+        data : numpy array
+             (K, N, 9) samples of the IMUs, as returned by
+             sensbiotk.io.iofox.load_multi_imu
+        fs : float
+             sampling frequency in Hz
+        dtype : numpy dtype
+             dtype of the quaternions, None for the package dtype
+             (see sensbiotk.precision)
+
+        Returns
+        -------
+        quaternion : numpy array
+             (K, N, 4) quaternion of each IMU and sample, see update
+        """
+        samples = np.swapaxes(np.asarray(data, dtype=float), 0, 1)
+        quaternion = np.empty((samples.shape[1], len(samples), 4),
+                              dtype=precision.get_dtype(dtype))
+        sample_period = 1./fs
+        for i, z in enumerate(samples):
+            quaternion[:, i] = self.update(z, sample_period)
+        return quaternion
@@ -0,0 +1,226 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Multi-channel resampling of irregularly sampled signals
+
+All the channels (columns) of a signal are resampled at once with:
+
+- 'linear' : linear interpolation (same as a degree 1 spline),
+- 'cubic' : local cubic Hermite interpolation, the slopes being given
+  by the neighbour samples,
+- 'polyphase' : anti-aliased resampling, the signal is linearly
+  interpolated at its median sampling period then filtered and
+  decimated by a polyphase filter (scipy.signal.resample_poly).
+
+'linear' and 'cubic' only use the samples around each new sample time
+and are computed by chunks of RESAMPLE_CHUNK new samples. The resampled
+values have the package dtype (see sensbiotk.precision), the times stay
+in float64.
+"""
+
+import numpy as np
+from fractions import Fraction
+from sensbiotk import precision
+
+# disabling pylint errors 'E1101' no-member, false positive from pylint
+# pylint:disable=I0011,E1101
+
+METHODS = ["linear", "cubic", "polyphase"]
+# Number of new samples computed at once
+RESAMPLE_CHUNK = 1 << 16
+# Maximum denominator of the polyphase up/down ratio
+POLYPHASE_MAX_RATIO = 64
+
+
+def common_window(times):
+    """ Common time window of several signals
+
+    Parameters
+    ----------
+    times : list of numpy array
+          increasing sample times of each signal
+
+    Returns
+    -------
+    [tmin, tmax] : float
+          start and end of the window, tmin > tmax if there is none
+    """
+    tmin = max([time[0] for time in times])
+    tmax = min([time[-1] for time in times])
+    return [tmin, tmax]
+
+
+def trim(time, values, tmin, tmax, margin=2):
+    """ Keep the samples of a signal in [tmin, tmax]
+
+    Parameters
+    ----------
+    time : numpy array
+         increasing sample times
+    values : numpy array
+         (N, C) samples
+    tmin, tmax : float
+         time window
+    margin : int
+         number of samples kept before and after the window
+
+    Returns
+    -------
+    [time, values] : numpy array
+         views on the trimmed signal
+    """
+    start = max(np.searchsorted(time, tmin, 'right') - 1 - margin, 0)
+    stop = np.searchsorted(time, tmax, 'left') + 1 + margin
+    return [time[start:stop], values[start:stop]]
+
+
+def interval(time, time_new):
+    """ Index of the sample interval [time[i], time[i+1]] of new times
+
+    Parameters
+    ----------
+    time : numpy array
+         increasing sample times, at least 2
+    time_new : numpy array
+         new sample times
+
+    Returns
+    -------
+    index : numpy array
+         i for each new time, clipped to [0, len(time) - 2] for the
+         new times out of the time window
+    """
+    index = np.searchsorted(time, time_new, 'right') - 1
+    return np.clip(index, 0, len(time) - 2)
+
+
+def _linear(time, values, time_new):
+    """ Linear interpolation of all the channels """
+    index = interval(time, time_new)
+    step = time[index + 1] - time[index]
+    step[step == 0] = 1.0
+    weight = ((time_new - time[index]) / step)[:, np.newaxis]
+    return values[index] + weight * (values[index + 1] - values[index])
+
+
+def _slope(time, values, index):
+    """ Slope at samples index from their neighbours """
+    before = np.maximum(index - 1, 0)
+    after = np.minimum(index + 1, len(time) - 1)
+    step = time[after] - time[before]
+    step[step == 0] = 1.0
+    return (values[after] - values[before]) / step[:, np.newaxis]
+
+
+def _cubic(time, values, time_new):
+    """ Local cubic Hermite interpolation of all the channels """
+    index = interval(time, time_new)
+    step = time[index + 1] - time[index]
+    step[step == 0] = 1.0
+    pos = (time_new - time[index]) / step
+    pos2 = pos * pos
+    pos3 = pos2 * pos
+    h00 = (2 * pos3 - 3 * pos2 + 1)[:, np.newaxis]
+    h10 = ((pos3 - 2 * pos2 + pos) * step)[:, np.newaxis]
+    h01 = (3 * pos2 - 2 * pos3)[:, np.newaxis]
+    h11 = ((pos3 - pos2) * step)[:, np.newaxis]
+    return (h00 * values[index] + h10 * _slope(time, values, index) +
+            h01 * values[index + 1] + h11 * _slope(time, values, index + 1))
+
+
+def _polyphase(time, values, time_new):
+    """ Anti-aliased resampling of all the channels """
+    from scipy import signal
+    period = np.median(np.diff(time))
+    period_new = np.median(np.diff(time_new)) if len(time_new) > 1 \
+        else period
+    ratio = Fraction(period / period_new).limit_denominator(
+        POLYPHASE_MAX_RATIO)
+    if ratio.numerator == 0 or ratio >= 1:
+        # No decimation, nothing to filter
+        return _resample_chunks(_linear, time, values, time_new)
+
+    [up, down] = [ratio.numerator, ratio.denominator]
+    # Signal at its median period, padded against the filter edge effect
+    npad = 10 * max(up, down)
+    nsamples = int((time[-1] - time[0]) / period) + 1
+    uniform = np.arange(-npad, nsamples + npad)
+    uniform = time[0] + period * uniform
+    sig = _resample_chunks(_linear, time, values,
+                           np.clip(uniform, time[0], time[-1]))
+    sig = signal.resample_poly(sig, up, down, axis=0).astype(values.dtype,
+                                                             copy=False)
+    period_poly = period * down / float(up)
+    time_poly = uniform[0] + period_poly * np.arange(len(sig))
+    return _resample_chunks(_linear, time_poly, sig, time_new)
+
+
+def _resample_chunks(interpolate, time, values, time_new):
+    """ Interpolate by chunks of RESAMPLE_CHUNK new samples """
+    values_new = np.empty((len(time_new),) + values.shape[1:],
+                          dtype=values.dtype)
+    for start in range(0, len(time_new), RESAMPLE_CHUNK):
+        chunk = time_new[start:start + RESAMPLE_CHUNK]
+        [tchunk, vchunk] = trim(time, values, chunk[0], chunk[-1])
+        values_new[start:start + RESAMPLE_CHUNK] = \
+            interpolate(tchunk, vchunk, chunk)
+    return values_new
+
+
+def resample(time, values, time_new, method="linear", dtype=None):
+    """ Resample all the channels of a signal
+
+    Parameters
+    ----------
+    time : numpy array
+         increasing sample times of the signal
+    values : numpy array
+         (N,) or (N, C) signal samples
+    time_new : numpy array
+         increasing new sample times
+    method : str
+         'linear', 'cubic' or 'polyphase'
+    dtype : numpy dtype
+         dtype of the resampled values, None for the package dtype
+
+    Returns
+    -------
+    values_new : numpy array
+         (len(time_new),) or (len(time_new), C) resampled signal
+
+    Examples
+    --------
+    >>> acc_new = resample(t_acc[:, 0], acc, np.arange(0, 10, 0.01))
+    """
+    if method not in METHODS:
+        raise ValueError("Unknown resampling method %s" % method)
+    time = np.asarray(time, dtype=float)
+    values = precision.asfloat(values, dtype)
+    time_new = np.asarray(time_new, dtype=float)
+    values_2d = values.reshape(len(values), -1)
+    if len(time_new) == 0:
+        values_new = np.empty((0, values_2d.shape[1]), dtype=values.dtype)
+    elif len(time) == 1:
+        values_new = np.repeat(values_2d, len(time_new), axis=0)
+    elif method == "polyphase":
+        values_new = _polyphase(time, values_2d, time_new)
+    elif method == "cubic":
+        values_new = _resample_chunks(_cubic, time, values_2d, time_new)
+    else:
+        values_new = _resample_chunks(_linear, time, values_2d, time_new)
+    return values_new.reshape((len(time_new),) + values.shape[1:])
@@ -23,6 +23,8 @@ from sensbiotk.algorithms import basic as algo
 from sensbiotk.calib import calib_acc as calib_acc
 from sensbiotk.calib import calib_mag as calib_mag
 from sensbiotk.calib import calib_gyr as calib_gyr
+from sensbiotk.io.csvreader import load_csv
+from sensbiotk import precision
 
 # disabling pylint errors 'E1101' no-member, false positive from pylint
 # disabling pylint errors 'C0103' invalid variable name, for variables : a,b
@@ -169,7 +171,7 @@ def load_param(filename):
 
     """
 
-    params = np.loadtxt(filename, delimiter=SEP)
+    params = load_csv(filename, SEP)
 
     pcalib_acc = params[0:4]
     pcalib_mag = params[4:8]
@@ -178,6 +180,32 @@ def load_param(filename):
     return pcalib_acc, pcalib_mag, pcalib_gyr
 
 
+def apply_param(data, params, dtype=None):
+    """ Apply calibration parameters to sensor data
+
+    Parameters :
+    ------------
+    data : numpy array of float
+           (N, 3) sensor data
+    params : numpy array of float
+           [offset, scale row 1, scale row 2, scale row 3] of the sensor,
+           as returned by load_param
+    dtype : numpy dtype
+           dtype of the computation and of the calibrated data, None for
+           the package dtype (see sensbiotk.precision)
+
+    Returns
+    -------
+    data_calib : numpy array of float
+               (N, 3) scale . (data - offset) for each sample
+    """
+    dtype = precision.get_dtype(dtype)
+    params = np.asarray(params, dtype=dtype)
+    data = precision.asfloat(data, dtype)
+
+    return np.dot(data - params[0], params[1:4].T)
+
+
 def print_param(params_acc, params_mag, params_gyr):
     """ Print IMU calibration parameters
 
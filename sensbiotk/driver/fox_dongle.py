@@ -22,7 +22,6 @@ import time
 import logging
 from threading import Lock
 import numpy as np
-import fox_sink
 
 
 class FoxDongle():
@@ -59,7 +58,8 @@ class FoxDongle():
         self.data = []
         self.lastdata = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
 
-        # Class fox_pedometer instantiation
+        # Class fox_pedometer instantiation (pyserial loaded here)
+        import fox_sink
         self.sinknode = fox_sink.FoxSink()
 
         logging.debug('Search USB serial line...')
@@ -20,6 +20,8 @@ Loader/Saver for attitude and heading reference system (ahrs)
 """
 
 import numpy as np
+from sensbiotk.io.csvwriter import CsvWriter
+from sensbiotk.io.csvreader import load_csv
 
 # pylint:disable= I0011, E1101
 # E1101 no-member false positif
@@ -48,37 +50,6 @@ def _write_header(fid):
     return
 
 
-def _write_data(fid, data):
-    """ write a AHRS data line
-
-    Parameters
-    ----------
-    fid : file object opened
-        file to be writted
-    data : dictionnary
-        The keys definded must be :
-        't':float, 'acc':[float,float,float], 'mag':[float,float,float],
-        gyr':[float,float,float]
-
-    Returns
-    -------
-    None
-
-    """
-
-    lineformat = "%f" + "\t" + "%f" + "\t" + "%f" + "\t"\
-        + "%f" + "\t" + "%f" + "\t" + "%f" + "\t" + "%f" + "\t"\
-        + "%f\r\n"
-
-    line = lineformat % (data['t'], data['quat'][0],
-                         data['quat'][1], data['quat'][2], data['quat'][3],
-                         data['euler'][0], data['euler'][1], data['euler'][2]
-                         )
-    fid.write(line)
-
-    return
-
-
 def save_ahrs_csvfile(filename, time, quat, ang_euler):
     """ save a ascii csv ahrs file with the format line :\n
     t qw qx qy qz roll pitch yaw
@@ -110,18 +81,11 @@ def save_ahrs_csvfile(filename, time, quat, ang_euler):
      >>> save_ahrs_csvfile("data/ahrs.csv", timu, quat, euler)
     """
 
-    out = open(filename, 'w')
-    _write_header(out)
-
-    data = {'t': 0.0, 'quat': [0.0, 0.0, 0.0, 0.0], 'euler': [0.0, 0.0, 0.0]}
-
-    for index in range(0, len(time)):
-        data['t'] = time[index]
-        data['quat'] = quat[index, :]
-        data['euler'] = ang_euler[index, :]
-        _write_data(out, data)
-
-    out.close()
+    with CsvWriter(filename, "\t") as writer:
+        _write_header(writer.fid)
+        writer.write([np.asarray(time, dtype=float)] +
+                     list(np.asarray(quat, dtype=float).T) +
+                     list(np.asarray(ang_euler, dtype=float).T))
 
     return 'OK'
 
@@ -154,7 +118,7 @@ def load_ahrs_csvfile(filename):
      >>> print quat
     """
 
-    data = np.loadtxt(filename, delimiter='\t')
+    data = load_csv(filename, "\t")
 
     time = data[:, 0]
     quat = np.column_stack((data[:, 1], data[:, 2], data[:, 3], data[:, 4]))
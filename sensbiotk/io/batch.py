@@ -0,0 +1,286 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2015  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Parallel batch conversion of folders of HikoB Fox RAW files
+
+The RAW files of each IMU are in a folder named ImuNumber_Location
+(ex: 1_RIGHT_SHANK for the IMU n°1 located on the right shank). The
+k-th RAW file (sorted by name) of the IMU n located at LOC is converted to
+
+    out/IMUn_LOC/k_IMUn_LOC.csv          resampled acc, mag, gyr
+    out/IMUn_LOC/k_IMUn_LOC_presst.csv   pressure/temperature if recorded
+    out/IMUn_LOC/k_IMUn_LOC_gpio.csv     gpio if recorded
+    out/k/                               copy of the gpio file if any,
+                                         else of the resampled file
+
+as examples/scripts/fox_multiple_raw_folder_to_CSV.py does.
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import shutil
+import hashlib
+import argparse
+import multiprocessing
+from sensbiotk.io import iofox
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+IMU_FOLDER = re.compile(r"^(\d+)_(.+)$")
+RAW_PATTERNS = ["*.RAW", "*.raw"]
+HASH_SUFFIX = ".sha1"
+
+
+def _file_hash(filename):
+    """ sha1 of a file content
+
+    Parameters
+    ----------
+    filename : str
+
+    Returns
+    -------
+    hash : str
+         hexadecimal digest
+    """
+    sha = hashlib.sha1()
+    with open(filename, "rb") as fid:
+        for buf in iter(lambda: fid.read(1 << 20), ""):
+            sha.update(buf)
+    return sha.hexdigest()
+
+
+def find_raw_files(root, out):
+    """ List the RAW files of the ImuNumber_Location folders of root
+
+    Parameters
+    ----------
+    root : str
+         folder containing the ImuNumber_Location folders
+    out : str
+        output folder
+
+    Returns
+    -------
+    jobs : list of dictionnary
+         'raw': RAW filename, 'base': basename of the outputs,
+         'imu_dir': IMU output folder, 'expe_dir': experiment output folder
+    """
+    jobs = []
+    for name_dir in sorted(os.listdir(root)):
+        match = IMU_FOLDER.match(name_dir)
+        if match is None or not os.path.isdir(os.path.join(root, name_dir)):
+            continue
+        [imu_number, imu_location] = match.groups()
+        rawfiles = set()
+        for pattern in RAW_PATTERNS:
+            rawfiles.update(glob.glob(os.path.join(root, name_dir, pattern)))
+        for file_number, rawfile in enumerate(sorted(rawfiles), 1):
+            imu = "IMU" + imu_number + "_" + imu_location
+            jobs.append({'raw': rawfile,
+                         'base': str(file_number) + "_" + imu,
+                         'imu_dir': os.path.join(out, imu),
+                         'expe_dir': os.path.join(out, str(file_number))})
+    return jobs
+
+
+def is_up_to_date(job, fs, check="mtime"):
+    """ Check if the outputs of a conversion job are up to date
+
+    Parameters
+    ----------
+    job : dictionnary
+        see find_raw_files
+    fs : float
+       resampling frequency in Hz
+    check : str
+          'mtime': outputs newer than the RAW file,
+          'hash': RAW content and fs unchanged since the last conversion
+
+    Returns
+    -------
+    uptodate : bool
+    """
+    output = os.path.join(job['imu_dir'], job['base'] + ".csv")
+    if not os.path.isfile(output):
+        return False
+    if check == "hash":
+        hashfile = output + HASH_SUFFIX
+        if not os.path.isfile(hashfile):
+            return False
+        with open(hashfile) as fid:
+            saved = fid.read().split()
+        return saved == [_file_hash(job['raw']), repr(float(fs))]
+    return os.path.getmtime(output) >= os.path.getmtime(job['raw'])
+
+
+def convert_job(job, fs=200.0, check="mtime"):
+    """ Convert one RAW file and resample its IMU signals
+
+    Parameters
+    ----------
+    job : dictionnary
+        see find_raw_files
+    fs : float
+       resampling frequency in Hz
+    check : str
+          'mtime' or 'hash', see is_up_to_date
+
+    Returns
+    -------
+    [rawfile, status, nbytes, duration] : list
+          status is 'OK', 'SKIPPED' or 'ERROR', nbytes the RAW file size
+          and duration the conversion duration in second
+    """
+    start = time.time()
+    nbytes = os.path.getsize(job['raw'])
+    if is_up_to_date(job, fs, check):
+        return [job['raw'], 'SKIPPED', nbytes, 0.0]
+    for folder in [job['imu_dir'], job['expe_dir']]:
+        if not os.path.exists(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                # created by another worker
+                pass
+    base = os.path.join(job['imu_dir'], job['base'])
+    files = dict([(name, base + "_" + name + ".csv")
+                  for name in ['acc', 'mag', 'gyr', 'presst', 'gpio']])
+    status = iofox.convert_sensors_rawfile(
+        job['raw'], files['acc'], files['mag'], files['gyr'],
+        files['presst'], files['gpio'])
+    if status == 'OK':
+        try:
+            # temporary csv files, nothing to cache
+            [time_imu, acc, mag, gyr] = iofox.load_foximu_csvfile(
+                files['acc'], files['mag'], files['gyr'], 1 / float(fs), 1,
+                use_cache=False)
+        except (IOError, IndexError, ValueError):
+            status = 'ERROR'
+    if status == 'OK':
+        iofox.save_foxsignals_csvfile(time_imu, acc, mag, gyr,
+                                      base + ".csv")
+        if os.path.isfile(files['gpio']):
+            shutil.copy(files['gpio'], job['expe_dir'])
+        else:
+            shutil.copy(base + ".csv", job['expe_dir'])
+        if check == "hash":
+            with open(base + ".csv" + HASH_SUFFIX, "w") as fid:
+                fid.write(_file_hash(job['raw']) + " " +
+                          repr(float(fs)) + "\n")
+    for name in ['acc', 'mag', 'gyr']:
+        if os.path.isfile(files[name]):
+            os.remove(files[name])
+
+    return [job['raw'], status, nbytes, time.time() - start]
+
+
+def _convert_job(args):
+    """ convert_job with its arguments packed for Pool.imap """
+    return convert_job(*args)
+
+
+def convert_tree(root, out, workers=None, fs=200.0, check="mtime",
+                 verbose=True):
+    """ Convert the RAW files of the ImuNumber_Location folders of root
+
+    The conversions are spread over a pool of worker processes and the
+    RAW files whose outputs are up to date are skipped.
+
+    Parameters
+    ----------
+    root : str
+         folder containing the ImuNumber_Location folders
+    out : str
+        output folder
+    workers : int
+            number of worker processes, None for the number of cpus,
+            1 to convert in the current process
+    fs : float
+       resampling frequency in Hz
+    check : str
+          'mtime' or 'hash', see is_up_to_date
+    verbose : bool
+            print each conversion and the throughput summary
+
+    Returns
+    -------
+    summary : dictionnary
+            'OK', 'SKIPPED', 'ERROR': list of the RAW files,
+            'bytes': RAW bytes converted, 'duration': total duration (s)
+    """
+    start = time.time()
+    jobs = [(job, fs, check) for job in find_raw_files(root, out)]
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers > 1 and len(jobs) > 1:
+        pool = multiprocessing.Pool(min(workers, len(jobs)))
+        results = pool.imap_unordered(_convert_job, jobs)
+    else:
+        pool = None
+        results = (_convert_job(job) for job in jobs)
+
+    summary = {'OK': [], 'SKIPPED': [], 'ERROR': [], 'bytes': 0}
+    for [rawfile, status, nbytes, duration] in results:
+        summary[status].append(rawfile)
+        if status == 'OK':
+            summary['bytes'] += nbytes
+        if verbose:
+            print "%s => %s (%.2f s)" % (rawfile, status, duration)
+    if pool is not None:
+        pool.close()
+        pool.join()
+    summary['duration'] = time.time() - start
+
+    if verbose:
+        megabytes = summary['bytes'] / 1e6
+        print "%d converted, %d skipped, %d failed" % (
+            len(summary['OK']), len(summary['SKIPPED']),
+            len(summary['ERROR']))
+        print "%.1f MB of RAW files in %.2f s (%.2f MB/s)" % (
+            megabytes, summary['duration'],
+            megabytes / max(summary['duration'], 1e-9))
+    return summary
+
+
+def main(argv=None):
+    """ Command line interface of convert_tree """
+    parser = argparse.ArgumentParser(
+        description="Convert the RAW files of ImuNumber_Location folders")
+    parser.add_argument("root", help="folder of the ImuNumber_Location "
+                        "folders")
+    parser.add_argument("out", help="output folder")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes (default: cpus)")
+    parser.add_argument("--fs", type=float, default=200.0,
+                        help="resampling frequency in Hz (default: 200)")
+    parser.add_argument("--check", choices=["mtime", "hash"],
+                        default="mtime",
+                        help="up to date outputs detection (default: mtime)")
+    args = parser.parse_args(argv)
+    summary = convert_tree(args.root, args.out, args.workers, args.fs,
+                           args.check)
+    return 1 if len(summary['ERROR']) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
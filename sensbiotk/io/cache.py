@@ -0,0 +1,296 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2015  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+On-disk cache of the arrays returned by the loaders
+
+A cache entry is a .npz file named by the sha1 of CACHE_VERSION, of the
+loader name, of the content of its input files and of its other
+parameters (dtime, deg_s...). Changing a file content or a parameter
+gives a new entry; the least recently used entries are removed when
+the cache is larger than its maximum size.
+
+The cache directory is $SENSBIOTK_CACHE (default ~/.sensbiotk/cache).
+It is disabled when $SENSBIOTK_NO_CACHE is set, by set_cache(False),
+or for a single call with the use_cache=False argument of the cached
+loaders.
+
+Any processing depending on files can be cached with cached_call, e.g.
+a calibrated loading keyed on the data and calibration files:
+
+>>> [time, acc] = cached_call(load_calibrated, ["imu.csv", "calib.txt"])
+"""
+
+import os
+import inspect
+import hashlib
+import zipfile
+import tempfile
+import functools
+import numpy as np
+from sensbiotk import precision
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+# Part of the cache keys, to increment when the output of a cached
+# loader changes so that the entries computed before are not used
+CACHE_VERSION = 1
+CACHE_SIZE = 1 << 30
+CACHE_SUFFIX = ".npz"
+HASH_SUFFIX = ".sha1"
+CACHE = {'enabled': "SENSBIOTK_NO_CACHE" not in os.environ,
+         'directory': os.environ.get(
+             "SENSBIOTK_CACHE",
+             os.path.join(os.path.expanduser("~"), ".sensbiotk", "cache")),
+         'max_size': CACHE_SIZE}
+
+
+def set_cache(enabled=None, directory=None, max_size=None):
+    """ Configure the cache
+
+    Parameters
+    ----------
+    enabled : bool
+            enable/disable the cache
+    directory : str
+            cache directory
+    max_size : int
+            maximum size of the cache in bytes
+    """
+    if enabled is not None:
+        CACHE['enabled'] = enabled
+    if directory is not None:
+        CACHE['directory'] = directory
+    if max_size is not None:
+        CACHE['max_size'] = max_size
+    return
+
+
+def _write_atomic(filename, write):
+    """ Write a file through a temporary file renamed at the end """
+    [fdesc, tmpname] = tempfile.mkstemp(dir=os.path.dirname(filename))
+    try:
+        with os.fdopen(fdesc, "wb") as fid:
+            write(fid)
+        os.rename(tmpname, filename)
+    finally:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+
+
+def file_hash(filename):
+    """ sha1 of a file content
+
+    The hash is kept in the cache directory with the file size and
+    modification time, and computed again only when they change.
+
+    Parameters
+    ----------
+    filename : str
+
+    Returns
+    -------
+    hash : str
+         hexadecimal digest
+    """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    stamp = "%d %r" % (stat.st_size, stat.st_mtime)
+    hashfile = os.path.join(CACHE['directory'],
+                            hashlib.sha1(path).hexdigest() + HASH_SUFFIX)
+    if os.path.exists(hashfile):
+        with open(hashfile) as fid:
+            [fstamp, digest] = fid.read().rsplit(" ", 1)
+        if fstamp == stamp:
+            return digest
+
+    sha = hashlib.sha1()
+    with open(path, "rb") as fid:
+        for buf in iter(lambda: fid.read(1 << 20), ""):
+            sha.update(buf)
+    digest = sha.hexdigest()
+    _write_atomic(hashfile, lambda fid: fid.write(stamp + " " + digest))
+    return digest
+
+
+def cache_key(name, filenames, params):
+    """ Key of a cache entry
+
+    Parameters
+    ----------
+    name : str
+         name of the cached processing
+    filenames : list of str
+         input files
+    params : dict
+         other parameters, their repr must identify them
+
+    Returns
+    -------
+    key : str
+        hexadecimal digest
+    """
+    sha = hashlib.sha1("%d %s" % (CACHE_VERSION, name))
+    for filename in filenames:
+        sha.update(file_hash(filename))
+    sha.update(repr(sorted(params.items())))
+    return sha.hexdigest()
+
+
+def load(key):
+    """ Load a cache entry
+
+    Parameters
+    ----------
+    key : str
+
+    Returns
+    -------
+    arrays : list of numpy array
+           None if not in cache or if the entry is corrupted, which
+           is then removed
+    """
+    filename = os.path.join(CACHE['directory'], key + CACHE_SUFFIX)
+    try:
+        with np.load(filename) as data:
+            arrays = [data["arr_%d" % index]
+                      for index in range(len(data.files))]
+        # Last use time for the LRU eviction
+        os.utime(filename, None)
+    except (IOError, OSError):
+        return None
+    except (zipfile.BadZipfile, ValueError, KeyError):
+        # Truncated or corrupted entry (killed process, full disk...)
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+        return None
+    return arrays
+
+
+def store(key, arrays):
+    """ Store a cache entry and evict the least recently used ones
+
+    Parameters
+    ----------
+    key : str
+    arrays : list of numpy array
+    """
+    filename = os.path.join(CACHE['directory'], key + CACHE_SUFFIX)
+    _write_atomic(filename, lambda fid: np.savez(fid, *arrays))
+    _evict(CACHE['max_size'])
+    return
+
+
+def _evict(max_size):
+    """ Remove the least recently used entries above max_size bytes
+
+    The file hashes (HASH_SUFFIX) are entries as well.
+    """
+    entries = []
+    for name in os.listdir(CACHE['directory']):
+        if name.endswith(CACHE_SUFFIX) or name.endswith(HASH_SUFFIX):
+            stat = os.stat(os.path.join(CACHE['directory'], name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    size = sum([entry[1] for entry in entries])
+    for [_, fsize, name] in sorted(entries):
+        if size <= max_size:
+            break
+        os.remove(os.path.join(CACHE['directory'], name))
+        size -= fsize
+    return
+
+
+def clear():
+    """ Remove all the cache entries and file hashes """
+    if os.path.isdir(CACHE['directory']):
+        _evict(0)
+    return
+
+
+def cached_call(func, filenames, *args, **kwargs):
+    """ Call func(*filenames, *args, **kwargs) through the cache
+
+    Parameters
+    ----------
+    func : function
+         function of files returning a list of numpy arrays
+    filenames : list of str
+         input files, first arguments of func
+    args, kwargs :
+         other arguments of func
+
+    Returns
+    -------
+    arrays : list of numpy array
+           func result, from the cache if already computed
+    """
+    args = list(filenames) + list(args)
+    if not CACHE['enabled']:
+        return func(*args, **kwargs)
+
+    params = inspect.getcallargs(func, *args, **kwargs)
+    for name in inspect.getargspec(func).args[:len(filenames)]:
+        del params[name]
+    try:
+        if not os.path.isdir(CACHE['directory']):
+            os.makedirs(CACHE['directory'])
+        key = cache_key(func.__module__ + "." + func.__name__, filenames,
+                        params)
+    except (IOError, OSError):
+        # No usable cache directory
+        return func(*args, **kwargs)
+    arrays = load(key)
+    if arrays is None:
+        arrays = list(func(*args, **kwargs))
+        try:
+            store(key, arrays)
+        except (IOError, OSError):
+            pass
+    return arrays
+
+
+def cached(nfiles):
+    """ Decorator caching a loader
+
+    The first nfiles arguments of the loader are file names. The
+    decorated loader gets a use_cache argument (default True). A dtype
+    argument of the loader is resolved (see sensbiotk.precision) before
+    computing the cache key.
+
+    Parameters
+    ----------
+    nfiles : int
+           number of file arguments
+    """
+    def decorator(func):
+        """ Cache func """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """ Cached loader """
+            if not kwargs.pop("use_cache", True):
+                return func(*args, **kwargs)
+            params = inspect.getcallargs(func, *args, **kwargs)
+            names = inspect.getargspec(func).args[:nfiles]
+            filenames = [params.pop(name) for name in names]
+            if 'dtype' in params:
+                params['dtype'] = precision.get_dtype(params['dtype'])
+            return cached_call(func, filenames, **params)
+        return wrapper
+    return decorator
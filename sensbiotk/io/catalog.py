@@ -0,0 +1,428 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2015  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+SQLite catalog of the recorded sessions
+
+A catalog indexes the metadata of the recordings found under root
+folders, so that they can be searched without loading them:
+
+    ImuNumber_Location/*.raw        RAW files (see sensbiotk.io.batch)
+    IMUn_LOC/k_IMUn_LOC.csv         converted signals (load_foxcsvfile)
+                                    with their _presst.csv, _gpio.csv
+    *.session                       session files (sensbiotk.io.session)
+
+For each file: kind ('raw', 'csv' or 'session'), IMU number, location,
+file number, start time, duration (s), sample rate (Hz, of the
+accelerometers for RAW files), scale settings (RAW and session files),
+sensors recorded and number of GPIO events (rising edges).
+
+A rescan only reads the files whose size or modification time changed
+(or of their _presst.csv, _gpio.csv files for the converted signals)
+and forgets the removed ones and the ones that can no longer be read.
+
+Example
+-------
+>>> with Catalog("sessions.db") as catalog:
+...     catalog.scan("data")
+...     for record in catalog.find(location="RIGHT_SHANK",
+...                                min_duration=60, fs=200):
+...         sensors = catalog.load(record)
+"""
+
+import os
+import re
+import sqlite3
+import numpy as np
+from sensbiotk.io import iofox
+from sensbiotk.io import session
+from sensbiotk.io.batch import IMU_FOLDER, RAW_PATTERNS
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+CONVERTED_FOLDER = re.compile(r"^IMU(\d+)_(.+)$")
+CONVERTED_FILE = re.compile(r"^(\d+)_IMU(\d+)_(.+)\.csv$")
+SESSION_SUFFIX = ".session"
+# Files read with the converted signals files
+CSV_COMPANIONS = ["_presst.csv", "_gpio.csv"]
+# Relative tolerance of the sample rate queries
+FS_TOLERANCE = 0.05
+COLUMNS = ["path", "kind", "imu_id", "location", "number", "size", "mtime",
+           "tstart", "duration", "fs", "acc_scale", "mag_scale",
+           "gyr_scale", "sensors", "gpio_events", "stamp"]
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, kind TEXT, imu_id INTEGER, location TEXT,
+    number INTEGER, size INTEGER, mtime REAL, tstart REAL, duration REAL,
+    fs REAL, acc_scale TEXT, mag_scale TEXT, gyr_scale TEXT, sensors TEXT,
+    gpio_events INTEGER, stamp TEXT);
+CREATE INDEX IF NOT EXISTS files_location ON files (location);
+CREATE INDEX IF NOT EXISTS files_imu ON files (imu_id);
+"""
+
+
+def _gpio_events(gpio):
+    """ Number of rising edges of the gpio lines """
+    if len(gpio) < 2:
+        return 0
+    return int(np.sum(np.diff(gpio.astype(np.int8), axis=0) > 0))
+
+
+def _rate(nsamples, duration):
+    """ Mean sample rate """
+    if nsamples < 2 or not duration > 0:
+        return None
+    return (nsamples - 1) / duration
+
+
+def _raw_info(filename):
+    """ Metadata of a RAW file, read from its packet headers
+
+    Parameters
+    ----------
+    filename : str
+
+    Returns
+    -------
+    info : dictionnary
+         catalog columns, None if it is not a RAW sensors file
+    """
+    info = iofox.info_fox_rawfile(filename)
+    if info is None or info['tmin'] is None:
+        return None
+    header = (info['version'], info['acc_scale'], info['mag_scale'],
+              info['gyr_scale'])
+    metadata = session.raw_metadata(header)
+    packets = info['packets']
+    duration = info['tmax'] - info['tmin']
+    gpio_events = 0
+    if packets.get('gpio', 0) > 0:
+        with open(filename, "rb") as in_fox:
+            iofox._read_raw_header(in_fox)
+            blocks = list(iofox._iter_raw_packets(in_fox, header,
+                                                  names=['gpio']))
+        gpio = [block['gpio'][1] for block in blocks if 'gpio' in block]
+        gpio_events = _gpio_events(np.concatenate(gpio))
+    imu_rate = packets['acc'] if 'acc' in packets else packets.get('imu', 0)
+    return {'kind': 'raw', 'tstart': info['tmin'], 'duration': duration,
+            'fs': _rate(imu_rate, duration),
+            'acc_scale': metadata['acc_scale'],
+            'mag_scale': metadata['mag_scale'],
+            'gyr_scale': metadata['gyr_scale'],
+            'sensors': " ".join(sorted([name for name in packets
+                                        if name != 'unknown' and
+                                        packets[name] > 0])),
+            'gpio_events': gpio_events}
+
+
+def _csv_info(filename):
+    """ Metadata of a converted signals file and of its _presst/_gpio files
+
+    Parameters
+    ----------
+    filename : str
+
+    Returns
+    -------
+    info : dictionnary
+         catalog columns
+    """
+    time = iofox.load_foxcsvfile(filename, use_cache=False)[0]
+    sensors = ["acc", "gyr", "mag"]
+    base = filename[:-len(".csv")]
+    gpio_events = 0
+    if os.path.isfile(base + CSV_COMPANIONS[0]):
+        sensors.append("presst")
+    if os.path.isfile(base + CSV_COMPANIONS[1]):
+        sensors.append("gpio")
+        gpio_events = _gpio_events(
+            iofox.load_foxgpio_csvfile(base + CSV_COMPANIONS[1])[1])
+    if len(time) == 0:
+        [tstart, duration, fs] = [None, 0.0, None]
+    else:
+        [tstart, duration] = [time[0], time[-1] - time[0]]
+        fs = _rate(len(time), duration)
+    return {'kind': 'csv', 'tstart': tstart, 'duration': duration, 'fs': fs,
+            'sensors': " ".join(sorted(sensors)), 'gpio_events': gpio_events}
+
+
+def _session_info(filename):
+    """ Metadata of a session file
+
+    Parameters
+    ----------
+    filename : str
+
+    Returns
+    -------
+    info : dictionnary
+         catalog columns
+    """
+    [sensors, metadata] = session.load_session(filename)
+    info = {'kind': 'session', 'sensors': " ".join(sorted(sensors)),
+            'imu_id': metadata.get('imu_id'),
+            'location': metadata.get('location'),
+            'acc_scale': metadata.get('acc_scale'),
+            'mag_scale': metadata.get('mag_scale'),
+            'gyr_scale': metadata.get('gyr_scale'),
+            'gpio_events': 0, 'duration': 0.0}
+    name = 'imu' if 'imu' in sensors else 'acc'
+    if name in sensors and len(sensors[name][0]) > 0:
+        time = sensors[name][0]
+        time = time[:, 0] if time.ndim > 1 else time
+        info['tstart'] = float(time[0])
+        info['duration'] = float(time[-1] - time[0])
+        info['fs'] = metadata.get('fs', _rate(len(time), info['duration']))
+    if 'gpio' in sensors:
+        info['gpio_events'] = _gpio_events(sensors['gpio'][1])
+    return info
+
+
+def _stamp(path, reader):
+    """ Sizes and modification times of a file and of its companions
+
+    Parameters
+    ----------
+    path : str
+    reader : function
+           metadata reader of the file (_csv_info, ...)
+
+    Returns
+    -------
+    stamp : str
+    """
+    paths = [path]
+    if reader is _csv_info:
+        paths += [path[:-len(".csv")] + suffix for suffix in CSV_COMPANIONS]
+    stamp = []
+    for name in paths:
+        if os.path.isfile(name):
+            stat = os.stat(name)
+            stamp.append("%s %d %r" % (os.path.basename(name), stat.st_size,
+                                       stat.st_mtime))
+    return "\n".join(stamp)
+
+
+def _find_files(root):
+    """ Recordings found under a folder
+
+    Parameters
+    ----------
+    root : str
+
+    Returns
+    -------
+    files : dictionnary
+          path: [reader, {imu_id, location, number}]
+    """
+    files = {}
+    raw_suffixes = tuple([pattern[1:] for pattern in RAW_PATTERNS])
+    for [folder, _, names] in os.walk(root):
+        raw_folder = IMU_FOLDER.match(os.path.basename(folder))
+        csv_folder = CONVERTED_FOLDER.match(os.path.basename(folder))
+        for name in names:
+            path = os.path.abspath(os.path.join(folder, name))
+            if name.endswith(SESSION_SUFFIX):
+                files[path] = [_session_info, {}]
+            elif raw_folder is not None and name.endswith(raw_suffixes):
+                files[path] = [_raw_info,
+                               {'imu_id': int(raw_folder.group(1)),
+                                'location': raw_folder.group(2)}]
+            elif csv_folder is not None:
+                match = CONVERTED_FILE.match(name)
+                if match is not None and match.group(2, 3) == \
+                        csv_folder.groups():
+                    files[path] = [_csv_info,
+                                   {'imu_id': int(match.group(2)),
+                                    'location': match.group(3),
+                                    'number': int(match.group(1))}]
+    return files
+
+
+class Catalog(object):
+    """ SQLite catalog of recordings
+
+    Example
+    -------
+    >>> catalog = Catalog("sessions.db")
+    >>> catalog.scan("ImuData")
+    >>> records = catalog.find(imu_id=8, sensor="gpio")
+    >>> catalog.close()
+    """
+
+    def __init__(self, filename=":memory:"):
+        """ Open or create a catalog database
+
+        Parameters
+        ----------
+        filename : str
+                 SQLite database file
+        """
+        self.filename = filename
+        self._db = sqlite3.connect(filename)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Close the database """
+        self._db.close()
+        return
+
+    def scan(self, root):
+        """ Index the recordings found under a folder
+
+        Only the files whose size or modification time changed since the
+        last scan (or of their companion files, see CSV_COMPANIONS) are
+        read. The removed files and the files that can no longer be read
+        are forgotten.
+
+        Parameters
+        ----------
+        root : str
+             folder to scan
+
+        Returns
+        -------
+        summary : dictionnary
+                'added', 'updated', 'removed', 'unchanged', 'ERROR':
+                list of paths
+        """
+        prefix = os.path.join(os.path.abspath(root), "")
+        summary = {'added': [], 'updated': [], 'removed': [],
+                   'unchanged': [], 'ERROR': []}
+        known = dict([(row['path'], row['stamp'])
+                      for row in self._db.execute(
+                          "SELECT path, stamp FROM files WHERE "
+                          "substr(path, 1, ?) = ?",
+                          (len(prefix), prefix))])
+        found = _find_files(prefix)
+        for path in sorted(found):
+            [reader, record] = found[path]
+            stat = os.stat(path)
+            stamp = _stamp(path, reader)
+            if known.get(path) == stamp:
+                summary['unchanged'].append(path)
+                continue
+            try:
+                info = reader(path)
+            except (IOError, OSError, ValueError, IndexError, KeyError):
+                info = None
+            if info is None:
+                self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+                summary['ERROR'].append(path)
+                continue
+            for name in info:
+                if info[name] is not None or name not in record:
+                    record[name] = info[name]
+            record.update({'path': path, 'size': stat.st_size,
+                           'mtime': stat.st_mtime, 'stamp': stamp})
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (%s) VALUES (%s)" % (
+                    ", ".join(COLUMNS), ", ".join(["?"] * len(COLUMNS))),
+                [record.get(name) for name in COLUMNS])
+            summary['updated' if path in known else 'added'].append(path)
+        for path in sorted(set(known) - set(found)):
+            self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+            summary['removed'].append(path)
+        self._db.commit()
+        return summary
+
+    def find(self, kind=None, imu_id=None, location=None, min_duration=None,
+             max_duration=None, fs=None, sensor=None, min_gpio_events=None):
+        """ Search recordings
+
+        Parameters
+        ----------
+        kind : str
+             'raw', 'csv' or 'session'
+        imu_id : int
+               IMU number
+        location : str
+                 IMU location (ex: 'RIGHT_SHANK')
+        min_duration, max_duration : float
+                 duration bounds in second
+        fs : float
+           sample rate in Hz (FS_TOLERANCE relative tolerance)
+        sensor : str
+               sensor recorded ('acc', 'mag', 'gyr', 'presst', 'gpio')
+        min_gpio_events : int
+               minimum number of GPIO events
+
+        Returns
+        -------
+        records : list of dictionnary
+                catalog columns of the matching files, sorted by path,
+                see load
+        """
+        conditions = []
+        values = []
+        for [column, value] in [["kind", kind], ["imu_id", imu_id],
+                                ["location", location]]:
+            if value is not None:
+                conditions.append(column + " = ?")
+                values.append(value)
+        if min_duration is not None:
+            conditions.append("duration >= ?")
+            values.append(min_duration)
+        if max_duration is not None:
+            conditions.append("duration <= ?")
+            values.append(max_duration)
+        if fs is not None:
+            conditions.append("ABS(fs - ?) <= ?")
+            values += [fs, FS_TOLERANCE * fs]
+        if sensor is not None:
+            conditions.append("(' ' || sensors || ' ') LIKE ?")
+            values.append("% " + sensor + " %")
+        if min_gpio_events is not None:
+            conditions.append("gpio_events >= ?")
+            values.append(min_gpio_events)
+        query = "SELECT * FROM files"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        rows = self._db.execute(query + " ORDER BY path", values)
+        return [dict(row) for row in rows]
+
+    def load(self, record, **kwargs):
+        """ Load a recording found by find
+
+        Parameters
+        ----------
+        record : dictionnary
+               catalog record
+        kwargs :
+               other arguments of the loader
+
+        Returns
+        -------
+        data :
+             load_sensors_rawfile output for a RAW file, load_foxcsvfile
+             output for a converted file, [sensors, metadata] for a
+             session file
+        """
+        if record['kind'] == 'raw':
+            return iofox.load_sensors_rawfile(record['path'], **kwargs)
+        if record['kind'] == 'csv':
+            return iofox.load_foxcsvfile(record['path'], **kwargs)
+        return session.load_session(record['path'])
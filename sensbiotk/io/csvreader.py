@@ -0,0 +1,145 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2015  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Chunked csv reader parsing numerical tables in bulk
+
+The file is read by large chunks of lines and each chunk is parsed at
+once by numpy (np.fromstring), instead of line by line as np.loadtxt
+does. Lines starting with '#' and blank lines are skipped.
+"""
+
+import re
+import numpy as np
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+# Size of the text chunks parsed at once
+CHUNK_SIZE = 1 << 22
+# Blank line inside a chunk
+_BLANK_LINE = re.compile(r"\n[ \t\r]*\n")
+
+
+def _strip_comments(text):
+    """ Remove the lines starting with '#' and the blank lines """
+    if "#" not in text and _BLANK_LINE.search(text) is None:
+        return text
+    return "\n".join([line for line in text.split("\n")
+                      if line.strip() and not line.lstrip().startswith("#")])
+
+
+def _parse_chunk(text, sep, ncols):
+    """ Parse a chunk of complete lines
+
+    Parameters
+    ----------
+    text : str
+         lines without comments
+    sep : str
+        column separator
+    ncols : int
+          number of columns, None to find it from the first line
+
+    Returns
+    -------
+    data : numpy array
+         (nlines, ncols) array of float
+    """
+    if sep.strip():
+        text = text.replace(sep, " ")
+    text = text.strip()
+    if not text:
+        return np.empty((0, 0 if ncols is None else ncols))
+    if ncols is None:
+        ncols = len(text.split("\n", 1)[0].split())
+    nlines = text.count("\n") + 1
+    values = np.fromstring(text, sep=" ")
+    if values.size != nlines * ncols:
+        raise ValueError("Wrong number of values in csv lines "
+                         "(expected %d columns)" % ncols)
+    return values.reshape(nlines, ncols)
+
+
+def load_csv(filename, sep=";", usecols=None, dtype=np.float64, out=None,
+             chunksize=CHUNK_SIZE):
+    """ Load a numerical csv file
+
+    Parameters
+    ----------
+    filename : str
+             csv file name
+    sep : str
+        column separator
+    usecols : list of int
+            columns to keep, all of them if None
+    dtype : numpy dtype
+          output dtype (e.g. np.float32)
+    out : numpy array
+        preallocated output array of shape (nrows, ncols) with
+        nrows larger or equal to the number of lines; its dtype is
+        used instead of dtype
+    chunksize : int
+              size of the text chunks parsed at once
+
+    Returns
+    -------
+    data : numpy array
+         (nlines, ncols) array, a view on out if given
+
+    Examples
+    --------
+    >>> data = load_csv("data/imutest_acc.csv", usecols=[0, 2, 3, 4])
+    """
+    blocks = []
+    nrows = 0
+    ncols = None
+    remain = ""
+    fid = open(filename, 'r')
+    try:
+        while True:
+            chunk = fid.read(chunksize)
+            text = remain + chunk
+            if chunk:
+                end = text.rfind("\n") + 1
+                [text, remain] = [text[:end], text[end:]]
+            data = _parse_chunk(_strip_comments(text), sep, ncols)
+            if len(data) > 0:
+                ncols = data.shape[1]
+                if usecols is not None:
+                    data = data[:, usecols]
+                if out is None:
+                    blocks.append(data.astype(dtype, copy=False))
+                elif nrows + len(data) > len(out):
+                    raise ValueError("Output array too small for %s"
+                                     % filename)
+                else:
+                    out[nrows:nrows + len(data)] = data
+                nrows += len(data)
+            if not chunk:
+                break
+    finally:
+        fid.close()
+
+    if out is not None:
+        return out[:nrows]
+    if len(blocks) == 0:
+        ncols = 0 if usecols is None else len(usecols)
+        return np.empty((0, ncols), dtype=dtype)
+    if len(blocks) == 1:
+        return blocks[0]
+    return np.concatenate(blocks)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2015  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Buffered csv writer formatting numerical tables by blocks
+
+The lines are formatted by numpy on whole blocks of rows, the output
+is the same as formatting each line with "%f" (float columns) and "%d"
+(integer columns).
+"""
+
+import numpy as np
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+# Number of rows formatted at once
+FORMAT_ROWS = 1 << 16
+# Size of the text buffered by CsvWriter before writing it
+BUFFER_SIZE = 1 << 22
+_POW10 = 10 ** np.arange(16, dtype=np.int64)
+_DIGITS = np.frombuffer("".join(["%03d" % val for val in range(1000)]),
+                        dtype=np.uint8).reshape(1000, 3)
+
+
+def _fixed_parts(values):
+    """ Split float values like the "%f" C format does
+
+    The fractional part is rounded to 6 digits half to even on its
+    exact binary value (Dekker product), which is what "%f" % value does.
+
+    Parameters
+    ----------
+    values : numpy array of float
+           finite values, abs(values) < 2**52
+
+    Returns
+    -------
+    intpart : numpy array of int
+            integer part of abs(values)
+    fracpart : numpy array of int
+            6 digits fractional part of abs(values)
+    """
+    absval = np.abs(values)
+    intpart = np.floor(absval)
+    frac = absval - intpart
+    prod = frac * 1e6
+    # exact error of the product frac * 1e6 (1e6 fits in 26 bits)
+    split = frac * 134217729.0
+    frac_hi = split - (split - frac)
+    frac_lo = frac - frac_hi
+    err = (frac_hi * 1e6 - prod) + frac_lo * 1e6
+    fracpart = np.floor(prod)
+    rem = prod - fracpart
+    fracpart = fracpart.astype(np.int64)
+    fracpart += (rem > 0.5) | ((rem == 0.5) & (
+        (err > 0) | ((err == 0) & (fracpart % 2 == 1))))
+    intpart = intpart.astype(np.int64)
+    carry = fracpart == 1000000
+    intpart += carry
+    fracpart[carry] = 0
+    return intpart, fracpart
+
+
+def _digits(number, width):
+    """ Decimal digits of non negative integers
+
+    Parameters
+    ----------
+    number : numpy array of int
+    width : int
+          number of digits
+
+    Returns
+    -------
+    chars : numpy array of uint8
+          (N, width) digits characters, left padded with '0'
+    """
+    ngroups = -(-width // 3)
+    chars = np.empty((len(number), 3 * ngroups), dtype=np.uint8)
+    for group in range(ngroups - 1, -1, -1):
+        number, rem = np.divmod(number, 1000)
+        chars[:, 3 * group:3 * group + 3] = _DIGITS.take(rem, axis=0)
+    return chars[:, 3 * ngroups - width:]
+
+
+def format_rows(columns, sep=";", eol="\r\n"):
+    """ Format a table as csv lines, in bulk
+
+    Float columns are formatted as "%f" and integer columns as "%d",
+    the output is the same as formatting each line with the "%"
+    operator.
+
+    Parameters
+    ----------
+    columns : list of numpy array
+            columns of the table (same length)
+    sep : str
+        column separator
+    eol : str
+        end of line
+
+    Returns
+    -------
+    lines : str
+          formatted lines
+    """
+    nrows = len(columns[0])
+    if nrows == 0:
+        return ""
+    floats = [np.issubdtype(col.dtype, np.floating) for col in columns]
+    for col, isfloat in zip(columns, floats):
+        if isfloat and not np.all(np.abs(col) < 2.0 ** 52):
+            # nan, inf or huge values: let python format them
+            lineformat = sep.join(["%f" if isflt else "%d"
+                                   for isflt in floats]) + eol
+            rows = zip(*[col.tolist() for col in columns])
+            return "".join([lineformat % row for row in rows])
+    lines = []
+    for start in range(0, nrows, FORMAT_ROWS):
+        block = [col[start:start + FORMAT_ROWS] for col in columns]
+        parts = []
+        for col, isfloat in zip(block, floats):
+            if isfloat:
+                [intpart, fracpart] = _fixed_parts(col)
+                negative = np.signbit(col)
+            else:
+                intpart = np.abs(col.astype(np.int64))
+                fracpart = None
+                negative = col < 0
+            ndigits = np.searchsorted(_POW10, intpart, side='right')
+            ndigits = np.maximum(ndigits, 1)
+            parts.append([negative, intpart, ndigits, ndigits.max(),
+                          fracpart])
+        width = sum([2 + part[3] + (7 if part[4] is not None else 0)
+                     for part in parts]) - 1 + len(eol)
+        chars = np.empty((len(block[0]), width), dtype=np.uint8)
+        keep = np.ones((len(block[0]), width), dtype=bool)
+        pos = 0
+        for [negative, intpart, ndigits, ndig, fracpart] in parts:
+            chars[:, pos] = ord('-')
+            keep[:, pos] = negative
+            chars[:, pos + 1:pos + 1 + ndig] = _digits(intpart, ndig)
+            keep[:, pos + 1:pos + 1 + ndig] = \
+                np.arange(ndig, 0, -1) <= ndigits[:, np.newaxis]
+            pos += 1 + ndig
+            if fracpart is not None:
+                chars[:, pos] = ord('.')
+                chars[:, pos + 1:pos + 7] = _digits(fracpart, 6)
+                pos += 7
+            chars[:, pos] = ord(sep)
+            pos += 1
+        chars[:, pos - 1:] = np.frombuffer(eol, dtype=np.uint8)
+        lines.append(chars[keep].tobytes())
+    return "".join(lines)
+
+
+class CsvWriter(object):
+    """ Buffered csv file writer
+
+    The writer keeps its own state (last time for the dt column, line
+    counter) so that several writers can be used at the same time,
+    in different threads too. A file header is written through fid
+    before the first call to write.
+
+    Example
+    -------
+    >>> with CsvWriter("acc.csv", delta=True) as writer:
+    ...     writer.fid.write(header)
+    ...     writer.write([time, acc[:, 0], acc[:, 1], acc[:, 2]])
+    """
+
+    def __init__(self, filename, sep=";", eol="\r\n", delta=False,
+                 counter=None, bufsize=BUFFER_SIZE, append=False):
+        """ Open the csv file
+
+        Parameters
+        ----------
+        filename : str
+                 csv file name
+        sep : str
+            column separator
+        eol : str
+            end of line
+        delta : bool
+              insert a dt column after the time (first) column
+        counter : int
+              if given, insert first a line number column starting at
+              counter
+        bufsize : int
+              size of the text buffered before writing it
+        append : bool
+              append the lines to an existing file
+        """
+        self.fid = open(filename, 'a' if append else 'w')
+        self.sep = sep
+        self.eol = eol
+        self.delta = delta
+        self.lastt = 0.0
+        self.counter = counter
+        self.bufsize = bufsize
+        self._buffer = []
+        self._size = 0
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, columns):
+        """ Write a block of lines
+
+        Parameters
+        ----------
+        columns : list of numpy array
+                columns of the lines (same length), the first one is the
+                time if delta is True
+        """
+        columns = [np.asarray(col) for col in columns]
+        nrows = len(columns[0])
+        if nrows == 0:
+            return
+        if self.delta:
+            delta = np.diff(columns[0], prepend=self.lastt)
+            self.lastt = columns[0][-1]
+            columns.insert(1, delta)
+        if self.counter is not None:
+            columns.insert(0, np.arange(self.counter, self.counter + nrows))
+            self.counter += nrows
+        lines = format_rows(columns, self.sep, self.eol)
+        self._buffer.append(lines)
+        self._size += len(lines)
+        if self._size >= self.bufsize:
+            self.flush()
+        return
+
+    def flush(self):
+        """ Write the buffered text in the file """
+        self.fid.write("".join(self._buffer))
+        self._buffer = []
+        self._size = 0
+        return
+
+    def close(self):
+        """ Flush and close the csv file """
+        self.flush()
+        self.fid.close()
+        return
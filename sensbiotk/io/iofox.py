@@ -20,8 +20,14 @@ Loader for HikoB Fox Node format
 """
 
 import numpy as np
-import scipy.interpolate as spi
 import struct
+import functools
+import multiprocessing
+from sensbiotk.io.csvwriter import CsvWriter
+from sensbiotk.io.csvreader import load_csv
+from sensbiotk.io import cache
+from sensbiotk.algorithms import resample
+from sensbiotk import precision
 
 # pylint:disable= I0011, E1101, R0912, R0913, R0914, R0915
 # E1101 no-member false positif
@@ -32,12 +38,35 @@ LSM303DLHC_MAG_SCALE = {'1_3gauss': 0x20, '1_9gauss': 0x40, '2_5gauss': 0x60,
                         '4_0gauss': 0x80, '4_7gauss': 0xA0, '5_6gauss': 0xC0,
                         '8_1gauss': 0xE0}
 L3G4200D_SCALE = {'250dps': 0x00, '500dps': 0x10, '2000dps': 0x30}
-SCALE = {'ref_g': 9.81, 'time': 1e-3,
-         'acc': 2.0e-2, 'mag_xy': (1.0 / 670.0), 'mag_z': (1.0 / 600.0),
-         'press': 1.0 / 4096.0 / 1000.0, 'temp': 1.0 / 480.0,
-         'offset_temp': 22.5}
+# Sensors scales of the files whose header does not give them
+DEFAULT_SCALE = {'ref_g': 9.81, 'time': 1e-3,
+                 'acc': 2.0e-2, 'mag_xy': (1.0 / 670.0),
+                 'mag_z': (1.0 / 600.0), 'press': 1.0 / 4096.0 / 1000.0,
+                 'temp': 1.0 / 480.0, 'offset_temp': 22.5}
+SCALE = dict(DEFAULT_SCALE)
 SEP = ";"
 TIME_OVERFLOW = 8192.0
+# RAW file layout: 5 bytes name, 4 bytes version/scales, 1 byte AHRS flag
+RAW_HEADER_SIZE = 10
+# Packet type (high nibble of the 4 bytes packet header) and payload size
+PACKET_TYPE = {'presst': 0x3, 'acc': 0x5, 'mag': 0x6, 'gyr': 0x7,
+               'gpio': 0x8}
+PACKET_SIZE = {0x3: 6, 0x5: 6, 0x6: 6, 0x7: 6, 0x8: 1}
+# Packet type and payload size of the RAW files before version 4 (9 bytes
+# header, the packet time is in the payload), see RAW_FORMATS
+FOX_PACKET_TYPE = {'imu': 0x0, 'presst': 0x3}
+# Size of the blocks read from a RAW file by the bulk decoder
+RAW_BLOCK_SIZE = 1 << 20
+# Default number of packets of the blocks yielded by iter_raw_blocks
+RAW_BLOCK_SAMPLES = 100000
+# Number of packets skipped at once (2**_JUMP_DEPTH) when searching
+# packet boundaries
+_JUMP_DEPTH = 2
+# Packet size from the last byte of the packet header
+_PACKET_STEP = np.array([4 + PACKET_SIZE.get(byte >> 4, 0)
+                         for byte in range(256)], dtype=np.int32)
+# RAW file formats by header version byte, see register_raw_format
+RAW_FORMATS = {}
 
 
 def _get_acc_scale():
@@ -197,83 +226,91 @@ def _get_temp(rawval):
     return SCALE['offset_temp'] + SCALE['temp'] * val[0]
 
 
-def _set_time_scale(val):
+def _set_time_scale(val, scale=SCALE):
     """ set time scale value
 
     Parameters
     ----------
     val: float
          time scale in second
+    scale: dictionnary
+         scales to update (SCALE by default)
     """
-    SCALE['time'] = val
+    scale['time'] = val
     return
 
 
-def _set_acc_scale(val):
+def _set_acc_scale(val, scale=SCALE):
     """ set accelerometer scale value
 
     Parameters
     ----------
     val: float
         accelerometer scale value in m/s^2
+    scale: dictionnary
+         scales to update (SCALE by default)
     """
     if val == LSM303DLHC_ACC_SCALE['2g']:
-        SCALE['acc'] = 1e-3 * SCALE['ref_g']
+        scale['acc'] = 1e-3 * scale['ref_g']
     elif val == LSM303DLHC_ACC_SCALE['4g']:
-        SCALE['acc'] = 2e-3 * SCALE['ref_g']
+        scale['acc'] = 2e-3 * scale['ref_g']
     elif val == LSM303DLHC_ACC_SCALE['8g']:
-        SCALE['acc'] = 4e-3 * SCALE['ref_g']
+        scale['acc'] = 4e-3 * scale['ref_g']
     elif val == LSM303DLHC_ACC_SCALE['16g']:
-        SCALE['acc'] = 12e-3 * SCALE['ref_g']
+        scale['acc'] = 12e-3 * scale['ref_g']
     return
 
 
-def _set_mag_scale(val):
+def _set_mag_scale(val, scale=SCALE):
     """ set magnetometer scale value
 
     Parameters
     ----------
     val: magnetometer scale value
+    scale: dictionnary
+         scales to update (SCALE by default)
     """
     if val == LSM303DLHC_MAG_SCALE['1_3gauss']:
-        SCALE['mag_xy'] = 1.0 / 1100.0
-        SCALE['mag_z'] = 1.0 / 980.0
+        scale['mag_xy'] = 1.0 / 1100.0
+        scale['mag_z'] = 1.0 / 980.0
     elif val == LSM303DLHC_MAG_SCALE['1_9gauss']:
-        SCALE['mag_xy'] = 1.0 / 850.0
-        SCALE['mag_z'] = 1.0 / 760.0
+        scale['mag_xy'] = 1.0 / 850.0
+        scale['mag_z'] = 1.0 / 760.0
     elif val == LSM303DLHC_MAG_SCALE['2_5gauss']:
-        SCALE['mag_xy'] = 1.0 / 670.0
-        SCALE['mag_z'] = 1.0 / 600.0
+        scale['mag_xy'] = 1.0 / 670.0
+        scale['mag_z'] = 1.0 / 600.0
     elif val == LSM303DLHC_MAG_SCALE['4_0gauss']:
-        SCALE['mag_xy'] = 1.0 / 450.0
-        SCALE['mag_z'] = 1.0 / 400.0
+        scale['mag_xy'] = 1.0 / 450.0
+        scale['mag_z'] = 1.0 / 400.0
     elif val == LSM303DLHC_MAG_SCALE['4_7gauss']:
-        SCALE['mag_xy'] = 1.0 / 400.0
-        SCALE['mag_z'] = 1.0 / 355.0
+        scale['mag_xy'] = 1.0 / 400.0
+        scale['mag_z'] = 1.0 / 355.0
     elif val == LSM303DLHC_MAG_SCALE['5_6gauss']:
-        SCALE['mag_xy'] = 1.0 / 330.0
-        SCALE['mag_z'] = 1.0 / 295.0
+        scale['mag_xy'] = 1.0 / 330.0
+        scale['mag_z'] = 1.0 / 295.0
     elif val == LSM303DLHC_MAG_SCALE['8_1gauss']:
-        SCALE['mag_xy'] = 1.0 / 230.0
-        SCALE['mag_z'] = 1.0 / 205.0
+        scale['mag_xy'] = 1.0 / 230.0
+        scale['mag_z'] = 1.0 / 205.0
 
     return
 
 
-def _set_gyr_scale(val):
+def _set_gyr_scale(val, scale=SCALE):
     """ set gyrometer scale value
 
     Parameters
     ----------
     val: float
          gyrometer scale value in rad/sec
+    scale: dictionnary
+         scales to update (SCALE by default)
     """
     if val == L3G4200D_SCALE['250dps']:
-        SCALE['gyr'] = 8.75e-3 * np.pi / 180.0
+        scale['gyr'] = 8.75e-3 * np.pi / 180.0
     elif val == L3G4200D_SCALE['500dps']:
-        SCALE['gyr'] = 1.75e-2 * np.pi / 180.0
+        scale['gyr'] = 1.75e-2 * np.pi / 180.0
     elif val == L3G4200D_SCALE['2000dps']:
-        SCALE['gyr'] = 7e-2 * np.pi / 180.0
+        scale['gyr'] = 7e-2 * np.pi / 180.0
 
     return
 
@@ -304,9 +341,6 @@ def _write_header(fid, binfilename):
     fid.write("#\tGyrometer: rad/s\r\n")
     fid.write("#\r\n")
 
-    _write_data.lastt = 0
-    _write_data.lastid = 1
-
     return
 
 
@@ -332,8 +366,6 @@ def _write_acc_header(fid, binfilename):
     fid.write("#\tAcceleration: m.s^-2\r\n")
     fid.write("#\r\n")
 
-    _write_acc_data.lastt = 0
-
     return
 
 
@@ -359,8 +391,6 @@ def _write_mag_header(fid, binfilename):
     fid.write("#\tMagnetic field: gauss\r\n")
     fid.write("#\r\n")
 
-    _write_mag_data.lastt = 0
-
     return
 
 
@@ -386,8 +416,6 @@ def _write_gyr_header(fid, binfilename):
     fid.write("#\tRotation speed: rad.s^-1\r\n")
     fid.write("#\r\n")
 
-    _write_gyr_data.lastt = 0
-
     return
 
 
@@ -412,8 +440,6 @@ def _write_presst_header(fid, binfilename):
     fid.write("#\tTemperature: degree (C)\r\n")
     fid.write("#\r\n")
 
-    _write_presst_data.lastt = 0
-
     return
 
 
@@ -438,154 +464,415 @@ def _write_gpio_header(fid, binfilename):
     fid.write("#\tGPIO: 0/1\r\n")
     fid.write("#\r\n")
 
-    _write_gpio_data.lastt = 0
-
     return
 
 
-def _write_acc_data(fid, data):
-    """ write a accelerometers IMU data line
+def _read_raw_header(in_fox):
+    """ Read the header of a RAW HikoB Fox sensors file
 
     Parameters
     ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys definded must be :
-         't':float, 'acc':[float,float,float],
+    in_fox : file object opened
+           RAW file positionned at its beginning
+
+    Returns
+    -------
+    header : tuple of int
+           (version, acc scale, mag scale, gyr scale) or None on error
     """
+    buf = in_fox.read(5)
+    if len(buf) != 5 or buf != "HiKoB":
+        print "Error while reading file"
+        return None
+    buf = in_fox.read(4)
+    if len(buf) != 4:
+        print "Error while reading file"
+        return None
+    header = struct.unpack("=BBBB", buf)
+    fmt = raw_format(header[0])
+    if fmt is None:
+        print "Unknown file version: ", header[0]
+        return None
+    # Read the end of the header (AHRS_ENABLED byte) and drop it
+    in_fox.read(fmt['header_size'] - 9)
+    return header
+
+
+def _read_sensors_header(in_fox):
+    """ Read the header of a RAW sensors file
+
+    The sensors scales of the file are given by _header_scale(header).
+
+    Parameters
+    ----------
+    in_fox : file object opened
+           RAW file positionned at its beginning
 
-    lineformat = "%f"+SEP+"%f"+SEP+"%f"+SEP+"%f"+SEP+"%f\r\n"
-    delta = data['t'] - _write_acc_data.lastt
+    Returns
+    -------
+    header : tuple of int
+           (version, acc scale, mag scale, gyr scale) or None on error
+    """
+    header = _read_raw_header(in_fox)
+    if header is None:
+        return None
+    version = header[0]
+    if version < 4:
+        print "File version: ", version, " is to old"
+        return None
+    return header
 
-    line = lineformat % (data['t'], delta,
-                         data['acc'][0], data['acc'][1], data['acc'][2])
 
-    fid.write(line)
-    _write_acc_data.lastt = data['t']
+def _set_sensors_scales(header, scale=SCALE):
+    """ Set the sensors scales given in a RAW sensors file header
 
+    Parameters
+    ----------
+    header : tuple of int
+           (version, acc scale, mag scale, gyr scale)
+    scale: dictionnary
+         scales to update (SCALE by default)
+    """
+    _set_acc_scale(header[1], scale)
+    _set_mag_scale(header[2], scale)
+    _set_gyr_scale(header[3], scale)
+    _set_time_scale(raw_format(header[0])['time_scale'], scale)
     return
 
 
-def _write_data(fid, data):
-    """ write a IMU data line
+def _header_scale(header):
+    """ Sensors scales of a RAW sensors file header, SCALE is not used
 
     Parameters
     ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys definded must be :
-         't':float, 'acc':[float,float,float], 'mag':[float,float,float],
-         'gyr':[float,float,float]
+    header : tuple of int
+           (version, acc scale, mag scale, gyr scale)
+
+    Returns
+    -------
+    scale : dictionnary
+          copy of DEFAULT_SCALE with the header scales
     """
+    scale = dict(DEFAULT_SCALE)
+    _set_sensors_scales(header, scale)
+    return scale
 
-    lineformat = "%i" + "\t" + "%f" + "\t" + "%f" + "\t" + "%f" + "\t"\
-        + "%f" + "\t" + "%f" + "\t" + "%f" + "\t" + "%f" + "\t"\
-        + "%f" + "\t" + "%f" + "\t" + "%f" + "\t" + "%f\r\n"
-    delta = data['t'] - _write_data.lastt
-   # id=1
-    line = lineformat % (_write_data.lastid, data['t'], delta,
-                         data['acc'][0], data['acc'][1], data['acc'][2],
-                         data['mag'][0], data['mag'][1], data['mag'][2],
-                         data['gyr'][0], data['gyr'][1], data['gyr'][2],
-                         )
 
-    fid.write(line)
-    _write_data.lastt = data['t']
-    _write_data.lastid = _write_data.lastid+1
+def _find_packets(raw, start=0, steps=_PACKET_STEP):
+    """ Find the packets boundaries of a RAW data buffer
 
-    return
+    The offset of the next packet is computed at every byte of the
+    buffer from the type bits, then these jumps are composed
+    _JUMP_DEPTH times so that the python loop only visits one packet
+    out of 2**_JUMP_DEPTH.
 
+    Parameters
+    ----------
+    raw : numpy array of uint8
+        RAW data buffer (without the file header)
+    start : int
+        offset of the first packet in the buffer
+    steps : numpy array of int
+        packet size from the last byte of its header (see RAW_FORMATS)
 
-def _write_mag_data(fid, data):
-    """ write a magnetometers IMU data line
+    Returns
+    -------
+    offsets : numpy array of int
+            offsets of the complete packets of the buffer
+    end : int
+        offset of the first byte not decoded (truncated packet)
+    """
+    nbytes = len(raw)
+    stop = nbytes + 1
+    jump = np.empty(nbytes + 2, dtype=np.int32)
+    jump[:] = stop
+    if nbytes > 3:
+        nxt = np.arange(nbytes - 3, dtype=np.int32)
+        nxt += steps[raw[3:]]
+        nxt[nxt > nbytes] = stop
+        jump[:nbytes - 3] = nxt
+    jumps = [jump]
+    for _ in range(_JUMP_DEPTH):
+        jumps.append(jumps[-1].take(jumps[-1]))
+    offsets = []
+    offset = start
+    while offset != stop:
+        offsets.append(offset)
+        offset = jumps[-1].item(offset)
+    offsets = np.array(offsets, dtype=np.int32)
+    for jump in jumps[-2::-1]:
+        both = np.empty(2 * len(offsets), dtype=np.int32)
+        both[0::2] = offsets
+        both[1::2] = jump.take(offsets)
+        offsets = both[both != stop]
+    # the last offset is the end of the buffer or a truncated packet
+    return offsets[:-1], int(offsets[-1])
+
+
+def _unwrap_time(ticks, state, scale=SCALE):
+    """ Convert packets time counter to time handling counter overflow
 
     Parameters
     ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys definded must be :
-         't':float, 'mag':[float,float,float],
-    """
+    ticks : numpy array of int
+          packets time counter
+    state : dictionnary
+          'offset_time' and 'prec_time' of the last packet, updated
+    scale : dictionnary
+          sensors scales (SCALE by default)
 
-    lineformat = "%f"+SEP+"%f"+SEP+"%f"+SEP+"%f"+SEP+"%f\n"
-    delta = data['t']-_write_mag_data.lastt
-    line = lineformat % (data['t'], delta,
-                         data['mag'][0], data['mag'][1], data['mag'][2])
+    Returns
+    -------
+    time : numpy array of float
+         packets time in second
+    """
+    raw_time = scale['time'] * ticks
+    if len(raw_time) == 0:
+        return raw_time
+    overflow = np.empty(len(raw_time), dtype=bool)
+    overflow[0] = state['prec_time'] > (raw_time[0] + state['offset_time']
+                                        + 8000.0)
+    overflow[1:] = raw_time[:-1] > (raw_time[1:] + 8000.0)
+    offset_time = state['offset_time'] + TIME_OVERFLOW * np.cumsum(overflow)
+    time = raw_time + offset_time
+    state['offset_time'] = offset_time[-1]
+    state['prec_time'] = time[-1]
+    return time
+
+
+def _decode_packets(raw, offsets, state, names=None, scale=SCALE):
+    """ Decode in bulk the packets of a RAW data buffer
 
-    fid.write(line)
-    _write_mag_data.lastt = data['t']
+    Parameters
+    ----------
+    raw : numpy array of uint8
+        RAW data buffer
+    offsets : numpy array of int
+        offsets of the complete packets of the buffer
+    state : dictionnary
+          time unwrapping state, see _unwrap_time
+    names : list of str
+          packet types to decode ('acc', 'mag', ...), None for all
+    scale : dictionnary
+          sensors scales (SCALE by default)
 
-    return
+    Returns
+    -------
+    data : dictionnary
+         for each packet type found, 'acc', 'mag', 'gyr': [t, [x,y,z]],
+         'presst': [t, [press, temp]], 'gpio': [t, [gpio0, ..., gpio4]]
+    """
+    header = raw[offsets[:, np.newaxis] + np.arange(4)]
+    header = header.view("<u4")[:, 0]
+    typ = header >> 28
+    time = _unwrap_time(header & 0x0FFFFFFF, state, scale)
+    data = {}
+    for name, code in PACKET_TYPE.items():
+        if names is not None and name not in names:
+            continue
+        mask = typ == code
+        if not np.any(mask):
+            continue
+        payload = raw[offsets[mask, np.newaxis] + 4 +
+                      np.arange(PACKET_SIZE[code])]
+        if name == 'acc':
+            values = scale['acc'] * payload.view("<i2").astype(float)
+        elif name == 'mag':
+            values = payload.view("<i2") * np.array(
+                [scale['mag_xy'], scale['mag_xy'], scale['mag_z']])
+        elif name == 'gyr':
+            values = scale['gyr'] * payload.view("<i2").astype(float)
+        elif name == 'presst':
+            press = payload[:, 0:3].astype(np.int64)
+            press = scale['press'] * (press[:, 0] + (press[:, 1] << 8)
+                                      + (press[:, 2] << 16))
+            temp = np.ascontiguousarray(payload[:, 4:6]).view("<i2")[:, 0]
+            temp = scale['offset_temp'] + scale['temp'] * temp
+            values = np.column_stack([press, temp])
+        else:
+            values = (payload >> np.arange(5, dtype=np.uint8)) & 1
+        data[name] = [time[mask], values]
+    return data
 
 
-def _write_gyr_data(fid, data):
-    """ write a gyrometers IMU data line
+def _decode_fox_packets(raw, offsets, state, names=None, scale=SCALE,
+                        type_shift=28, sizes=None):
+    """ Decode in bulk the packets of a RAW data buffer before version 4
 
     Parameters
     ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys definded must be :
-         't':float, 'gyr':[float,float,float],
-    """
-
-    lineformat = "%f" + SEP + "%f" + SEP + "%f" + SEP + "%f" + SEP + "%f\r\n"
-    delta = data['t']-_write_gyr_data.lastt
-    line = lineformat % (data['t'], delta,
-                         data['gyr'][0], data['gyr'][1], data['gyr'][2])
-
-    fid.write(line)
-    _write_gyr_data.lastt = data['t']
-    return
+    raw : numpy array of uint8
+        RAW data buffer
+    offsets : numpy array of int
+        offsets of the complete packets of the buffer
+    state : dictionnary
+          not used, the packet time is not wrapped
+    names : list of str
+          packet types to decode ('imu', 'presst'), None for all
+    scale : dictionnary
+          sensors scales (SCALE by default)
+    type_shift : int
+          position of the packet type in the packet header
+    sizes : dictionnary
+          payload size of each packet type (see register_raw_format)
 
-_write_gyr_data.lastt = 0
+    Returns
+    -------
+    data : dictionnary
+         for each packet type found, 'imu': [t, id, [ax, ..., gz]],
+         'presst': [t, id, [press, temp]], with the rank of each packet
+         in the buffer as a fourth array
+    """
+    header = raw[offsets[:, np.newaxis] + np.arange(4)]
+    header = header.view("<u4")[:, 0]
+    typ = header >> type_shift
+    ident = header & ((1 << type_shift) - 1)
+    data = {}
+    for name, code in FOX_PACKET_TYPE.items():
+        if names is not None and name not in names:
+            continue
+        [rank] = np.nonzero(typ == code)
+        if len(rank) == 0:
+            continue
+        payload = raw[offsets[rank, np.newaxis] + 4 +
+                      np.arange(sizes[code])]
+        time = scale['time'] * payload[:, 0:4].copy().view("<u4")[:, 0]
+        if name == 'imu':
+            values = payload[:, 4:22].copy().view("<i2") * np.array(
+                3 * [scale['acc']] + 2 * [scale['mag_xy']] +
+                [scale['mag_z']] + 3 * [scale['gyr']])
+        else:
+            press = payload[:, 4:7].astype(np.int64)
+            press = scale['press'] * (press[:, 0] + (press[:, 1] << 8)
+                                      + (press[:, 2] << 16))
+            # the temperature is in the last two bytes
+            temp = payload[:, -2:].copy().view("<i2")[:, 0]
+            temp = scale['offset_temp'] + scale['temp'] * temp
+            values = np.column_stack([press, temp])
+        data[name] = [time, ident[rank], values, rank]
+    return data
 
 
-def _write_presst_data(fid, data):
-    """ Write a pression and temperature data line.
+def register_raw_format(versions, header_size, type_shift, types, sizes,
+                        time_scale, decode):
+    """ Register the layout of RAW files versions
 
     Parameters
     ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys defined must be :
-        't':float, 'pression':float, 'temperature':float
-    """
-    lineformat = "%f"+SEP+"%f"+SEP+"%f"+SEP+"%f\r\n"
-    delta = data['t'] - _write_presst_data.lastt
-    line = lineformat % (data['t'], delta, data['press'], data['temp'])
-    fid.write(line)
-    _write_presst_data.lastt = data['t']
+    versions : list of int
+             header version bytes, the last registered version is also
+             used for the newer versions
+    header_size : int
+             size of the file header
+    type_shift : int
+             position of the packet type in the little endian packet
+             header (4 bytes)
+    types : dictionnary
+          packet type of each sensor name
+    sizes : dictionnary
+          payload size of each packet type (0 if not given)
+    time_scale : float
+          time unit of the packets in second
+    decode : function
+          bulk decoder of packets, see _decode_packets
 
-    return
+    Returns
+    -------
+    fmt : dictionnary
+        the registered format
+    """
+    fmt = {'header_size': header_size, 'type_shift': type_shift,
+           'types': types, 'sizes': sizes, 'time_scale': time_scale,
+           'decode': decode}
+    fmt['steps'] = np.array([4 + sizes.get(byte >> (type_shift - 24), 0)
+                             for byte in range(256)], dtype=np.int32)
+    for version in versions:
+        RAW_FORMATS[version] = fmt
+    return fmt
 
 
-def _write_gpio_data(fid, data):
-    """ Write GPIOs
+def raw_format(version):
+    """ Layout of a RAW file version
 
     Parameters
     ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys defined must be :
-        't':float, 'gpio0:int, 'gpio1':float, 'gpio2:int,
-                   'gpio3':float, 'gpio4':float
+    version : int
+            header version byte
+
+    Returns
+    -------
+    fmt : dictionnary
+        see register_raw_format, None if the version is unknown
     """
-    lineformat = "%f" + SEP + "%f" + SEP + "%u" + SEP + "%u" + SEP\
-        + "%u" + SEP + "%u" + SEP + "%u\r\n"
-    delta = data['t'] - _write_gpio_data.lastt
-    line = lineformat % (data['t'], delta, data['gpio0'], data['gpio1'],
-                         data['gpio2'], data['gpio3'], data['gpio4'])
-    fid.write(line)
-    _write_gpio_data.lastt = data['t']
+    if version in RAW_FORMATS:
+        return RAW_FORMATS[version]
+    if version > max(RAW_FORMATS):
+        return RAW_FORMATS[max(RAW_FORMATS)]
+    return None
+
+
+register_raw_format([0], 9, 30, FOX_PACKET_TYPE, {0x0: 22, 0x3: 9}, 1e-3,
+                    functools.partial(_decode_fox_packets, type_shift=30,
+                                      sizes={0x0: 22, 0x3: 9}))
+register_raw_format([1], 9, 28, FOX_PACKET_TYPE, {0x0: 22, 0x3: 9}, 1e-3,
+                    functools.partial(_decode_fox_packets,
+                                      sizes={0x0: 22, 0x3: 9}))
+register_raw_format([2, 3], 9, 28, FOX_PACKET_TYPE, {0x0: 22, 0x3: 10},
+                    1.0 / 32768.0,
+                    functools.partial(_decode_fox_packets,
+                                      sizes={0x0: 22, 0x3: 10}))
+register_raw_format([4], RAW_HEADER_SIZE, 28, PACKET_TYPE, PACKET_SIZE,
+                    1.0 / 32768.0, _decode_packets)
+
+
+def _iter_raw_packets(in_fox, header, blocksize=RAW_BLOCK_SIZE, state=None,
+                      names=None):
+    """ Decode a RAW file block by block
 
-    return
+    Parameters
+    ----------
+    in_fox : file object opened
+           RAW file positionned after its header
+    header : tuple of int
+           RAW file header (version, acc scale, mag scale, gyr scale)
+    blocksize : int
+           number of bytes read at once
+    state : dictionnary
+          decoding state, updated at each block: 'offset' of the first
+          packet not decoded yet in the file and time unwrapping state
+          (see _unwrap_time). The decoding starts at state['offset']
+          if given.
+    names : list of str
+          packet types to decode, None for all
+
+    Returns
+    -------
+    generator of dictionnary
+           decoded packets of each block, see the decoder of the file
+           version in RAW_FORMATS (_decode_packets since version 4)
+    """
+    fmt = raw_format(header[0])
+    scale = _header_scale(header)
+    if state is None:
+        state = {}
+    state.setdefault('offset_time', 0.0)
+    state.setdefault('prec_time', 0.0)
+    if 'offset' in state:
+        in_fox.seek(state['offset'])
+    else:
+        state['offset'] = in_fox.tell()
+    remain = ""
+    while True:
+        buf = in_fox.read(blocksize)
+        if len(buf) == 0:
+            break
+        buf = remain + buf
+        raw = np.frombuffer(buf, dtype=np.uint8)
+        offsets, end = _find_packets(raw, 0, fmt['steps'])
+        remain = buf[end:]
+        state['offset'] += end
+        if len(offsets) > 0:
+            yield fmt['decode'](raw, offsets, state, names, scale=scale)
 
 
 def convert_sensors_rawfile(binfilename, accfilename="output_acc.csv",
@@ -615,238 +902,393 @@ def convert_sensors_rawfile(binfilename, accfilename="output_acc.csv",
     status : str
              'OK' / 'ERROR'
     """
+    state = follow_sensors_rawfile(binfilename, None, accfilename,
+                                   magfilename, gyrfilename,
+                                   presstfilename, gpiofilename)
+    if state is None:
+        return 'ERROR'
+    return 'OK'
+
+
+def follow_sensors_rawfile(binfilename, state=None,
+                           accfilename="output_acc.csv",
+                           magfilename="output_mag.csv",
+                           gyrfilename="output_gyr.csv",
+                           presstfilename="output_presst.csv",
+                           gpiofilename="output_gpio.csv"):
+    """ Convert the packets appended to a raw file since the last call.
+
+    For a RAW file still being written (node logging, copy from the
+    SD card), each call decodes only the bytes appended since the
+    previous call and appends their lines to the csv files. The first
+    call (state is None) creates the csv files. The csv files are the
+    same as the convert_sensors_rawfile ones once the RAW file is
+    complete.
+
+    Parameters
+    ----------
+    binfilename : str
+                Name of the raw file to convert.
+    state : dictionnary
+          state returned by the previous call, None for the first one.
+          It can be saved with json to follow the file across runs.
+    accfilename, magfilename, gyrfilename, presstfilename,
+    gpiofilename : str
+                Name of the csv files, see convert_sensors_rawfile
+
+    Returns
+    -------
+    state : dictionnary
+          decoding state ('offset' of the first packet not converted,
+          time unwrapping state and last time of each csv file),
+          None on error
+
+    Example
+    -------
+    >>> state = None
+    >>> while logging:
+    ...     state = follow_sensors_rawfile("data/imutest.raw", state)
+    ...     time.sleep(1)
+    """
+    outputs = {'acc': [accfilename, _write_acc_header, "\r\n"],
+               'mag': [magfilename, _write_mag_header, "\n"],
+               'gyr': [gyrfilename, _write_gyr_header, "\r\n"],
+               'presst': [presstfilename, _write_presst_header, "\r\n"],
+               'gpio': [gpiofilename, _write_gpio_header, "\r\n"]}
+    state = {'lastt': {}} if state is None else dict(state)
+    state['lastt'] = dict(state['lastt'])
+    writers = {}
 
     with open(binfilename, "rb") as in_fox:
+        header = _read_sensors_header(in_fox)
+        if header is None:
+            return None
+
+        for data in _iter_raw_packets(in_fox, header, state=state):
+            for name in PACKET_TYPE:
+                if name not in data:
+                    continue
+                [filename, write_header, eol] = outputs[name]
+                if name not in writers:
+                    append = name in state['lastt']
+                    writers[name] = CsvWriter(filename, SEP, eol, delta=True,
+                                              append=append)
+                    if append:
+                        writers[name].lastt = state['lastt'][name]
+                    else:
+                        write_header(writers[name].fid, binfilename)
+                [time, values] = data[name]
+                writers[name].write([time] + list(values.T))
+                state['lastt'][name] = float(time[-1])
+
+    for writer in writers.values():
+        writer.close()
+
+    return state
+
+
+def _join_packets(blocks, lastt=None, dtype=None):
+    """ Join decoded packets blocks into the loaders sensors arrays
 
-        # Read Header Name
-        buf = in_fox.read(5)
-        if len(buf) != 5:
-            print "Error while reading file"
-            return 'ERROR'
-        else:
-            name = struct.unpack("=ccccc", buf)
-            if "".join(name) != "HiKoB":
-                print "Error while reading file"
-                return 'ERROR'
-        # Read Scale
-        buf = in_fox.read(4)
-        if len(buf) != 4:
-            print "Error while reading file"
-            return 'ERROR'
+    Parameters
+    ----------
+    blocks : list of dictionnary
+           decoded packets blocks, see _decode_packets
+    lastt : dictionnary
+          time of the sensors packets preceding the blocks, used for
+          the first dt (0.0 if not given)
+    dtype : numpy dtype
+          dtype of the sensors values (not gpio), None for the package
+          dtype (see sensbiotk.precision)
+
+    Returns
+    -------
+    sensors : dictionnary
+            see load_sensors_rawfile
+    """
+    sensors = {}
+    for name in PACKET_TYPE:
+        data = [block[name] for block in blocks if name in block]
+        if len(data) == 0:
+            continue
+        time = np.concatenate([block[0] for block in data])
+        values = np.concatenate([block[1] for block in data])
+        if values.dtype.kind == 'f':
+            values = precision.asfloat(values, dtype)
+        prec = 0.0 if lastt is None else lastt.get(name, 0.0)
+        time = np.column_stack([time, np.diff(time, prepend=prec)])
+        if name == 'presst':
+            sensors[name] = [time, values[:, 0], values[:, 1]]
         else:
-            val = struct.unpack("=BBBB", buf)
-            version = val[0]
-            if version < 4:
-                print "File version: ", version, " is to old"
-                return 'ERROR'
-            _set_acc_scale(val[1])
-            _set_mag_scale(val[2])
-            _set_gyr_scale(val[3])
-
-            _set_time_scale(1.0 / 32768.0)
-            offset_time = 0.0
-            prec_time = 0.0
-
-            sensor_size = 6
-            presst_size = 6
-            gpio_size = 1
-
-            # Read the AHRS_ENABLED byte and drop it
-            in_fox.read(1)
-            # Sensors data initialization
-            acc = {'t': 0.0, 'acc': [0.0, 0.0, 0.0]}
-            mag = {'t': 0.0, 'mag': [0.0, 0.0, 0.0]}
-            gyr = {'t': 0.0, 'gyr': [0.0, 0.0, 0.0]}
-            presst = {'t': 0.0, 'press': 0.0, 'temp': 0.0}
-            gpio = {'t': 0.0, 'gpio': [0.0, 0.0, 0.0, 0.0, 0.0]}
-
-            # Flags to write output header file one time
-            header_acc = True
-            header_mag = True
-            header_gyr = True
-            header_presst = True
-            header_gpio = True
-            # Flags to control the loop
-            cont = True
-            err = False
-            # Read data packets
-            while cont is True:
-                buf = in_fox.read(4)
-                if len(buf) != 4:
-                    cont = False
-                else:
-                    # Read Time and Id sensor
-                    idb = struct.unpack("=HH", buf)
-                    sensid = idb[1]*65536+idb[0]
-                    sensid = sensid & 0x0FFFFFFF
-                    current_time = (SCALE['time'] * sensid) + offset_time
-                    if prec_time > (current_time + 8000.0):
-                        offset_time = offset_time + TIME_OVERFLOW
-                        current_time = current_time + TIME_OVERFLOW
-                    prec_time = current_time
-
-                    typ = (idb[1] & 0xF000) >> 12
-                    # ACC packet
-                    if typ == 0x5:
-                        if header_acc:
-                            out_acc = open(accfilename, 'w')
-                            _write_acc_header(out_acc, binfilename)
-                            header_acc = False
-                        buf = in_fox.read(sensor_size)
-                        if len(buf) != sensor_size:
-                            cont = False
-                        else:
-                            acc['t'] = current_time
-                            acc['acc'] = _get_acc(buf)
-                            _write_acc_data(out_acc, acc)
-                    # MAG packet
-                    elif typ == 0x6:
-                        if header_mag:
-                            out_mag = open(magfilename, 'w')
-                            _write_mag_header(out_mag, binfilename)
-                            header_mag = False
-                        buf = in_fox.read(sensor_size)
-                        if len(buf) != sensor_size:
-                            cont = False
-                        else:
-                            mag['t'] = current_time
-                            mag['mag'] = _get_mag(buf)
-                            _write_mag_data(out_mag, mag)
-                    # GYR packet
-                    elif typ == 0x7:
-                        if header_gyr:
-                            out_gyr = open(gyrfilename, 'w')
-                            _write_gyr_header(out_gyr, binfilename)
-                            header_gyr = False
-                        buf = in_fox.read(sensor_size)
-                        if len(buf) != sensor_size:
-                            cont = False
-                        else:
-                            gyr['t'] = current_time
-                            gyr['gyr'] = _get_gyr(buf)
-                            _write_gyr_data(out_gyr, gyr)
-                    # Pressure sensor packet
-                    elif typ == 0x3:
-                        if header_presst:
-                            out_presst = open(presstfilename, 'w')
-                            _write_presst_header(out_presst, binfilename)
-                            header_presst = False
-                        buf = in_fox.read(presst_size)
-                        if len(buf) != presst_size:
-                            cont = False
-                        else:
-                            presst['t'] = current_time
-                            presst['press'] = _get_press(buf[0:3])
-                            presst['temp'] = _get_temp(buf[4:6])
-                            _write_presst_data(out_presst, presst)
-                    # GPIOs packet
-                    elif typ == 0x8:
-                        if header_gpio:
-                            out_gpio = open(gpiofilename, 'w')
-                            _write_gpio_header(out_gpio, binfilename)
-                            header_gpio = False
-                        buf = in_fox.read(gpio_size)
-                        if len(buf) != gpio_size:
-                            cont = False
-                        else:
-                            gpio['t'] = current_time
-                            gpio['gpio0'] = (_get_gpio(buf[0])) & 1
-                            gpio['gpio1'] = (_get_gpio(buf[0]) >> 1) & 1
-                            gpio['gpio2'] = (_get_gpio(buf[0]) >> 2) & 1
-                            gpio['gpio3'] = (_get_gpio(buf[0]) >> 3) & 1
-                            gpio['gpio4'] = (_get_gpio(buf[0]) >> 4) & 1
-                            _write_gpio_data(out_gpio, gpio)
-
-            in_fox.close()
-            if header_acc is False:
-                out_acc.close()
-            if header_mag is False:
-                out_mag.close()
-            if header_gyr is False:
-                out_gyr.close()
-            if header_presst is False:
-                out_presst.close()
-            if header_gpio is False:
-                out_gpio.close()
-            if err is True:
-                return 'ERROR'
+            sensors[name] = [time, values]
+    return sensors
 
-    return 'OK'
 
+def load_sensors_rawfile(binfilename, dtime=None, deg_s=1, method=None,
+                         dtype=None):
+    """ Load a raw bin HikoB Fox sensors file without intermediate csv files.
+
+    The values are not rounded to the 6 decimals of the csv files.
+
+    Parameters
+    ----------
+    binfilename : str
+                Name of the raw file to load.
+    dtime: float
+            sampling period in seconds used to resample acc, mag and gyr
+            on their common timeline, None to keep their own sample time
+    deg_s : int
+           1 for a linear resampling, 2 to 5 for a local cubic one
+    method : str
+           resampling method ('linear', 'cubic' or 'polyphase' for an
+           anti-aliased decimation), given by deg_s if None
+    dtype : numpy dtype
+           dtype of the sensors values, None for the package dtype
+           (see sensbiotk.precision), the time stays in float64
+
+    Returns
+    -------
+    sensors : dictionnary
+            if dtime is None, for each sensor recorded
+            'acc': [time, acc], 'mag': [time, mag], 'gyr': [time, gyr],
+            'presst': [time, press, temp], 'gpio': [time, gpio]
+            with the same arrays as load_fox*_csvfile, time is [t, dt].
+            None on error.
+    [t_interp, acc_interp, mag_interp, gyr_interp] : numpy.array
+            if dtime is given, as load_foximu_csvfile
+    """
+    with open(binfilename, "rb") as in_fox:
+        header = _read_sensors_header(in_fox)
+        if header is None:
+            return None
+        sensors = _join_packets(list(_iter_raw_packets(in_fox, header)),
+                                dtype=dtype)
+
+    if dtime is None:
+        return sensors
+    [t_acc, acc] = sensors['acc']
+    [t_mag, mag] = sensors['mag']
+    [t_gyr, gyr] = sensors['gyr']
+    return _resample_imu(t_acc, acc, t_mag, mag, t_gyr, gyr, dtime, deg_s,
+                         method, dtype)
+
+
+def iter_raw_blocks(binfilename, block_samples=RAW_BLOCK_SAMPLES, state=None,
+                    dtype=None):
+    """ Iterate over a raw bin HikoB Fox sensors file block by block.
+
+    The file is read and decoded by blocks of at most block_samples
+    packets (all sensors together, one more when a packet straddles
+    two reads) so that the memory used does not depend on the file
+    size. The reads are sized with the smallest packet (gpio), blocks
+    of larger packets hold fewer samples. The time overflow unwrapping
+    and the dt computation are carried from one block to the next one,
+    several iterators can be consumed at the same time.
 
-def load_foxacc_csvfile(filename):
+    Parameters
+    ----------
+    binfilename : str
+                Name of the raw file to read.
+    block_samples : int
+                maximum number of packets decoded at once
+    state : dictionnary
+          if given, decoding state updated at each block (see
+          follow_sensors_rawfile): a later iteration with the same
+          state only yields the packets appended to the file since.
+    dtype : numpy dtype
+          dtype of the sensors values, None for the package dtype
+
+    Returns
+    -------
+    generator of dictionnary
+            for each block, the sensors found in the block with the same
+            arrays as load_sensors_rawfile
+
+    Example
+    -------
+    >>> for sensors in iter_raw_blocks("data/imutest.raw", 1000):
+    ...     if 'acc' in sensors:
+    ...         [time, acc] = sensors['acc']
+    """
+    minsize = 4 + min(PACKET_SIZE.values())
+    with open(binfilename, "rb") as in_fox:
+        header = _read_sensors_header(in_fox)
+        if header is None:
+            raise IOError("%s is not a RAW sensors file." % binfilename)
+        if state is None:
+            state = {}
+        lastt = state.setdefault('lastt', {})
+        for data in _iter_raw_packets(in_fox, header,
+                                      block_samples * minsize, state):
+            sensors = _join_packets([data], lastt, dtype)
+            for name in sensors:
+                lastt[name] = float(sensors[name][0][-1, 0])
+            yield sensors
+
+
+def info_fox_rawfile(binfilename, blocksize=RAW_BLOCK_SIZE):
+    """ Census of the packets of a raw bin HikoB Fox file (any version)
+
+    Only the packet headers are read (see RAW_FORMATS), the sensors
+    values are not decoded.
+
+    Parameters
+    ----------
+    binfilename : str
+                Name of the raw file.
+    blocksize : int
+           number of bytes read at once
+
+    Returns
+    -------
+    info : dictionnary
+         'version', 'acc_scale', 'mag_scale', 'gyr_scale' (header bytes),
+         'scale' (sensors scales), 'packets' (number of packets of each
+         type name, 'unknown' for the others), 'tmin' and 'tmax' (time of
+         the first and last packets, None if there is none), 'size'
+         (file size) and 'truncated' (bytes of the last incomplete
+         packet). None on error.
+
+    Example
+    -------
+    >>> info = info_fox_rawfile("data/imutest.raw")
+    >>> info['packets']['acc']
+    """
+    with open(binfilename, "rb") as in_fox:
+        header = _read_raw_header(in_fox)
+        if header is None:
+            return None
+        fmt = raw_format(header[0])
+        scale = _header_scale(header)
+        counts = np.zeros(1 << (32 - fmt['type_shift']), dtype=np.int64)
+        times = []
+        state = {'offset_time': 0.0, 'prec_time': 0.0}
+        remain = ""
+        while True:
+            buf = in_fox.read(blocksize)
+            if len(buf) == 0:
+                break
+            buf = remain + buf
+            raw = np.frombuffer(buf, dtype=np.uint8)
+            offsets, end = _find_packets(raw, 0, fmt['steps'])
+            remain = buf[end:]
+            if len(offsets) == 0:
+                continue
+            words = raw[offsets[:, np.newaxis] + np.arange(4)]
+            words = words.view("<u4")[:, 0]
+            typ = words >> fmt['type_shift']
+            counts += np.bincount(typ, minlength=len(counts))
+            if fmt['types'] is PACKET_TYPE:
+                ticks = words & 0x0FFFFFFF
+                times.append(_unwrap_time(ticks, state, scale)[[0, -1]])
+            else:
+                # the time is the first 4 bytes of the payload
+                [timed] = np.nonzero([fmt['sizes'].get(code, 0) >= 4
+                                      for code in typ])
+                if len(timed) > 0:
+                    ticks = raw[offsets[timed[[0, -1]], np.newaxis] + 4 +
+                                np.arange(4)]
+                    times.append(scale['time'] * ticks.view("<u4")[:, 0])
+        size = in_fox.tell()
+
+    packets = {}
+    for name, code in fmt['types'].items():
+        packets[name] = int(counts[code])
+        counts[code] = 0
+    packets['unknown'] = int(counts.sum())
+    return {'version': header[0], 'acc_scale': header[1],
+            'mag_scale': header[2], 'gyr_scale': header[3],
+            'scale': scale, 'packets': packets,
+            'tmin': float(times[0][0]) if times else None,
+            'tmax': float(times[-1][-1]) if times else None,
+            'size': size, 'truncated': len(remain)}
+
+
+def load_foxacc_csvfile(filename, dtype=None):
     """ Load Acceleration IMU HikoB Fox Node from a CSV file.
 
     Parameters
     ----------
     filename : str
             Name of the CSV file to load.
+    dtype : numpy dtype
+            dtype of the sensors values, None for the package dtype
+            (see sensbiotk.precision), the time stays in float64
 
     Returns
     -------
     two numpy array which contains [t,dt] and [accx,accy,accz]
 
     """
-    imu_acc = np.loadtxt(filename, delimiter=SEP)
+    imu_acc = load_csv(filename, SEP)
 
     # Split data
     time = imu_acc[:, 0:2]
-    acc = imu_acc[:, 2:5]
+    acc = precision.asfloat(imu_acc[:, 2:5], dtype)
 
     return [time, acc]
 
 
-def load_foxmag_csvfile(filename):
+def load_foxmag_csvfile(filename, dtype=None):
     """ Load Magnetometers IMU HikoB Fox Node from a CSV file.
 
     Parameters
     ----------
     filename : str
             Name of the CSV file to load.
+    dtype : numpy dtype
+            dtype of the sensors values, None for the package dtype
+            (see sensbiotk.precision), the time stays in float64
 
     Returns
     -------
     two numpy array which contains [t,dt] and [magx,magy,magz]
 
     """
-    imu_mag = np.loadtxt(filename, delimiter=SEP)
+    imu_mag = load_csv(filename, SEP)
 
     # Split data
     time = imu_mag[:, 0:2]
-    mag = imu_mag[:, 2:5]
+    mag = precision.asfloat(imu_mag[:, 2:5], dtype)
 
     return [time, mag]
 
 
-def load_foxgyr_csvfile(filename):
+def load_foxgyr_csvfile(filename, dtype=None):
     """ Load Gyrometers IMU HikoB Fox Node from a CSV file.
 
     Parameters
     ----------
     filename : str
             Name of the CSV file to load.
+    dtype : numpy dtype
+            dtype of the sensors values, None for the package dtype
+            (see sensbiotk.precision), the time stays in float64
 
     Returns
     -------
     two numpy array which contains [t,dt] and [gyrx,gyry,gyrz]
 
     """
-    imu_gyr = np.loadtxt(filename, delimiter=SEP)
+    imu_gyr = load_csv(filename, SEP)
 
     # Split data
     time = imu_gyr[:, 0:2]
-    gyr = imu_gyr[:, 2:5]
+    gyr = precision.asfloat(imu_gyr[:, 2:5], dtype)
 
     return [time, gyr]
 
 
-def load_foxpresst_csvfile(filename):
+def load_foxpresst_csvfile(filename, dtype=None):
     """ Load Pression/Temperature HikoB Fox Node from a CSV file.
 
     Parameters
     ----------
     filename: str
             Name of the CSV file to load.
+    dtype : numpy dtype
+            dtype of the pression and temperature, None for the package
+            dtype (see sensbiotk.precision)
 
     Returns
     -------
@@ -855,23 +1297,25 @@ def load_foxpresst_csvfile(filename):
           and temperature (degree). id is an int and time,dt,bar
           and degree are float values.
     """
-    presst = np.loadtxt(filename, delimiter=SEP)
+    presst = load_csv(filename, SEP)
 
     # Split data
     time = presst[:, 0:2]
-    press = presst[:, 2]
-    temp = presst[:, 3]
+    press = precision.asfloat(presst[:, 2], dtype)
+    temp = precision.asfloat(presst[:, 3], dtype)
 
     return [time, press, temp]
 
 
-def load_foxgpio_csvfile(filename):
+def load_foxgpio_csvfile(filename, dtype=None):
     """ Load Gpio HikoB Fox Node from a CSV file.
 
     Parameters
     ----------
     filename : str
             Name of the CSV file to load.
+    dtype : numpy dtype
+            dtype of the gpio, None for the package dtype
 
     Returns
     -------
@@ -880,41 +1324,60 @@ def load_foxgpio_csvfile(filename):
           gpio1 (0/1), gpio2 (0/1)
           gpio3 (0/1), gpio4 (0/1), gpio5 (0/1)
     """
-    gpios = np.loadtxt(filename, delimiter=SEP)
+    gpios = load_csv(filename, SEP)
 
     # Split data
     time = gpios[:, 0:2]
-    gpio = gpios[:, 2:7]
+    gpio = precision.asfloat(gpios[:, 2:7], dtype)
 
     return [time, gpio]
 
 
-def _spline_resample(sig_x, sig_y, sig_xnew, deg_spline):
-    """ Resample signal with B-Spline
+def _resample_imu(t_acc, acc, t_mag, mag, t_gyr, gyr, dtime, deg_s,
+                  method=None, dtype=None):
+    """ Resample IMU signals on their common timeline
 
     Parameters
     ----------
-    sig_x: np.array
-            signal sample time
-    sig_y: np.array
-            signal value
-    sig_xnew: np.array
-             signal sample time for the resampling
-    deg_spline: int
-            the order of the spline fit.  1 <= k <= 5
+    t_acc, t_mag, t_gyr : numpy array
+            [t, dt] of the accelerometers, magnetometers and gyrometers
+    acc, mag, gyr : numpy array
+            [x, y, z] of the accelerometers, magnetometers and gyrometers
+    dtime: float
+            sampling period in seconds
+    deg_s : int
+           1 for a linear resampling, 2 to 5 for a local cubic one
+    method : str
+           resampling method ('linear', 'cubic' or 'polyphase'),
+           given by deg_s if None
+    dtype : numpy dtype
+           dtype of the resampled values, None for the package dtype
+
     Returns
     -------
-    for numpy array which contains the signal resampled
-    sig_xnew
+    [t_interp, acc_interp, mag_interp, gyr_interp] : numpy.array
     """
-    sig = spi.splrep(sig_x, sig_y, k=deg_spline)
-    sig_ynew = spi.splev(sig_xnew, sig)
+    if method is None:
+        method = "linear" if deg_s == 1 else "cubic"
+    # search the common timeline
+    [tmin, tmax] = resample.common_window([t_acc[:, 0], t_mag[:, 0],
+                                           t_gyr[:, 0]])
+    t_interp = np.arange(tmin, tmax, dtime)
+    if t_interp[-1] < tmax:
+        t_interp = np.append(t_interp, [tmax], axis=0)
+    # resample signals
+    signals = []
+    for [time, values] in [[t_acc, acc], [t_mag, mag], [t_gyr, gyr]]:
+        [time, values] = resample.trim(time[:, 0], values, tmin, tmax)
+        signals.append(resample.resample(time, values, t_interp, method,
+                                         dtype))
 
-    return sig_ynew
+    return [t_interp] + signals
 
 
+@cache.cached(3)
 def load_foximu_csvfile(filename_acc, filename_mag, filename_gyr,
-                        dtime, deg_s=1):
+                        dtime, deg_s=1, method=None, dtype=None):
     """ Load IMU HikoB Fox Node from a CSV file version 2
 
     Parameters
@@ -928,7 +1391,16 @@ def load_foximu_csvfile(filename_acc, filename_mag, filename_gyr,
     dtime: float
             sampling period in seconds
     deg_s : int
-           the order of the spline fit used for signal resampling.  1 <= k <= 5
+           1 for a linear resampling, 2 to 5 for a local cubic one
+    method : str
+           resampling method ('linear', 'cubic' or 'polyphase' for an
+           anti-aliased decimation), given by deg_s if None
+    dtype : numpy dtype
+           dtype of the resampled values, None for the package dtype
+           (see sensbiotk.precision), the time stays in float64
+    use_cache : bool
+           load the result from the cache (sensbiotk.io.cache) if the
+           same files were already loaded with the same parameters
 
     Returns
     -------
@@ -939,82 +1411,15 @@ def load_foximu_csvfile(filename_acc, filename_mag, filename_gyr,
     """
 
     # load IMU signals with their own sample time
-    [t_acc, acc] = load_foxacc_csvfile(filename_acc)
-    [t_mag, mag] = load_foxmag_csvfile(filename_mag)
-    [t_gyr, gyr] = load_foxgyr_csvfile(filename_gyr)
-    # search the common timeline
-    tmin = np.max([t_acc[0, 0], t_mag[0, 0], t_gyr[0, 0]])
-    tmax = np.min([t_acc[-1, 0], t_mag[-1, 0], t_gyr[-1, 0]])
-    t_interp = np.arange(tmin, tmax, dtime)
-    if t_interp[-1] < tmax:
-        t_interp = np.append(t_interp, [tmax], axis=0)
-    # Trunk signals to keep the common timeline
-    index = 0
-    while t_acc[index, 0] < tmin:
-        t_acc[index, 0] = np.delete(t_acc[index, 0], index, axis=0)
-        acc[index, 0] = np.delete(acc[index, 0], index, axis=0)
-        index = index+1
-    index = 0
-    while t_mag[index, 0] < tmin:
-        t_mag[index, 0] = np.delete(t_mag[index, 0], index, axis=0)
-        mag[index, 0] = np.delete(mag[index, 0], index, axis=0)
-        index = index+1
-    index = 0
-    while t_gyr[index, 0] < tmin:
-        t_gyr[index, 0] = np.delete(t_gyr[index, 0], index, axis=0)
-        gyr[index, 0] = np.delete(gyr[index, 0], index, axis=0)
-        index = index+1
-    index = -1
-    while t_acc[index, 0] > tmax:
-        t_acc[index, 0] = np.delete(t_acc[index, 0], index, axis=0)
-        acc[index, 0] = np.delete(acc[index, 0], index, axis=0)
-        index = index-1
-    index = -1
-    while t_mag[index, 0] > tmax:
-        t_mag[index, 0] = np.delete(t_mag[index, 0], index, axis=0)
-        mag[index, 0] = np.delete(mag[index, 0], index, axis=0)
-        index = index-1
-    index = -1
-    while t_gyr[index, 0] > tmax:
-        t_gyr[index, 0] = np.delete(t_gyr[index, 0], index, axis=0)
-        gyr[index, 0] = np.delete(gyr[index, 0], index, axis=0)
-        index = index-1
-    # initialize signals array
-    s_size = len(t_interp)
-    acc_interp = np.zeros((s_size, 3))
-    mag_interp = np.zeros((s_size, 3))
-    gyr_interp = np.zeros((s_size, 3))
-    # resample signals
-    acc_interp[:, 0] = _spline_resample(t_acc[:, 0], acc[:, 0],
-                                        t_interp, deg_s)
-    acc_interp[:, 1] = _spline_resample(t_acc[:, 0], acc[:, 1],
-                                        t_interp, deg_s)
-    acc_interp[:, 2] = _spline_resample(t_acc[:, 0], acc[:, 2],
-                                        t_interp, deg_s)
-    mag_interp[:, 0] = _spline_resample(t_mag[:, 0], mag[:, 0],
-                                        t_interp, deg_s)
-    mag_interp[:, 1] = _spline_resample(t_mag[:, 0], mag[:, 1],
-                                        t_interp, deg_s)
-    mag_interp[:, 2] = _spline_resample(t_mag[:, 0], mag[:, 2],
-                                        t_interp, deg_s)
-    gyr_interp[:, 0] = _spline_resample(t_gyr[:, 0], gyr[:, 0],
-                                        t_interp, deg_s)
-    gyr_interp[:, 1] = _spline_resample(t_gyr[:, 0], gyr[:, 1],
-                                        t_interp, deg_s)
-    gyr_interp[:, 2] = _spline_resample(t_gyr[:, 0], gyr[:, 2],
-                                        t_interp, deg_s)
-
-    # py.plot(t_interp, gyr_interp[:, 0], 'bo-')
-    # py.plot(t_gyr[:, 0], gyr[:, 0], 'ro-')
-    # py.figure()
-    # py.plot(t_interp, acc_interp[:, 0], 'bo-')
-    #  py.plot(t_acc[:, 0], acc[:, 0], 'ro-')
-    # py.show()
-
-    return [t_interp, acc_interp, mag_interp, gyr_interp]
-
-
-def load_foxcsvfile(filename):
+    [t_acc, acc] = load_foxacc_csvfile(filename_acc, dtype)
+    [t_mag, mag] = load_foxmag_csvfile(filename_mag, dtype)
+    [t_gyr, gyr] = load_foxgyr_csvfile(filename_gyr, dtype)
+    return _resample_imu(t_acc, acc, t_mag, mag, t_gyr, gyr, dtime, deg_s,
+                         method, dtype)
+
+
+@cache.cached(1)
+def load_foxcsvfile(filename, dtype=None):
     """ Load IMU HikoB Fox Node data from a CSV file version 2\n
     id    t    dt    ax    ay    az    mx    my    mz    gx    gy    gz\n
     columns are separated by a tab
@@ -1023,6 +1428,12 @@ def load_foxcsvfile(filename):
     ----------
     filename : str
     Name of the CSV file containing inertial data
+    dtype : numpy dtype
+    dtype of the sensors values, None for the package dtype (see
+    sensbiotk.precision), the time stays in float64
+    use_cache : bool
+    load the result from the cache (sensbiotk.io.cache) if the file
+    was already loaded
 
     Return
     -------
@@ -1038,22 +1449,126 @@ def load_foxcsvfile(filename):
     gyrz : numpy.array
     """
 
-    data = np.loadtxt(filename, delimiter='\t')
+    data = load_csv(filename, "\t", usecols=[1, 3, 4, 5, 6, 7, 8, 9, 10, 11])
 
-    time = data[:, 1]
-    accx = data[:, 3]
-    accy = data[:, 4]
-    accz = data[:, 5]
-    magx = data[:, 6]
-    magy = data[:, 7]
-    magz = data[:, 8]
-    gyrx = data[:, 9]
-    gyry = data[:, 10]
-    gyrz = data[:, 11]
+    time = data[:, 0]
+    values = precision.asfloat(data[:, 1:], dtype)
+    accx = values[:, 0]
+    accy = values[:, 1]
+    accz = values[:, 2]
+    magx = values[:, 3]
+    magy = values[:, 4]
+    magz = values[:, 5]
+    gyrx = values[:, 6]
+    gyry = values[:, 7]
+    gyrz = values[:, 8]
 
     return [time, accx, accy, accz, magx, magy, magz, gyrx, gyry, gyrz]
 
 
+def _load_imu_signals(source, dtype=None):
+    """ Load the acc, mag and gyr signals of an IMU with their own time
+
+    Parameters
+    ----------
+    source : str or list of str
+           RAW file, csv signals file (see load_foxcsvfile) or
+           [acc, mag, gyr] csv files
+    dtype : numpy dtype
+          dtype of the sensors values
+
+    Returns
+    -------
+    signals : list
+            [[t_acc, acc], [t_mag, mag], [t_gyr, gyr]], t_* being the
+            sample time vectors
+    """
+    if not isinstance(source, basestring):
+        signals = [load_foxacc_csvfile(source[0], dtype),
+                   load_foxmag_csvfile(source[1], dtype),
+                   load_foxgyr_csvfile(source[2], dtype)]
+        return [[time[:, 0], values] for [time, values] in signals]
+    if source.lower().endswith(".raw"):
+        sensors = load_sensors_rawfile(source, dtype=dtype)
+        if sensors is None:
+            raise IOError("%s is not a RAW sensors file." % source)
+        return [[sensors[name][0][:, 0], sensors[name][1]]
+                for name in ['acc', 'mag', 'gyr']]
+    data = load_foxcsvfile(source, dtype)
+    return [[data[0], np.column_stack(data[index:index + 3])]
+            for index in [1, 4, 7]]
+
+
+def load_multi_imu(files, dtime, deg_s=1, method=None, workers=None,
+                   dtype=None):
+    """ Load several IMUs on a shared time base
+
+    The IMUs are decoded in parallel worker processes, then their
+    signals are resampled on the time window common to all of them.
+    The IMUs time must have the same origin (synchronized nodes).
+
+    Parameters
+    ----------
+    files : list
+          for each IMU, a RAW file, a csv signals file (see
+          load_foxcsvfile) or a list of its [acc, mag, gyr] csv files
+    dtime: float
+            sampling period in seconds
+    deg_s : int
+           1 for a linear resampling, 2 to 5 for a local cubic one
+    method : str
+           resampling method ('linear', 'cubic' or 'polyphase'),
+           given by deg_s if None
+    workers : int
+            number of worker processes, None for one per IMU (at most
+            the number of cpus), 1 to load in the current process
+    dtype : numpy dtype
+          dtype of the IMUs values, None for the package dtype (see
+          sensbiotk.precision), the time stays in float64
+
+    Returns
+    -------
+    [time, imus] : numpy array
+            time (n_samples,) and imus (n_imu, n_samples, 9) with
+            [accx, accy, accz, magx, magy, magz, gyrx, gyry, gyrz]
+            for each IMU and sample
+
+    Examples
+    --------
+    >>> [time, imus] = load_multi_imu(["trunk.raw", "thigh.raw"], 0.01)
+    >>> acc_trunk = imus[0, :, 0:3]
+    """
+    dtype = precision.get_dtype(dtype)
+    load = functools.partial(_load_imu_signals, dtype=dtype)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(files))
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        imus = pool.map(load, files)
+        pool.close()
+        pool.join()
+    else:
+        imus = [load(source) for source in files]
+
+    if method is None:
+        method = "linear" if deg_s == 1 else "cubic"
+    [tmin, tmax] = resample.common_window(
+        [time for signals in imus for [time, _] in signals])
+    if tmax < tmin:
+        raise ValueError("The IMUs records do not overlap.")
+    t_interp = np.arange(tmin, tmax, dtime)
+    if len(t_interp) == 0 or t_interp[-1] < tmax:
+        t_interp = np.append(t_interp, [tmax], axis=0)
+    data = np.empty((len(files), len(t_interp), 9), dtype=dtype)
+    for [index, signals] in enumerate(imus):
+        for [column, [time, values]] in enumerate(signals):
+            [time, values] = resample.trim(time, values, tmin, tmax)
+            data[index, :, 3 * column:3 * column + 3] = \
+                resample.resample(time, values, t_interp, method, dtype)
+    return [t_interp, data]
+
+
 def save_foxsignals_csvfile(time, acc, mag, gyr, filename):
     """ save a ascii csv file with the following structure using
          time, acc, mag and gyr numpy arrays:
@@ -1078,20 +1593,13 @@ def save_foxsignals_csvfile(time, acc, mag, gyr, filename):
     status : str
              'OK' or 'ERROR'
     """
-    out = open(filename[:-3] + 'csv', 'w')
-    _write_header(out, "sensbiotk output")
-
-    data = {'t': 0.0, 'acc': [0.0, 0.0, 0.0], 'mag': [0.0, 0.0, 0.0],
-            'gyr': [0.0, 0.0, 0.0]}
-
-    for index in range(0, len(time)):
-        data['t'] = time[index]
-        data['acc'] = acc[index, :]
-        data['mag'] = mag[index, :]
-        data['gyr'] = gyr[index, :]
-        _write_data(out, data)
-
-    out.close()
+    with CsvWriter(filename[:-3] + 'csv', "\t", delta=True,
+                   counter=1) as writer:
+        _write_header(writer.fid, "sensbiotk output")
+        writer.write([np.asarray(time, dtype=float)] +
+                     list(np.asarray(acc, dtype=float).T) +
+                     list(np.asarray(mag, dtype=float).T) +
+                     list(np.asarray(gyr, dtype=float).T))
 
     return 'OK'
 
@@ -1114,18 +1622,10 @@ def save_foxacc_csvfile(accfilename, time, acc):
              'OK' or 'ERROR'
     """
 
-    out_acc = open(accfilename, 'w')
-
-    _write_acc_header(out_acc, "sensbiotk output")
-
-    data = {'t': 0.0, 'acc': [0.0, 0.0, 0.0]}
-
-    for index in range(0, len(time)):
-        data['t'] = time[index, 0]
-        data['acc'] = acc[index, :]
-        _write_acc_data(out_acc, data)
-
-    out_acc.close()
+    with CsvWriter(accfilename, SEP, "\r\n", delta=True) as writer:
+        _write_acc_header(writer.fid, "sensbiotk output")
+        writer.write([np.asarray(time[:, 0], dtype=float)] +
+                     list(np.asarray(acc, dtype=float).T))
 
     return 'OK'
 
@@ -1148,18 +1648,10 @@ def save_foxmag_csvfile(magfilename, time, mag):
              'OK' or 'ERROR'
     """
 
-    out_mag = open(magfilename, 'w')
-
-    _write_mag_header(out_mag, "sensbiotk output")
-
-    data = {'t': 0.0, 'mag': [0.0, 0.0, 0.0]}
-
-    for index in range(0, len(time)):
-        data['t'] = time[index, 0]
-        data['mag'] = mag[index, :]
-        _write_mag_data(out_mag, data)
-
-    out_mag.close()
+    with CsvWriter(magfilename, SEP, "\n", delta=True) as writer:
+        _write_mag_header(writer.fid, "sensbiotk output")
+        writer.write([np.asarray(time[:, 0], dtype=float)] +
+                     list(np.asarray(mag, dtype=float).T))
 
     return 'OK'
 
@@ -1182,17 +1674,9 @@ def save_foxgyr_csvfile(gyrfilename, time, gyr):
              'OK' / 'ERROR'
     """
 
-    out_gyr = open(gyrfilename, 'w')
-
-    _write_gyr_header(out_gyr, "sensbiotk output")
-
-    data = {'t': 0.0, 'gyr': [0.0, 0.0, 0.0]}
-
-    for index in range(0, len(time)):
-        data['t'] = time[index, 0]
-        data['gyr'] = gyr[index, :]
-        _write_gyr_data(out_gyr, data)
-
-    out_gyr.close()
+    with CsvWriter(gyrfilename, SEP, "\r\n", delta=True) as writer:
+        _write_gyr_header(writer.fid, "sensbiotk output")
+        writer.write([np.asarray(time[:, 0], dtype=float)] +
+                     list(np.asarray(gyr, dtype=float).T))
 
     return 'OK'
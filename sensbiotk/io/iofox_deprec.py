@@ -20,245 +20,18 @@ Loader for HikoB Fox Node format - deprecated data format
 """
 
 import numpy as np
-import struct
+from sensbiotk.io import iofox
+from sensbiotk.io.csvwriter import CsvWriter
+# Sensors scales and raw format shared with the current format
+from sensbiotk.io.iofox import LSM303DLHC_ACC_SCALE, LSM303DLHC_MAG_SCALE, \
+    L3G4200D_SCALE
 
 # pylint:disable= I0011, E1101, R0912, R0913, R0914, R0915
 # E1101 no-member false positif
 
-# Global dictionnaries
-LSM303DLHC_ACC_SCALE = {'2g': 0x00, '4g': 0x10, '8g': 0x20, '16g': 0x30}
-LSM303DLHC_MAG_SCALE = {'1_3gauss': 0x20, '1_9gauss': 0x40, '2_5gauss': 0x60,
-                        '4_0gauss': 0x80, '4_7gauss': 0xA0, '5_6gauss': 0xC0,
-                        '8_1gauss': 0xE0}
-L3G4200D_SCALE = {'250dps': 0x00, '500dps': 0x10, '2000dps': 0x30}
-SCALE = {'ref_g': 9.81, 'time': 1e-3,
-         'acc': 2.0e-2, 'mag_xy': (1.0 / 670.0), 'mag_z': (1.0 / 600.0),
-         'press': 1.0 / 4096.0 / 1000.0, 'temp': 1.0 / 480.0,
-         'offset_temp': 22.5}
 SEP = "\t"
 
 
-def _get_acc_scale():
-    """ get accelerometer scale
-
-    Returns
-    -------
-    accelerometer : array of float
-                  It contains [scale, min, max].
-    """
-    scale = SCALE['acc']
-    return [scale, -2048 * scale, 2047 * scale]
-
-
-def _get_magxy_scale():
-    """g et magnetometer scale
-
-    Returns
-    -------
-    magnetometer : array of float
-                 It contains [scale, min, max]
-    """
-    scale = SCALE['mag_xy']
-    return [scale, -2048 * scale, 2047 * scale]
-
-
-def _get_gyr_scale():
-    """ get gyrometer scale
-
-    Returns
-    -------
-    gyrometer : array of float
-              It contains [scale, min, max]
-    """
-    scale = SCALE['gyr']
-    return [scale, -32768 * scale, 32767 * scale]
-
-
-def _get_time(rawval):
-    """ get time value from a binary format
-
-    Parameters :
-    ------------
-    rawval: binary format
-            time value
-
-    Returns :
-    ---------
-    time : float
-         value in second
-    """
-    val = struct.unpack("=HH", rawval)
-    return SCALE['time'] * (val[1] * 65536 + val[0])
-
-
-def _get_acc(rawval):
-    """ get accelerometer values  from a binary format
-
-    Parameters
-    ----------
-    rawval: binary format
-            accelerometer values
-
-    Returns
-    -------
-    accelerometer : numpy array of float
-                  3 axis values  [ax,ay,az] in m/s^2
-    """
-    val = struct.unpack("=hhh", rawval)
-    return SCALE['acc']*np.array([val[0], val[1], val[2]], dtype=float)
-
-
-def _get_mag(rawval):
-    """get magnetometer values  from a binary format
-
-    Parameters :
-    ------------
-    rawval: binary format
-          magnetometer values in gauss
-
-    Returns :
-    ---------
-    magnetometer : numpy array of float
-                 3 axis values [ax,ay,az]
-    """
-    val = struct.unpack("=hhh", rawval)
-    return np.array([SCALE['mag_xy']*val[0], SCALE['mag_xy']*val[1],
-                     SCALE['mag_z']*val[2]], dtype=float)
-
-
-def _get_gyr(rawval):
-    """ get gyrometer values  from a binary format
-
-    Parameters
-    ----------
-    rawval: binary format
-            gyrometer values
-
-    Returns
-    -------
-    gyrometer : numpy array of float
-              3 axis values [ax,ay,az] in rad/s
-    """
-    val = struct.unpack("=hhh", rawval)
-    return SCALE['gyr'] * np.array([val[0], val[1], val[2]], dtype=float)
-
-
-def _get_press(rawval):
-    """ get pression value from a binary format
-
-    Parameters
-    ----------
-    rawval: binary format
-          pression value
-
-    Returns
-    -------
-    pression : float
-             value in bar
-    """
-    val = struct.unpack("=BBB", rawval)
-    return SCALE['press'] * (val[0] + (val[1] << 8) + (val[2] << 16))
-
-
-def _get_temp(rawval):
-    """ get temperature value from a binary format
-
-    Parameters
-    ----------
-    rawval: binary format
-            temperature value
-
-    Returns
-    -------
-    temperature : float
-                value in degree
-    """
-    val = struct.unpack("=h", rawval)
-    return SCALE['offset_temp'] + SCALE['temp'] * val[0]
-
-
-def _set_time_scale(val):
-    """ set time scale value
-
-    Parameters
-    ----------
-    val: float
-         time scale in second
-    """
-    SCALE['time'] = val
-
-    return
-
-
-def _set_acc_scale(val):
-    """ set accelerometer scale value
-
-    Parameters
-    ----------
-    val: float
-        accelerometer scale value in m/s^2
-    """
-    if val == LSM303DLHC_ACC_SCALE['2g']:
-        SCALE['acc'] = 1e-3 * SCALE['ref_g']
-    elif val == LSM303DLHC_ACC_SCALE['4g']:
-        SCALE['acc'] = 2e-3 * SCALE['ref_g']
-    elif val == LSM303DLHC_ACC_SCALE['8g']:
-        SCALE['acc'] = 4e-3 * SCALE['ref_g']
-    elif val == LSM303DLHC_ACC_SCALE['16g']:
-        SCALE['acc'] = 12e-3 * SCALE['ref_g']
-    return
-
-
-def _set_mag_scale(val):
-    """ set magnetometer scale value
-
-    Parameters
-    ----------
-    val: magnetometer scale value
-    """
-    if val == LSM303DLHC_MAG_SCALE['1_3gauss']:
-        SCALE['mag_xy'] = 1.0 / 1100.0
-        SCALE['mag_z'] = 1.0 / 980.0
-    elif val == LSM303DLHC_MAG_SCALE['1_9gauss']:
-        SCALE['mag_xy'] = 1.0 / 850.0
-        SCALE['mag_z'] = 1.0 / 760.0
-    elif val == LSM303DLHC_MAG_SCALE['2_5gauss']:
-        SCALE['mag_xy'] = 1.0 / 670.0
-        SCALE['mag_z'] = 1.0 / 600.0
-    elif val == LSM303DLHC_MAG_SCALE['4_0gauss']:
-        SCALE['mag_xy'] = 1.0 / 450.0
-        SCALE['mag_z'] = 1.0 / 400.0
-    elif val == LSM303DLHC_MAG_SCALE['4_7gauss']:
-        SCALE['mag_xy'] = 1.0 / 400.0
-        SCALE['mag_z'] = 1.0 / 355.0
-    elif val == LSM303DLHC_MAG_SCALE['5_6gauss']:
-        SCALE['mag_xy'] = 1.0 / 330.0
-        SCALE['mag_z'] = 1.0 / 295.0
-    elif val == LSM303DLHC_MAG_SCALE['8_1gauss']:
-        SCALE['mag_xy'] = 1.0 / 230.0
-        SCALE['mag_z'] = 1.0 / 205.0
-
-    return
-
-
-def _set_gyr_scale(val):
-    """ set gyrometer scale value
-
-    Parameters
-    ----------
-    val: float
-         gyrometer scale value in rad/sec
-    """
-    if val == L3G4200D_SCALE['250dps']:
-        SCALE['gyr'] = 8.75e-3 * np.pi / 180.0
-    elif val == L3G4200D_SCALE['500dps']:
-        SCALE['gyr'] = 1.75e-2 * np.pi / 180.0
-    elif val == L3G4200D_SCALE['2000dps']:
-        SCALE['gyr'] = 7e-2 * np.pi / 180.0
-
-    return
-
-
 def _write_imu_header(fid, binfilename):
     """ write the IMU header file
 
@@ -286,33 +59,6 @@ def _write_imu_header(fid, binfilename):
     return
 
 
-def _write_imu_data(fid, data):
-    """ write a IMU data line
-
-    Parameters
-    ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys definded must be :
-    'id':int, 't':float, 'acc':[float,float,float],
-    'mag':[float,float,float],'gyr':[float,float,float]
-    """
-
-    lineformat = "%s\t%f\t%f\t%f\t%f\t%f\t%f\t%f\t%f\t%f\t%f\t%f\r\n"
-    delta = data['t'] - _write_presst_data.lastt
-    line = lineformat % (data['id'], data['t'], delta,
-                         data['acc'][0], data['acc'][1], data['acc'][2],
-                         data['mag'][0], data['mag'][1], data['mag'][2],
-                         data['gyr'][0], data['gyr'][1], data['gyr'][2])
-    fid.write(line)
-    _write_imu_data.lastt = data['t']
-
-    return
-
-_write_imu_data.lastt = 0
-
-
 def _write_presst_header(fid, binfilename):
     """ Write the pression and temperature header file.
 
@@ -337,32 +83,12 @@ def _write_presst_header(fid, binfilename):
     return
 
 
-def _write_presst_data(fid, data):
-    """ Write a pression and temperature data line.
-
-    Parameters
-    ----------
-    fid : file object opened
-        file to be writted
-    data: dictionnary
-        The keys defined must be :
-    'id':int, 't':float, 'pression':float, 'temperature':float
-    """
-    lineformat = "%s\t%f\t%f\t%f\t%f\r\n"
-    delta = data['t'] - _write_presst_data.lastt
-    line = lineformat % (data['id'], data['t'],
-                         delta, data['press'], data['temp'])
-    fid.write(line)
-    _write_presst_data.lastt = data['t']
-
-    return
-
-_write_presst_data.lastt = 0
-
-
 def convert_fox_rawfile(binfilename, imufilename, presstfilename):
     """ Convert a raw bin HikoB Fox file into an ascii csv files.
 
+    The packets are decoded by blocks with the decoder registered for the
+    file version (see iofox.RAW_FORMATS).
+
     Parameters
     ----------
     binfilename : str
@@ -375,91 +101,40 @@ def convert_fox_rawfile(binfilename, imufilename, presstfilename):
     Returns
     -------
     status : str
-             "OK" or "ERROR"
+             "OK" or "ERROR". Sensors files (version 4 and later, see
+             iofox.convert_sensors_rawfile) give "ERROR" and no csv
+             file.
     """
 
     with open(binfilename, "rb") as in_fox:
-        out_imu = open(imufilename, 'w')
-        out_presst = open(presstfilename, 'w')
-        # Read Header Name
-        buf = in_fox.read(5)
-        if len(buf) != 5:
-            print "Error while reading file"
+        header = iofox._read_raw_header(in_fox)
+        if header is None:
             return "ERROR"
-        else:
-            name = struct.unpack("=ccccc", buf)
-            if "".join(name) != "HiKoB":
-                print "Error while reading file"
-                return "ERROR"
-        # Read Scale
-        buf = in_fox.read(4)
-        if len(buf) != 4:
-            print "Error while reading file"
+        if iofox.raw_format(header[0])['types'] is not iofox.FOX_PACKET_TYPE:
+            print "File version: ", header[0], " is not a deprecated one"
             return "ERROR"
-        else:
-            val = struct.unpack("=BBBB", buf)
-            version = val[0]
-            _set_acc_scale(val[1])
-            _set_mag_scale(val[2])
-            _set_gyr_scale(val[3])
-            if version < 2:
-                _set_time_scale(1e-3)
-                imu_size = 22
-                presst_size = 9
+        out_imu = CsvWriter(imufilename, SEP)
+        out_presst = CsvWriter(presstfilename, SEP)
+        _write_imu_header(out_imu.fid, binfilename)
+        _write_presst_header(out_presst.fid, binfilename)
+        # time of the last pression packet, the IMU dt is relative to it
+        lastt = 0.0
+        for data in iofox._iter_raw_packets(in_fox, header):
+            # prev: pression time before each packet, rank: packet index
+            if 'presst' in data:
+                [time, ident, values, rank] = data['presst']
+                prev = np.concatenate([[lastt], time])
+                out_presst.write([ident.astype(np.int64), time,
+                                  time - prev[:-1], values[:, 0],
+                                  values[:, 1]])
             else:
-                _set_time_scale(1.0 / 32768.0)
-                imu_size = 22
-                presst_size = 10
-            # Read data packets
-            cont = True
-            imu = {'id': 0, 't': 0.0, 'acc': [0.0, 0.0, 0.0],
-                   'mag': [0.0, 0.0, 0.0], 'gyr': [0.0, 0.0, 0.0]}
-            presst = {'id': 0, 't': 0.0, 'press': 0.0, 'temp': 0.0}
-            _write_imu_header(out_imu, binfilename)
-            _write_presst_header(out_presst, binfilename)
-
-            while cont is True:
-                buf = in_fox.read(4)
-                if len(buf) != 4:
-                    cont = False
-                else:
-                    idb = struct.unpack("=HH", buf)
-                    sensid = idb[1] * 65536 + idb[0]
-                    if version == 0:
-                        typ = sensid >> 30
-                    else:
-                        typ = sensid >> 28
-                    if typ == 0:
-                        buf = in_fox.read(imu_size)
-                        if len(buf) != imu_size:
-                            cont = False
-                        else:
-                            if version == 0:
-                                imu['id'] = sensid & (0x3FFFFFFF)
-                            else:
-                                imu['id'] = sensid & (0x0FFFFFFF)
-                            imu['t'] = _get_time(buf[0:4])
-                            imu['acc'] = _get_acc(buf[4:10])
-                            imu['mag'] = _get_mag(buf[10:16])
-                            imu['gyr'] = _get_gyr(buf[16:22])
-                            _write_imu_data(out_imu, imu)
-                    elif typ == 3:
-                        buf = in_fox.read(presst_size)
-                        if len(buf) != presst_size:
-                            cont = False
-                        else:
-                            if version == 0:
-                                presst['id'] = sensid & (0x3FFFFFFF)
-                            else:
-                                presst['id'] = sensid & (0x0FFFFFFF)
-                            presst['t'] = _get_time(buf[0:4])
-                            presst['press'] = _get_press(buf[4:7])
-                            presst['temp'] = _get_temp(buf[8:10])
-                            _write_presst_data(out_presst, presst)
-
-                        if len(buf) != 10:
-                            cont = False
-        in_fox.close()
+                [prev, rank] = [np.array([lastt]), np.zeros(0, dtype=int)]
+            if 'imu' in data:
+                [time, ident, values, imu_rank] = data['imu']
+                delta = time - prev[np.searchsorted(rank, imu_rank)]
+                out_imu.write([ident.astype(np.int64), time, delta] +
+                              [values[:, axis] for axis in range(9)])
+            lastt = prev[-1]
         out_imu.close()
         out_presst.close()
 
@@ -473,11 +148,14 @@ def info_fox_rawfile(binfilename):
     ----------
     filename : str
              Name of the bin file to load.
-    """
 
-    ret = convert_fox_rawfile(binfilename, "imuf.txt", "press.txt")
+    Returns
+    -------
+    info : dictionnary
+         see iofox.info_fox_rawfile, None on error
+    """
 
-    return ret
+    return iofox.info_fox_rawfile(binfilename)
 
 
 def load_foximu_csvfile(filename):
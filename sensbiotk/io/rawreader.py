@@ -0,0 +1,253 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2014  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Memory mapped reader for HikoB Fox Node RAW files with time range queries
+"""
+
+import os
+import mmap
+import numpy as np
+from sensbiotk.io import iofox
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+INDEX_STEP = 4096
+INDEX_SUFFIX = ".idx.npz"
+_INDEX_FIELDS = ['offset', 'tmin', 'tmax', 'offset_time', 'prec_time'] + \
+    ['lastt_' + _name for _name in iofox.PACKET_TYPE]
+
+
+class FoxRawReader(object):
+    """ Memory mapped reader of a RAW HikoB Fox sensors file
+
+    A sparse index of the packets (one entry every index_step packets)
+    gives the file offset, the time range, the time unwrapping state and
+    the time of the preceding packet of each sensor for each chunk of
+    packets, so that a time window is read by decoding
+    only the chunks it covers. The index is saved next to the RAW file
+    (binfilename + INDEX_SUFFIX) and rebuilt when the RAW file changes.
+
+    Example
+    -------
+    >>> with FoxRawReader("data/imutest.raw") as reader:
+    ...     sensors = reader.read(10.0, 12.0, sensors=('acc', 'gyr'))
+    """
+
+    def __init__(self, binfilename, index_step=INDEX_STEP, sidecar=True):
+        """ Open and index a RAW sensors file
+
+        Parameters
+        ----------
+        binfilename : str
+                    Name of the raw file to read.
+        index_step : int
+                   number of packets between two index entries
+        sidecar : bool
+                load/save the index in the binfilename + INDEX_SUFFIX file
+        """
+        self.binfilename = binfilename
+        self.index_step = index_step
+        self._fid = open(binfilename, "rb")
+        self.header = iofox._read_sensors_header(self._fid)
+        if self.header is None:
+            self._fid.close()
+            raise IOError("%s is not a RAW sensors file." % binfilename)
+        self.scale = iofox._header_scale(self.header)
+        self._map = mmap.mmap(self._fid.fileno(), 0, access=mmap.ACCESS_READ)
+        self._raw = np.frombuffer(self._map, dtype=np.uint8)
+        self.index = None
+        if sidecar:
+            self.index = self._load_index()
+        if self.index is None:
+            self.index = self._build_index()
+            if sidecar:
+                self._save_index()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Close the RAW file """
+        self._raw = None
+        self._map.close()
+        self._fid.close()
+        return
+
+    def time_range(self):
+        """ Time range of the recording
+
+        Returns
+        -------
+        [tmin, tmax] : float
+                 first and last packet time in second
+        """
+        if len(self.index['offset']) == 0:
+            return [0.0, 0.0]
+        return [self.index['tmin'].min(), self.index['tmax'].max()]
+
+    def read(self, time0, timef, sensors=None):
+        """ Read the sensors data recorded between time0 and timef
+
+        Parameters
+        ----------
+        time0 : float
+              initial time of the window
+        timef : float
+              final time of the window
+        sensors : list of str
+                sensors to read ('acc', 'mag', 'gyr', 'presst', 'gpio'),
+                None for all of them
+
+        Returns
+        -------
+        sensors : dictionnary
+                for each sensor found in the window, the same arrays as
+                iofox.load_sensors_rawfile
+        """
+        index = self.index
+        chunks = np.nonzero((index['tmax'] >= time0) &
+                            (index['tmin'] <= timef))[0]
+        if len(chunks) == 0:
+            return {}
+        first = chunks[0]
+        last = chunks[-1] + 1
+        start = index['offset'][first]
+        if last < len(index['offset']):
+            stop = index['offset'][last]
+        else:
+            stop = index['end']
+        state = {'offset_time': index['offset_time'][first],
+                 'prec_time': index['prec_time'][first]}
+        lastt = dict([(name, index['lastt_' + name][first])
+                      for name in iofox.PACKET_TYPE])
+
+        raw = self._raw[start:stop]
+        offsets = iofox._find_packets(raw)[0]
+        data = iofox._decode_packets(raw, offsets, state, sensors,
+                                     self.scale)
+        data = iofox._join_packets([data], lastt)
+        for name in data.keys():
+            time = data[name][0][:, 0]
+            mask = (time >= time0) & (time <= timef)
+            if np.any(mask):
+                data[name] = [val[mask] for val in data[name]]
+            else:
+                del data[name]
+        return data
+
+    def _build_index(self):
+        """ Scan the packets headers to build the index
+
+        Returns
+        -------
+        index : dictionnary
+              'offset', 'tmin', 'tmax', 'offset_time', 'prec_time' and
+              'lastt_<sensor>' arrays of the chunks and 'end' offset of
+              the last packet end
+        """
+        step = self.index_step
+        state = {'offset_time': 0.0, 'prec_time': 0.0}
+        entries = dict([(field, []) for field in _INDEX_FIELDS])
+        # packets of the current chunk not yet indexed
+        pending = [np.zeros(0, np.int64), np.zeros(0), np.zeros(0),
+                   np.zeros(0, np.uint32)]
+        prec = [0.0, 0.0]
+        lastt = dict([(name, 0.0) for name in iofox.PACKET_TYPE])
+        pos = iofox.RAW_HEADER_SIZE
+        while True:
+            raw = self._raw[pos:pos + iofox.RAW_BLOCK_SIZE]
+            [offsets, end] = iofox._find_packets(raw)
+            last = len(offsets) == 0 or pos + end >= len(self._raw)
+            if len(offsets) > 0:
+                header = raw[offsets[:, np.newaxis] + np.arange(4)]
+                header = header.view("<u4")[:, 0]
+                ticks = header & 0x0FFFFFFF
+                time = iofox._unwrap_time(ticks, state, self.scale)
+                offset_time = time - self.scale['time'] * ticks
+                pending = [np.concatenate([pending[0], pos + offsets]),
+                           np.concatenate([pending[1], time]),
+                           np.concatenate([pending[2], offset_time]),
+                           np.concatenate([pending[3], header >> 28])]
+            pos += end
+            nchunks = len(pending[0]) // step
+            if last and len(pending[0]) > nchunks * step:
+                nchunks += 1
+            for chunk in range(nchunks):
+                [offset, time, offset_time, typ] = \
+                    [val[chunk * step:(chunk + 1) * step] for val in pending]
+                entries['offset'].append(offset[0])
+                entries['tmin'].append(time.min())
+                entries['tmax'].append(time.max())
+                entries['offset_time'].append(prec[0])
+                entries['prec_time'].append(prec[1])
+                prec = [offset_time[-1], time[-1]]
+                for name, code in iofox.PACKET_TYPE.items():
+                    entries['lastt_' + name].append(lastt[name])
+                    sensor_time = time[typ == code]
+                    if len(sensor_time) > 0:
+                        lastt[name] = sensor_time[-1]
+            pending = [val[nchunks * step:] for val in pending]
+            if last:
+                break
+
+        index = dict([(field, np.array(entries[field]))
+                      for field in _INDEX_FIELDS])
+        index['offset'] = index['offset'].astype(np.int64)
+        index['end'] = pos
+        return index
+
+    def _index_key(self):
+        """ RAW file size, modification time and index step """
+        stat = os.stat(self.binfilename)
+        return np.array([stat.st_size, stat.st_mtime, self.index_step])
+
+    def _load_index(self):
+        """ Load the index sidecar file if it is up to date
+
+        Returns
+        -------
+        index : dictionnary
+              see _build_index, None if not found or out of date
+        """
+        filename = self.binfilename + INDEX_SUFFIX
+        if not os.path.isfile(filename):
+            return None
+        try:
+            with np.load(filename) as saved:
+                if not np.array_equal(saved['key'], self._index_key()):
+                    return None
+                index = dict([(field, saved[field])
+                              for field in _INDEX_FIELDS])
+                index['end'] = int(saved['end'])
+        except (IOError, KeyError, ValueError):
+            return None
+        return index
+
+    def _save_index(self):
+        """ Save the index sidecar file """
+        try:
+            np.savez(self.binfilename + INDEX_SUFFIX, key=self._index_key(),
+                     **self.index)
+        except (IOError, OSError):
+            pass
+        return
@@ -0,0 +1,348 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2015  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Binary session container for HikoB Fox Node recordings
+
+A session file holds in a single file the sensors streams of a recording
+('acc', 'mag', 'gyr', 'presst', 'gpio' as returned by
+iofox.load_sensors_rawfile and 'imu' as returned by
+iofox.load_foximu_csvfile) with their metadata.
+
+File layout:
+
+    MAGIC
+    chunks of the stream arrays (raw array bytes, 64 bytes aligned)
+    directory (json): metadata, dtype, shape and chunks of each array
+    directory offset (uint64 little endian)
+    MAGIC
+
+The arrays are stored in chunks so that a session can be appended to;
+an array stored in one chunk is loaded as a read-only view of the
+memory mapped file.
+"""
+
+import os
+import mmap
+import json
+import struct
+import numpy as np
+from sensbiotk.io import iofox
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+MAGIC = "SBTKSESS"
+FORMAT_VERSION = 1
+_ALIGN = 64
+_FOOTER = struct.Struct("<Q8s")
+
+
+def raw_metadata(header):
+    """ Metadata of a RAW sensors file header
+
+    Parameters
+    ----------
+    header : tuple of int
+           (version, acc scale, mag scale, gyr scale)
+
+    Returns
+    -------
+    metadata : dictionnary
+             'version', 'acc_scale', 'mag_scale', 'gyr_scale' names
+             (ex: '8g') and 'scale' the SCALE values of iofox
+    """
+    def _name(scales, val):
+        """ name of a scale value """
+        for name in scales:
+            if scales[name] == val:
+                return name
+        return None
+    return {'version': header[0],
+            'acc_scale': _name(iofox.LSM303DLHC_ACC_SCALE, header[1]),
+            'mag_scale': _name(iofox.LSM303DLHC_MAG_SCALE, header[2]),
+            'gyr_scale': _name(iofox.L3G4200D_SCALE, header[3]),
+            'scale': iofox._header_scale(header)}
+
+
+class SessionWriter(object):
+    """ Writer of a session file, stream chunks are added one by one
+
+    Example
+    -------
+    >>> with SessionWriter("imutest.session", {'imu_id': 8}) as writer:
+    ...     writer.add(iofox.load_sensors_rawfile("data/imutest.raw"))
+    """
+
+    def __init__(self, filename, metadata=None, append=False):
+        """ Create a session file or open it to append chunks
+
+        Parameters
+        ----------
+        filename : str
+                 session file name
+        metadata : dictionnary
+                 session metadata (json serializable), merged with the
+                 existing one when appending
+        append : bool
+               append to an existing session file
+        """
+        self.filename = filename
+        if append and os.path.isfile(filename):
+            self._fid = open(filename, "r+b")
+            [self.directory, offset] = _read_directory(self._fid)
+            self._fid.seek(offset)
+            self._fid.truncate()
+        else:
+            self._fid = open(filename, "w+b")
+            self._fid.write(MAGIC)
+            self.directory = {'format': FORMAT_VERSION, 'metadata': {},
+                              'streams': {}}
+        if metadata is not None:
+            self.directory['metadata'].update(metadata)
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, sensors):
+        """ Append a chunk to each stream
+
+        Parameters
+        ----------
+        sensors : dictionnary
+                name: list of arrays (ex: 'acc': [time, acc]), the arrays
+                of a stream must keep the same dtype and columns
+        """
+        for name in sensors:
+            arrays = [np.ascontiguousarray(val) for val in sensors[name]]
+            streams = self.directory['streams']
+            if name not in streams:
+                streams[name] = [{'dtype': val.dtype.str,
+                                  'shape': list(val.shape[1:]),
+                                  'chunks': []} for val in arrays]
+            if len(arrays) != len(streams[name]):
+                raise ValueError("stream %s has %d arrays" %
+                                 (name, len(streams[name])))
+            for val, column in zip(arrays, streams[name]):
+                if list(val.shape[1:]) != column['shape']:
+                    raise ValueError("stream %s shape mismatch" % name)
+                val = val.astype(column['dtype'], copy=False)
+                position = self._fid.tell()
+                padding = -position % _ALIGN
+                self._fid.write("\0" * padding)
+                column['chunks'].append([position + padding, len(val)])
+                self._fid.write(val.tobytes())
+        return
+
+    def close(self):
+        """ Write the directory and close the session file """
+        offset = self._fid.tell()
+        self._fid.write(json.dumps(self.directory))
+        self._fid.write(_FOOTER.pack(offset, MAGIC))
+        self._fid.close()
+        return
+
+
+def _read_directory(fid):
+    """ Read the directory of a session file
+
+    Parameters
+    ----------
+    fid : file object opened
+
+    Returns
+    -------
+    [directory, offset] : dictionnary, int
+                        directory and its offset in the file
+    """
+    fid.seek(0, os.SEEK_END)
+    size = fid.tell()
+    fid.seek(0)
+    if size < len(MAGIC) + _FOOTER.size or fid.read(len(MAGIC)) != MAGIC:
+        raise IOError("%s is not a session file." % fid.name)
+    fid.seek(size - _FOOTER.size)
+    [offset, magic] = _FOOTER.unpack(fid.read(_FOOTER.size))
+    if magic != MAGIC:
+        raise IOError("%s is not a complete session file." % fid.name)
+    fid.seek(offset)
+    directory = json.loads(fid.read(size - _FOOTER.size - offset))
+    return [directory, offset]
+
+
+def save_session(filename, sensors, metadata=None):
+    """ Save sensors streams in a session file
+
+    Parameters
+    ----------
+    filename : str
+             session file name
+    sensors : dictionnary
+            streams to save, name: list of arrays, ex: the output of
+            iofox.load_sensors_rawfile plus 'imu': [t, acc, mag, gyr]
+    metadata : dictionnary
+             session metadata (json serializable), ex: 'imu_id',
+             'location', 'fs', see also raw_metadata
+
+    Returns
+    -------
+    status : str
+             'OK'
+    """
+    with SessionWriter(filename, metadata) as writer:
+        writer.add(sensors)
+    return 'OK'
+
+
+def append_session(filename, sensors, metadata=None):
+    """ Append sensors streams to a session file
+
+    Parameters
+    ----------
+    filename : str
+             session file name, created if it does not exist
+    sensors : dictionnary
+            streams to append, see save_session
+    metadata : dictionnary
+             metadata merged with the session metadata
+
+    Returns
+    -------
+    status : str
+             'OK'
+    """
+    with SessionWriter(filename, metadata, append=True) as writer:
+        writer.add(sensors)
+    return 'OK'
+
+
+def load_session(filename):
+    """ Load a session file
+
+    The file is memory mapped, an array stored in one chunk is a read-only
+    view of the file (no copy), an array stored in several chunks is
+    concatenated.
+
+    Parameters
+    ----------
+    filename : str
+             session file name
+
+    Returns
+    -------
+    [sensors, metadata] : dictionnary, dictionnary
+             streams (name: list of arrays) and metadata of the session
+    """
+    with open(filename, "rb") as fid:
+        directory = _read_directory(fid)[0]
+        buf = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+
+    sensors = {}
+    for name, columns in directory['streams'].items():
+        sensors[name] = []
+        for column in columns:
+            dtype = np.dtype(str(column['dtype']))
+            shape = tuple(column['shape'])
+            size = int(np.prod(shape))
+            chunks = [np.frombuffer(buf, dtype, nrows * size, offset).reshape(
+                (nrows,) + shape) for [offset, nrows] in column['chunks']
+                      if nrows > 0]
+            if len(chunks) == 0:
+                sensors[name].append(np.zeros((0,) + shape, dtype))
+            elif len(chunks) == 1:
+                sensors[name].append(chunks[0])
+            else:
+                sensors[name].append(np.concatenate(chunks))
+    return [sensors, directory['metadata']]
+
+
+def convert_rawfile_to_session(binfilename, filename, metadata=None,
+                               block_samples=iofox.RAW_BLOCK_SAMPLES):
+    """ Convert a raw bin HikoB Fox sensors file into a session file
+
+    The RAW file is converted block by block (see iofox.iter_raw_blocks),
+    each block being a chunk of the session streams.
+
+    Parameters
+    ----------
+    binfilename : str
+                Name of the raw file to convert.
+    filename : str
+             session file name
+    metadata : dictionnary
+             session metadata added to the RAW file ones (raw_metadata)
+    block_samples : int
+                maximum number of packets decoded at once
+
+    Returns
+    -------
+    status : str
+             'OK' / 'ERROR'
+    """
+    state = follow_rawfile_to_session(binfilename, filename, None, metadata,
+                                      block_samples)
+    if state is None:
+        return 'ERROR'
+    return 'OK'
+
+
+def follow_rawfile_to_session(binfilename, filename, state=None,
+                              metadata=None,
+                              block_samples=iofox.RAW_BLOCK_SAMPLES):
+    """ Append to a session the packets appended to a raw file since the
+    last call (see iofox.follow_sensors_rawfile)
+
+    Parameters
+    ----------
+    binfilename : str
+                Name of the raw file to convert.
+    filename : str
+             session file name, created by the first call
+    state : dictionnary
+          state returned by the previous call, None for the first one
+    metadata : dictionnary
+             session metadata added to the RAW file ones (raw_metadata)
+    block_samples : int
+                maximum number of packets decoded at once
+
+    Returns
+    -------
+    state : dictionnary
+          decoding state, None on error
+    """
+    with open(binfilename, "rb") as in_fox:
+        header = iofox._read_sensors_header(in_fox)
+    if header is None:
+        return None
+    if state is None:
+        session_metadata = raw_metadata(header)
+        session_metadata['source'] = os.path.basename(binfilename)
+        if metadata is not None:
+            session_metadata.update(metadata)
+        state = {}
+    else:
+        session_metadata = metadata
+        state = dict(state, lastt=dict(state['lastt']))
+    with SessionWriter(filename, session_metadata,
+                       append='lastt' in state) as writer:
+        for sensors in iofox.iter_raw_blocks(binfilename, block_samples,
+                                             state):
+            writer.add(sensors)
+    return state
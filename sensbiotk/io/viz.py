@@ -22,7 +22,7 @@ Plot for sensors data
 # pylint:disable= I0011, E1101, R0913
 # E1101 no-member false positif
 
-import matplotlib.pyplot as plt
+# matplotlib is imported by the plotting functions only
 
 def plot_imu(num, title, time, acc, mag, gyr):
     """
@@ -37,6 +37,7 @@ def plot_imu(num, title, time, acc, mag, gyr):
 
     @return: none
     """
+    import matplotlib.pyplot as plt
 
     if num < 0:
         plt.figure()
@@ -64,6 +65,7 @@ def plot_show():
     """
     plt.show()
     """
+    import matplotlib.pyplot as plt
     plt.show()
     return
 
@@ -98,6 +100,7 @@ def test2():
     @return: OK/ERROR
     """
     import numpy as np
+    import matplotlib.pyplot as plt
     import sensbiotk.io.iofox_deprec as iofox
 
     [time, _, _, _] = \
@@ -0,0 +1,111 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact: sensbiotk@inria.fr
+# Copyright (C) 2015  INRIA
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Floating point precision of the sensors pipelines
+
+The loaders (sensbiotk.io.iofox), the resampling, the basic filters
+(sensbiotk.algorithms.basic), the calibration (sensbiotk.calib.calib)
+and the AHRS batch computations store their sensors values with the
+dtype given by their dtype argument or, if it is None, by the package
+dtype: float64 by default, float32 halves the memory used by long
+multi-IMU records. The sensors are 12 to 16 bits integers, float32
+keeps their resolution. The time vectors always stay in float64.
+
+The package dtype is $SENSBIOTK_DTYPE (default float64), it is changed
+by set_dtype or for a block of code by:
+
+>>> with float_dtype(np.float32):
+...     [time, acc] = iofox.load_foxacc_csvfile("data/imutest_acc.csv")
+"""
+
+import os
+import contextlib
+import numpy as np
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+FLOAT_DTYPES = [np.dtype(np.float32), np.dtype(np.float64)]
+PRECISION = {'dtype': np.dtype(os.environ.get("SENSBIOTK_DTYPE",
+                                              "float64"))}
+
+
+def get_dtype(dtype=None):
+    """ dtype of the sensors values
+
+    Parameters
+    ----------
+    dtype : numpy dtype
+          requested dtype, None for the package dtype
+
+    Returns
+    -------
+    dtype : numpy dtype
+          float32 or float64
+    """
+    if dtype is None:
+        dtype = PRECISION['dtype']
+    dtype = np.dtype(dtype)
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError("Unsupported sensors dtype %s" % dtype)
+    return dtype
+
+
+def set_dtype(dtype):
+    """ Set the package dtype
+
+    Parameters
+    ----------
+    dtype : numpy dtype
+          np.float32 or np.float64
+    """
+    PRECISION['dtype'] = get_dtype(dtype)
+    return
+
+
+@contextlib.contextmanager
+def float_dtype(dtype):
+    """ Context setting the package dtype
+
+    Parameters
+    ----------
+    dtype : numpy dtype
+          np.float32 or np.float64
+    """
+    previous = PRECISION['dtype']
+    set_dtype(dtype)
+    try:
+        yield get_dtype()
+    finally:
+        PRECISION['dtype'] = previous
+
+
+def asfloat(values, dtype=None):
+    """ Sensors values with the requested dtype (no copy if it has it)
+
+    Parameters
+    ----------
+    values : array_like
+    dtype : numpy dtype
+          requested dtype, None for the package dtype
+
+    Returns
+    -------
+    values : numpy array
+    """
+    return np.asarray(values, dtype=get_dtype(dtype))
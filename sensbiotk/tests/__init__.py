@@ -1,2 +1,20 @@
 # -*- coding: utf-8; -*-
+"""
+Tests of sensbiotk, run from this directory (relative data paths)
+"""
 
+import os
+from sensbiotk.io import cache
+
+CACHE_CONFIG = dict(cache.CACHE)
+
+
+def setup_package():
+    """ Cache the loaders in tmpdata, not in the user cache """
+    cache.set_cache(directory=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "tmpdata", "cache_tests"))
+
+
+def teardown_package():
+    """ Restore the cache configuration """
+    cache.CACHE.update(CACHE_CONFIG)
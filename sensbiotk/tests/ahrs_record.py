@@ -0,0 +1,39 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Calibrated IMU record shared by the AHRS and kernels tests
+"""
+
+import numpy as np
+from sensbiotk.io import iofox as fox
+from sensbiotk.calib import calib
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+CALIB = "data/test_madgwick_ahrs/CalibrationFileIMU6.txt"
+DATA = "data/test_madgwick_ahrs/1_IMU6_RIGHT_FOOT.csv"
+
+
+def calibrated_record(dtype=None):
+    """ Calibrated [acc, mag, gyr] samples (N x 9) of DATA """
+    params = calib.load_param(CALIB)
+    data = fox.load_foxcsvfile(DATA, dtype, use_cache=False)
+    return np.column_stack([calib.apply_param(np.column_stack(
+        data[index:index + 3]), params[sensor], dtype)
+                            for sensor, index in enumerate([1, 4, 7])])
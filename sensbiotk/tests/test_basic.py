@@ -6,6 +6,7 @@ import numpy as np
 import sensbiotk.algorithms.basic as algo
 
 from nose.tools import assert_equal
+from numpy.testing import assert_array_almost_equal, assert_array_equal
 
 # pylint:disable= I0011, E1101
 # E1101 no-member false positif
@@ -30,3 +31,30 @@ def test_static_period():
         if std_static > 0.02:
             resp = False
     yield assert_equal, resp, True
+
+
+def _moving_average_loop(sig_raw, fen):
+    """ Moving average with the definition loop """
+    sig_filt = np.array(sig_raw, dtype=float)
+    for i in range(fen, len(sig_raw) - fen):
+        sig_filt[i] = np.mean(sig_raw[i:i + fen], 0)
+    return sig_filt
+
+
+def test_moving_average():
+    """ Test: moving average, in one call and by chunks
+    """
+    sig = 9.81 + np.random.RandomState(0).randn(1000, 3)
+    for fen in [1, 10, 30, 600]:
+        sig_filt = algo.moving_average(sig, fen)
+        yield assert_array_almost_equal, sig_filt, \
+            _moving_average_loop(sig, fen), 12
+        yield assert_array_almost_equal, algo.moving_average(sig[:, 0], fen), \
+            sig_filt[:, 0], 12
+        stream = algo.MovingAverage(fen)
+        sig_stream = [stream.update(sig[i:i + size])
+                      for [i, size] in [[0, 0], [0, 5], [5, 100], [105, 1],
+                                        [106, 0], [106, 894]]]
+        sig_stream = np.concatenate(sig_stream + [stream.finish()])
+        yield assert_array_equal, sig_stream, sig_filt
+    yield assert_array_equal, algo.moving_average(sig[0:5], 10), sig[0:5]
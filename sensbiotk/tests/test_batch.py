@@ -0,0 +1,65 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for batch module
+"""
+
+import os
+import shutil
+from sensbiotk.io import batch
+
+from nose.tools import assert_equal
+
+
+def _make_tree():
+    """ Build a tree of RAW files in tmpdata """
+    if os.path.exists("tmpdata/batch"):
+        shutil.rmtree("tmpdata/batch")
+    os.makedirs("tmpdata/batch/raw/1_RIGHT_SHANK")
+    os.makedirs("tmpdata/batch/raw/2_LEFT_SHANK")
+    shutil.copy("data/imutest.raw", "tmpdata/batch/raw/1_RIGHT_SHANK/a.RAW")
+    shutil.copy("data/gpiotest.raw", "tmpdata/batch/raw/1_RIGHT_SHANK/b.RAW")
+    shutil.copy("data/imutest.raw", "tmpdata/batch/raw/2_LEFT_SHANK/a.RAW")
+
+
+def test_convert_tree():
+    """ Test convert_tree function
+    """
+    _make_tree()
+    for check in ["mtime", "hash"]:
+        summary = batch.convert_tree("tmpdata/batch/raw", "tmpdata/batch/out",
+                                     workers=2, fs=100, check=check,
+                                     verbose=False)
+        yield assert_equal, len(summary['ERROR']), 0
+        yield assert_equal, len(summary['OK']) + len(summary['SKIPPED']), 3
+
+        summary = batch.convert_tree("tmpdata/batch/raw", "tmpdata/batch/out",
+                                     workers=1, fs=100, check=check,
+                                     verbose=False)
+        yield assert_equal, len(summary['SKIPPED']), 3
+
+    out = "tmpdata/batch/out/"
+    for filename in ["IMU1_RIGHT_SHANK/1_IMU1_RIGHT_SHANK.csv",
+                     "IMU1_RIGHT_SHANK/2_IMU1_RIGHT_SHANK.csv",
+                     "IMU1_RIGHT_SHANK/2_IMU1_RIGHT_SHANK_gpio.csv",
+                     "IMU2_LEFT_SHANK/1_IMU2_LEFT_SHANK.csv",
+                     "1/1_IMU1_RIGHT_SHANK.csv",
+                     "2/2_IMU1_RIGHT_SHANK_gpio.csv"]:
+        yield assert_equal, os.path.isfile(out + filename), True
+    yield assert_equal, os.path.isfile(
+        out + "IMU1_RIGHT_SHANK/1_IMU1_RIGHT_SHANK_acc.csv"), False
@@ -0,0 +1,98 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for cache module
+"""
+
+# pylint:disable= I0011, E1101, E0611
+# E1101 no-member false positif
+# E0611 no-name false positif
+
+import os
+import glob
+import shutil
+from sensbiotk.io import iofox as fox
+from sensbiotk.io import cache
+from numpy.testing import assert_array_equal
+
+from nose.tools import assert_equal
+
+
+def _entries(suffix=cache.CACHE_SUFFIX):
+    """ Number of cache entries """
+    return len(glob.glob("tmpdata/cache/*" + suffix))
+
+
+def test_cache():
+    """ Test the cached loaders
+    """
+    config = dict(cache.CACHE)
+    cache.set_cache(True, "tmpdata/cache", 1 << 30)
+    cache.clear()
+    shutil.copy("data/imutest_acc.csv", "tmpdata/cache_acc.csv")
+
+    files = ["tmpdata/cache_acc.csv", "data/imutest_mag.csv",
+             "data/imutest_gyr.csv"]
+    ref = fox.load_foximu_csvfile(*files, dtime=0.01, use_cache=False)
+    yield assert_equal, _entries(), 0
+    data = fox.load_foximu_csvfile(*files, dtime=0.01)
+    yield assert_equal, _entries(), 1
+    data = fox.load_foximu_csvfile(files[0], files[1], files[2], 0.01, 1)
+    yield assert_equal, _entries(), 1
+    for [val, val_ref] in zip(data, ref):
+        yield assert_array_equal, val, val_ref
+
+    # A corrupted entry is removed and computed again
+    [entry] = glob.glob("tmpdata/cache/*" + cache.CACHE_SUFFIX)
+    key = os.path.basename(entry)[:-len(cache.CACHE_SUFFIX)]
+    for content in ["", open(entry, "rb").read()[0:100]]:
+        with open(entry, "wb") as fid:
+            fid.write(content)
+        yield assert_equal, cache.load(key), None
+        yield assert_equal, os.path.exists(entry), False
+        data = fox.load_foximu_csvfile(*files, dtime=0.01)
+        yield assert_equal, _entries(), 1
+        for [val, val_ref] in zip(data, ref):
+            yield assert_array_equal, val, val_ref
+
+    # New parameters or new file content give new entries
+    fox.load_foximu_csvfile(*files, dtime=0.02)
+    yield assert_equal, _entries(), 2
+    with open(files[0], "a") as fid:
+        fid.write("# modified\n")
+    os.utime(files[0], (0, 0))
+    fox.load_foximu_csvfile(*files, dtime=0.02)
+    yield assert_equal, _entries(), 3
+
+    # A new cache version gives new entries
+    cache.CACHE_VERSION += 1
+    fox.load_foximu_csvfile(*files, dtime=0.02)
+    yield assert_equal, _entries(), 4
+    cache.CACHE_VERSION -= 1
+
+    # Eviction
+    cache.set_cache(max_size=1)
+    fox.load_foximu_csvfile(*files, dtime=0.03)
+    yield assert_equal, _entries(), 0
+    yield assert_equal, _entries(cache.HASH_SUFFIX), 0
+
+    fox.load_foximu_csvfile(*files, dtime=0.03)
+    cache.clear()
+    yield assert_equal, _entries(cache.HASH_SUFFIX), 0
+
+    cache.CACHE.update(config)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for catalog module
+"""
+
+import os
+import glob
+import shutil
+from sensbiotk.io import batch
+from sensbiotk.io import session
+from sensbiotk.io.catalog import Catalog
+
+from nose.tools import assert_equal
+
+
+def _make_tree():
+    """ Build a tree of RAW, converted and session files in tmpdata """
+    if os.path.exists("tmpdata/catalog"):
+        shutil.rmtree("tmpdata/catalog")
+    os.makedirs("tmpdata/catalog/raw/8_RIGHT_SHANK")
+    os.makedirs("tmpdata/catalog/raw/3_LEFT_FOOT")
+    shutil.copy("data/imutest.raw", "tmpdata/catalog/raw/8_RIGHT_SHANK")
+    shutil.copy("data/gpiotest.raw", "tmpdata/catalog/raw/3_LEFT_FOOT")
+    batch.convert_tree("tmpdata/catalog/raw", "tmpdata/catalog/out",
+                       workers=1, verbose=False)
+    session.convert_rawfile_to_session(
+        "data/gpiotest.raw", "tmpdata/catalog/gpiotest.session",
+        {'imu_id': 3, 'location': "LEFT_FOOT"})
+
+
+def test_catalog():
+    """ Test scanning and searching recordings
+    """
+    _make_tree()
+    with Catalog("tmpdata/catalog/catalog.db") as catalog:
+        summary = catalog.scan("tmpdata/catalog")
+        yield assert_equal, len(summary['added']), 5
+        yield assert_equal, len(summary['ERROR']), 0
+
+        records = catalog.find(location="LEFT_FOOT")
+        yield assert_equal, [record['kind'] for record in records], \
+            ["session", "csv", "raw"]
+        for record in records:
+            yield assert_equal, record['imu_id'], 3
+            yield assert_equal, record['sensors'], "acc gpio gyr mag"
+            yield assert_equal, record['gpio_events'], 49
+        record = catalog.find(kind="raw", imu_id=8)[0]
+        yield assert_equal, record['acc_scale'], "16g"
+        yield assert_equal, len(catalog.find(min_duration=30, fs=200)), 3
+        yield assert_equal, len(catalog.find(sensor="gpio", kind="csv")), 1
+        yield assert_equal, len(catalog.find(max_duration=30, fs=200)), 1
+
+        # the records are ready for the loaders
+        record = catalog.find(kind="csv", imu_id=8)[0]
+        yield assert_equal, len(catalog.load(record)), 10
+        record = catalog.find(kind="raw", imu_id=3)[0]
+        sensors = catalog.load(record)
+        yield assert_equal, len(sensors['gpio'][0]), 7143
+
+    # Incremental rescan of the same database
+    os.remove("tmpdata/catalog/gpiotest.session")
+    shutil.copy("data/imutest.raw", "tmpdata/catalog/raw/3_LEFT_FOOT/b.raw")
+    os.utime("tmpdata/catalog/raw/8_RIGHT_SHANK/imutest.raw", (0, 0))
+    with Catalog("tmpdata/catalog/catalog.db") as catalog:
+        summary = catalog.scan("tmpdata/catalog")
+        yield assert_equal, len(summary['added']), 1
+        yield assert_equal, len(summary['updated']), 1
+        yield assert_equal, len(summary['removed']), 1
+        yield assert_equal, len(summary['unchanged']), 3
+        yield assert_equal, len(catalog.find(kind="raw", imu_id=3)), 2
+
+    # Companion files of the converted signals, unreadable files
+    [gpio_csv] = glob.glob("tmpdata/catalog/out/IMU3_LEFT_FOOT/*_gpio.csv")
+    os.remove(gpio_csv)
+    with open("tmpdata/catalog/raw/3_LEFT_FOOT/b.raw", "wb") as fid:
+        fid.write("not a RAW file")
+    with Catalog("tmpdata/catalog/catalog.db") as catalog:
+        summary = catalog.scan("tmpdata/catalog")
+        yield assert_equal, len(summary['updated']), 1
+        yield assert_equal, len(summary['ERROR']), 1
+        record = catalog.find(kind="csv", imu_id=3)[0]
+        yield assert_equal, record['sensors'], "acc gyr mag"
+        yield assert_equal, record['gpio_events'], 0
+        yield assert_equal, len(catalog.find(kind="raw", imu_id=3)), 1
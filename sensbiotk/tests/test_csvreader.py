@@ -0,0 +1,74 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for csvreader module
+"""
+
+# pylint:disable= I0011, E1101, E0611
+# E1101 no-member false positif
+# E0611 no-name false positif
+
+import numpy as np
+from sensbiotk.io.csvreader import load_csv
+from numpy.testing import assert_array_equal
+
+from nose.tools import assert_equal
+
+
+def test_load_csv():
+    """ Test load_csv against np.loadtxt
+    """
+    ref = np.loadtxt("data/imutest_acc.csv", delimiter=";")
+    data = load_csv("data/imutest_acc.csv")
+    yield assert_array_equal, data, ref
+    data = load_csv("data/imutest_acc.csv", chunksize=100)
+    yield assert_array_equal, data, ref
+
+    ref = np.loadtxt("data/output_ahrs.csv", delimiter="\t")
+    data = load_csv("data/output_ahrs.csv", "\t")
+    yield assert_array_equal, data, ref
+
+
+def test_load_csv_options():
+    """ Test usecols, dtype and out options of load_csv
+    """
+    ref = np.loadtxt("data/imutest_gyr.csv", delimiter=";")
+    data = load_csv("data/imutest_gyr.csv", usecols=[0, 2, 3, 4],
+                    dtype=np.float32)
+    yield assert_equal, data.dtype, np.float32
+    yield assert_array_equal, data, ref[:, [0, 2, 3, 4]].astype(np.float32)
+
+    out = np.zeros((len(ref) + 10, 3))
+    data = load_csv("data/imutest_gyr.csv", usecols=[2, 3, 4], out=out,
+                    chunksize=256)
+    yield assert_equal, len(data), len(ref)
+    yield assert_array_equal, out[:len(ref)], ref[:, 2:5]
+
+
+def test_load_csv_blank_lines():
+    """ Test load_csv on a file with blank lines, skipped as np.loadtxt
+    """
+    with open("data/imutest_acc.csv") as fid:
+        lines = fid.read().split("\n")
+    with open("tmpdata/blank_acc.csv", "w") as fid:
+        fid.write("\n".join(lines[0:20] + ["", "\r"] + lines[20:40] +
+                            [""] + lines[40:] + ["", ""]))
+    ref = np.loadtxt("tmpdata/blank_acc.csv", delimiter=";")
+    for chunksize in [100, 1 << 22]:
+        data = load_csv("tmpdata/blank_acc.csv", chunksize=chunksize)
+        yield assert_array_equal, data, ref
@@ -0,0 +1,64 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for csvwriter module
+"""
+
+# pylint:disable= I0011, E1101, E0611
+# E1101 no-member false positif
+# E0611 no-name false positif
+
+import numpy as np
+from sensbiotk.io import csvwriter
+from nose.tools import assert_equal
+
+
+def test_format_rows():
+    """ Test the csv bulk formatter against the "%" operator
+    """
+    values = np.concatenate([np.random.randn(1000) * 100,
+                             np.arange(-300, 300) / 128.0,
+                             np.arange(0, 8192, 0.5) / 32768.0 + 8192.0,
+                             [0.0, -0.0, -1e-9, 0.9999996, 12.0000005]])
+    gpio = np.arange(len(values)) % 3
+    lines = "".join(["%f;%f;%u\r\n" % (val, -val, io)
+                     for val, io in zip(values, gpio)])
+    resp = csvwriter.format_rows([values, -values, gpio])
+    yield assert_equal, resp, lines
+
+
+def test_writers():
+    """ Test two CsvWriter objects written alternately block by block
+    """
+    time = np.arange(0, 10, 0.01)
+    values = np.sin(time)
+    writer1 = csvwriter.CsvWriter("tmpdata/writer1.csv", delta=True)
+    writer2 = csvwriter.CsvWriter("tmpdata/writer2.csv", "\t", "\n",
+                                  counter=1, bufsize=100)
+    for block in range(0, len(time), 64):
+        writer1.write([time[block:block + 64], values[block:block + 64]])
+        writer2.write([values[block:block + 64]])
+    writer1.close()
+    writer2.close()
+
+    lines = "".join(["%f;%f;%f\r\n" % (t, dt, val) for t, dt, val in
+                     zip(time, np.diff(time, prepend=0.0), values)])
+    yield assert_equal, open("tmpdata/writer1.csv").read(), lines
+    lines = "".join(["%i\t%f\n" % (ident + 1, val)
+                     for ident, val in enumerate(values)])
+    yield assert_equal, open("tmpdata/writer2.csv").read(), lines
@@ -162,3 +162,47 @@ def test_quats():
         M2 = nea.euler2mat(zp, yp, xp)
         yield assert_array_almost_equal, M1, M2
         
+
+
+def test_array():
+    # Arrays of angles and quaternions against one sample at a time
+    angles = np.array([(z, y, x) for x, y, z in eg_rots])
+    yield assert_array_almost_equal, nea.euler2mat_array(angles), \
+        [nea.euler2mat(*zyx) for zyx in angles]
+    yield assert_array_almost_equal, nea.euler2quat_array(angles), \
+        [nea.euler2quat(*zyx) for zyx in angles]
+    yield assert_array_almost_equal, nea.euler2quat2_array(angles), \
+        [nea.euler2quat2(*zyx) for zyx in angles]
+    mats = nea.euler2mat_array(angles)
+    yield assert_array_almost_equal, nea.mat2euler_array(mats), \
+        [nea.mat2euler(M) for M in mats]
+    # quaternions at the singularities and random ones
+    quats = nea.euler2quat_array(angles)
+    yield assert_array_almost_equal, nea.quat2euler_array(quats), \
+        [nea.quat2euler(q) for q in quats]
+    for func, func_array in [(nea.quat2euler4, nea.quat2euler4_array),
+                             (nea.quat2euler5, nea.quat2euler5_array)]:
+        yield assert_array_almost_equal, func_array(quats), \
+            [func(q) for q in quats]
+        yield assert_array_almost_equal, func_array(2 * quats[:, None]), \
+            np.array([func(2 * q) for q in quats])[:, None]
+    quats = np.random.RandomState(0).randn(100, 4)
+    quats /= np.sqrt(np.sum(quats ** 2, 1))[:, None]
+    for func, func_array in [(nea.quat2euler2, nea.quat2euler2_array),
+                             (nea.quat2euler3, nea.quat2euler3_array)]:
+        yield assert_array_almost_equal, func_array(quats), \
+            [func(q) for q in quats]
+
+
+def test_unwrap():
+    # continuous yaw over three turns
+    yaw = np.linspace(0, 6 * pi, 200)
+    angles = np.column_stack([yaw, 0.1 * np.ones(200), -0.2 * np.ones(200)])
+    quats = nea.euler2quat_array(angles)
+    yield assert_equal, np.abs(nea.quat2euler_array(quats)).max() <= pi, True
+    yield assert_array_almost_equal, \
+        nea.quat2euler_array(quats, unwrap=True), angles
+    # a single quaternion is not unwrapped
+    yield assert_array_almost_equal, \
+        nea.quat2euler_array(quats[-1], unwrap=True), \
+        nea.quat2euler_array(quats[-1])
@@ -0,0 +1,68 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for the import time of the sensbiotk modules
+
+The heavy dependencies (scipy.signal, scipy.interpolate, matplotlib,
+pyserial, numba) must only be imported by the functions using them.
+"""
+
+import os
+import sys
+import subprocess
+
+from nose.tools import assert_equal, assert_true
+
+# Modules imported by the conversion scripts and the dongle console
+MODULES = ["sensbiotk.io.iofox", "sensbiotk.io.ahrs", "sensbiotk.io.viz",
+           "sensbiotk.io.batch", "sensbiotk.calib.calib",
+           "sensbiotk.calib.calib_geom", "sensbiotk.algorithms.basic",
+           "sensbiotk.algorithms.resample", "sensbiotk.driver.fox_dongle"]
+HEAVY_MODULES = ["scipy.signal", "scipy.interpolate", "matplotlib",
+                 "serial", "numba"]
+# Import time of MODULES after numpy (s), about 0.05 s expected
+IMPORT_TIME_MAX = 1.0
+
+SCRIPT = """
+import sys
+import time
+import numpy
+start = time.time()
+import %s
+print time.time() - start
+print ' '.join(sorted(set(sys.modules) & set(%r)))
+"""
+
+
+def _import_modules():
+    """ Import time and heavy modules loaded in a new interpreter """
+    # the new interpreter gets the sys.path of the tests
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT % (", ".join(MODULES), HEAVY_MODULES)],
+        env=env)
+    lines = output.splitlines()
+    return [float(lines[0]), lines[1].split()]
+
+
+def test_import_time():
+    """ Test the import time of the light modules
+    """
+    [duration, loaded] = _import_modules()
+    yield assert_equal, loaded, []
+    yield assert_true, duration < IMPORT_TIME_MAX
@@ -24,6 +24,7 @@ Tests Unit for iofox module
 # E0611 no-name false positif
 
 import numpy as np
+import json
 import filecmp
 from sensbiotk.io import iofox as fox
 from numpy.testing import assert_array_almost_equal
@@ -78,6 +79,119 @@ def test_convert():
     yield assert_equal, resp, True
 
 
+def test_load_raw():
+    """ Test load_sensors_rawfile function
+    """
+    sensors = fox.load_sensors_rawfile("data/imutest.raw")
+    yield assert_equal, sorted(sensors.keys()), ['acc', 'gyr', 'mag']
+    for name in ['acc', 'mag', 'gyr']:
+        [time, values] = fox.load_foxacc_csvfile("data/imutest_" + name +
+                                                 ".csv")
+        yield assert_array_almost_equal, sensors[name][0], time, 5
+        yield assert_array_almost_equal, sensors[name][1], values, 5
+
+    [timeio, gpio] = fox.load_foxgpio_csvfile("data/gpiotest_gpio.csv")
+    sensors = fox.load_sensors_rawfile("data/gpiotest.raw")
+    yield assert_array_almost_equal, sensors['gpio'][0], timeio, 5
+    yield assert_array_almost_equal, sensors['gpio'][1], gpio
+
+    # resampled on the common timeline (csv times are rounded to 1e-6 s)
+    [time, acc, mag, gyr] = fox.load_sensors_rawfile("data/imutest.raw",
+                                                     0.06, 1)
+    [time1, acc1, mag1, gyr1] = fox.load_foximu_csvfile(
+        "data/imutest_acc.csv",
+        "data/imutest_mag.csv",
+        "data/imutest_gyr.csv",
+        0.06, 1)
+    yield assert_array_almost_equal, time, time1, 5
+    yield assert_array_almost_equal, acc, acc1, 3
+    yield assert_array_almost_equal, mag, mag1, 3
+    yield assert_array_almost_equal, gyr, gyr1, 3
+
+
+def test_header_scale():
+    """ Test the sensors scales of RAW files headers
+    """
+    scale = dict(fox.SCALE)
+    fox.load_sensors_rawfile("data/imutest.raw")
+    yield assert_equal, fox.SCALE, scale
+    # unknown scale bytes: default scales, whatever the previous files
+    with open("data/imutest.raw", "rb") as in_fox:
+        header = fox._read_sensors_header(in_fox)
+    scale = fox._header_scale((header[0], 0xff, 0xff, 0xff))
+    for name in ['acc', 'mag_xy', 'mag_z']:
+        yield assert_equal, scale[name], fox.DEFAULT_SCALE[name]
+
+
+def test_iter_raw():
+    """ Test iter_raw_blocks function
+    """
+    sensors = fox.load_sensors_rawfile("data/gpiotest.raw")
+    blocks = list(fox.iter_raw_blocks("data/gpiotest.raw", 1000))
+    yield assert_equal, len(blocks) > 1, True
+    npackets = max([sum([len(block[name][0]) for name in block])
+                    for block in blocks])
+    yield assert_equal, npackets <= 1001, True
+    for name in sensors:
+        for index in range(len(sensors[name])):
+            val = np.concatenate([block[name][index] for block in blocks
+                                  if name in block])
+            yield assert_array_almost_equal, val, sensors[name][index]
+
+
+def test_follow_raw():
+    """ Test follow_sensors_rawfile on a growing RAW file
+    """
+    names = ["acc", "mag", "gyr", "presst", "gpio"]
+    with open("data/gpiotest.raw", "rb") as fid:
+        raw = fid.read()
+
+    state = None
+    for end in [10, 1001, 1002, 20003, 50000, len(raw)]:
+        with open("tmpdata/follow.raw", "wb") as fid:
+            fid.write(raw[:end])
+        state = fox.follow_sensors_rawfile("tmpdata/follow.raw", state, *[
+            "tmpdata/follow_" + name + ".csv" for name in names])
+        state = json.loads(json.dumps(state))
+        yield assert_equal, state['offset'] <= end, True
+    yield assert_equal, state['offset'], len(raw)
+    fox.convert_sensors_rawfile("tmpdata/follow.raw", *[
+        "tmpdata/follow_ref_" + name + ".csv" for name in names])
+    for name in names[:3] + names[4:]:
+        resp = filecmp.cmp("tmpdata/follow_ref_" + name + ".csv",
+                           "tmpdata/follow_" + name + ".csv", shallow=False)
+        yield assert_equal, resp, True
+
+
+def test_info():
+    """ Test the packet census of raw files
+    """
+    for filename in ["data/imutest.raw", "data/gpiotest.raw"]:
+        info = fox.info_fox_rawfile(filename)
+        yield assert_equal, info['version'], 4
+        sensors = fox.load_sensors_rawfile(filename)
+        for name in fox.PACKET_TYPE:
+            nsamples = len(sensors[name][0]) if name in sensors else 0
+            yield assert_equal, info['packets'][name], nsamples
+        yield assert_equal, info['truncated'], 0
+        yield assert_equal, info['tmax'], max(
+            [sensors[name][0][-1, 0] for name in sensors])
+
+
+def test_load_multi_imu():
+    """ Test load_multi_imu function
+    """
+    files = ["data/imutest_acc.csv", "data/imutest_mag.csv",
+             "data/imutest_gyr.csv"]
+    [time, imus] = fox.load_multi_imu(["data/imutest.raw", files], 0.01,
+                                      workers=2)
+    [time_csv, acc, mag, gyr] = fox.load_foximu_csvfile(*files, dtime=0.01)
+    yield assert_equal, imus.shape, (2, len(time), 9)
+    yield assert_array_almost_equal, time, time_csv
+    yield assert_array_almost_equal, imus[1], np.hstack([acc, mag, gyr]), 3
+    yield assert_array_almost_equal, imus[0], imus[1], 3
+
+
 def test_load():
     """ Test loading functions
     """
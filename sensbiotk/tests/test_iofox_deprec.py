@@ -19,11 +19,12 @@
 Tests Unit for iofox module
 """
 
+import os
 import numpy as np
 import filecmp
 from sensbiotk.io import iofox_deprec as fox
 
-from nose.tools import assert_equal
+from nose.tools import assert_equal, assert_almost_equal
 
 # pylint:disable= I0011, E1101
 # E1101 no-member false positif
@@ -64,3 +65,26 @@ def test_load():
     else:
         sot = 0
     yield assert_equal, sot, 1
+
+
+def test_load_sensors_file():
+    """ Test converting a sensors (version 4) file with the old converter
+    """
+    resp = fox.convert_fox_rawfile("data/imutest.raw",
+                                   "tmpdata/imutest_v4_imu.csv",
+                                   "tmpdata/imutest_v4_presst.csv")
+    yield assert_equal, resp, "ERROR"
+    yield assert_equal, os.path.exists("tmpdata/imutest_v4_imu.csv"), False
+
+
+def test_info():
+    """ Test the packet census of a deprecated raw file
+    """
+
+    info = fox.info_fox_rawfile("data/imutest_deprec.raw")
+    yield assert_equal, info['version'], 2
+    [time, _, _, _] = fox.load_foximu_csvfile("data/imutest_deprec_imu.csv")
+    yield assert_equal, info['packets']['imu'], len(time)
+    yield assert_equal, info['packets']['presst'], len(time)
+    yield assert_equal, info['packets']['unknown'], 0
+    yield assert_almost_equal, info['tmin'], time[0, 1], 5
@@ -0,0 +1,85 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for the kernels backends of the sequential filters
+"""
+
+import numpy as np
+from sensbiotk.algorithms import kernels
+from sensbiotk.algorithms import madgwick_ahrs, mahony_ahrs, martin_ahrs
+from sensbiotk.tests.ahrs_record import calibrated_record
+from numpy.testing import assert_array_almost_equal
+
+from nose.tools import assert_equal, assert_raises
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+# Backends available here
+BACKENDS = ["numpy", "numba"] if kernels.HAS_NUMBA else ["numpy"]
+
+
+def test_backend():
+    """ Test the backend setting
+    """
+    with kernels.backend("numpy") as name:
+        yield assert_equal, name, "numpy"
+    with kernels.backend("auto") as name:
+        yield assert_equal, name, BACKENDS[-1]
+    previous = kernels.BACKEND['name']
+    yield assert_raises, ValueError, kernels.set_backend, "fortran"
+    yield assert_equal, kernels.BACKEND['name'], previous
+    if not kernels.HAS_NUMBA:
+        yield assert_raises, ImportError, kernels.set_backend, "numba"
+        yield assert_equal, kernels.BACKEND['name'], previous
+
+
+def test_ahrs():
+    """ Test the AHRS kernels against the reference updates
+    """
+    z = calibrated_record()[0:1000]
+    ref = {}
+    for ahrs in [madgwick_ahrs, mahony_ahrs]:
+        quat = np.zeros((len(z), 4))
+        q = [1, 0, 0, 0]
+        for i in range(len(z)):
+            q = ahrs.update(np.ravel(q), z[i])
+            quat[i] = q
+        ref[ahrs] = quat
+    observer = martin_ahrs.martin_ahrs()
+    q_init = observer.init_observer(np.mean(z[0:200], 0))
+    ref[martin_ahrs] = np.array([observer.update(val, 0.005) for val in z])
+
+    for name in BACKENDS:
+        with kernels.backend(name):
+            quats = {madgwick_ahrs: madgwick_ahrs.run_batch(z),
+                     mahony_ahrs: mahony_ahrs.run_batch(z),
+                     martin_ahrs: martin_ahrs.run_batch(z, 200, q_init)}
+        for ahrs in quats:
+            yield assert_array_almost_equal, quats[ahrs], ref[ahrs], 12
+
+
+def test_madgwick_zero_step():
+    """ Test the Madgwick kernel when the measurements fit the quaternion
+    """
+    # vertical gravity, magnetic field in the x-z plane, no rotation
+    z = np.tile([0, 0, 1, 0.6, 0, 0.8, 0, 0, 0], (10, 1))
+    for name in BACKENDS:
+        with kernels.backend(name):
+            quat = madgwick_ahrs.run_batch(z)
+        yield assert_array_almost_equal, quat, np.tile([1, 0, 0, 0], (10, 1))
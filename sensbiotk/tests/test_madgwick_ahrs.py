@@ -20,10 +20,14 @@ TEST MADGWICK AHRS
 """
 
 import numpy as np
+import json
 from nose.tools import assert_equal
+from numpy.testing import assert_array_almost_equal
 from sensbiotk.io.iofox import load_foxcsvfile
 import sensbiotk.calib.calib as calib
+from sensbiotk.tests.ahrs_record import calibrated_record
 import sensbiotk.algorithms.mahony_ahrs as madgwick
+import sensbiotk.algorithms.madgwick_ahrs as madgwick_ahrs
 import scipy.io as sio
 
 # disabling pylint errors 'E1101' no-member, false positive from pylint
@@ -70,5 +74,78 @@ def test_madgwick_ahrs():
 
     yield assert_equal, quaternion.all() == quat_verif.all(), "OK"
 
+
+def test_run_batch():
+    """ Test run_batch against the update loop
+    """
+    z = calibrated_record()[0:1000]
+    quaternion = np.zeros((len(z), 4))
+    q = [1, 0, 0, 0]
+    for i in range(len(z)):
+        q = madgwick_ahrs.update(np.ravel(q), z[i])
+        quaternion[i] = q
+    quat_batch = madgwick_ahrs.run_batch(z)
+    yield assert_equal, quat_batch.shape, (len(z), 4)
+    yield assert_array_almost_equal, quat_batch, quaternion, 12
+    quat_batch = madgwick_ahrs.run_batch(z, dtype=np.float32)
+    yield assert_equal, quat_batch.dtype, np.float32
+    yield assert_array_almost_equal, quat_batch, quaternion, 6
+
+
+def test_multi():
+    """ Test run_multi against run_batch on each IMU
+    """
+    z = calibrated_record()[0:500]
+    data = np.array([z, z[::-1], 2 * z])
+    beta = np.array([0.02, 0.1, 0.02])
+    quaternion = madgwick_ahrs.run_multi(data, beta=beta)
+    yield assert_equal, quaternion.shape, (3, len(z), 4)
+    for index in range(len(data)):
+        yield assert_array_almost_equal, quaternion[index], \
+            madgwick_ahrs.run_batch(data[index], beta=beta[index]), 12
+
+
+def test_multi_zero_step():
+    """ Test run_multi against run_batch when the step is zero
+    """
+    z = np.tile([0, 0, 9.81, 0.3, 0, 0, 0.01, 0, 0], (10, 1))
+    quaternion = madgwick_ahrs.run_multi(np.array([z, z]))
+    yield assert_equal, np.isfinite(quaternion).all(), True
+    yield assert_array_almost_equal, quaternion[0], \
+        madgwick_ahrs.run_batch(z), 12
+
+
+def test_filter():
+    """ Test the madgwick_ahrs filter class
+    """
+    z = calibrated_record()[0:600]
+    filters = [madgwick_ahrs.madgwick_ahrs(),
+               madgwick_ahrs.madgwick_ahrs(0.1)]
+    # interleaved updates of two filters
+    quaternion = np.array([[filt.update(val) for filt in filters]
+                           for val in z[0:300]])
+    yield assert_array_almost_equal, quaternion[:, 0], \
+        madgwick_ahrs.run_batch(z[0:300]), 12
+    yield assert_array_almost_equal, quaternion[:, 1], \
+        madgwick_ahrs.run_batch(z[0:300], beta=0.1), 12
+    # run_batch goes on from a restored state
+    state = json.loads(json.dumps(filters[1].get_state()))
+    filt = madgwick_ahrs.madgwick_ahrs()
+    filt.set_state(state)
+    yield assert_equal, filt.beta, 0.1
+    yield assert_array_almost_equal, filt.run_batch(z[300:]), \
+        madgwick_ahrs.run_batch(z, beta=0.1)[300:], 12
+
+
+def test_filter_zero_step():
+    """ Test the madgwick_ahrs filter class when the step is zero
+    """
+    z = np.tile([0, 0, 9.81, 0.3, 0, 0, 0.01, 0, 0], (10, 1))
+    filt = madgwick_ahrs.madgwick_ahrs()
+    quaternion = np.array([filt.update(val) for val in z])
+    yield assert_array_almost_equal, quaternion, \
+        madgwick_ahrs.run_batch(z), 12
+
+
 if __name__ == '__main__':
     test_madgwick_ahrs()
@@ -20,9 +20,12 @@ TEST MAHONY AHRS
 """
 
 import numpy as np
+import json
 from nose.tools import assert_equal
+from numpy.testing import assert_array_almost_equal
 from sensbiotk.io.iofox import load_foxcsvfile
 import sensbiotk.calib.calib as calib
+from sensbiotk.tests.ahrs_record import calibrated_record
 import sensbiotk.algorithms.mahony_ahrs as mahony
 import scipy.io as sio
 
@@ -71,5 +74,57 @@ def test_mahony_ahrs():
 
     yield assert_equal, quaternion.all() == quat_verif.all(), "OK"
 
+
+def test_run_batch():
+    """ Test run_batch against the update loop
+    """
+    z = calibrated_record()[0:1000]
+    quaternion = np.zeros((len(z), 4))
+    q = [1, 0, 0, 0]
+    for i in range(len(z)):
+        q = mahony.update(np.ravel(q), z[i])
+        quaternion[i] = q
+    quat_batch = mahony.run_batch(z)
+    yield assert_equal, quat_batch.shape, (len(z), 4)
+    yield assert_array_almost_equal, quat_batch, quaternion, 12
+    quat_batch = mahony.run_batch(z, q0=quaternion[99], kp=0.1)
+    yield assert_equal, np.allclose(quat_batch[0], quaternion[100]), False
+
+
+def test_multi():
+    """ Test run_multi against run_batch on each IMU
+    """
+    z = calibrated_record()[0:500]
+    data = np.array([z, z[::-1], 2 * z])
+    ki = np.array([0, 0.01, 0.1])
+    quaternion = mahony.run_multi(data, ki=ki)
+    yield assert_equal, quaternion.shape, (3, len(z), 4)
+    for index in range(len(data)):
+        yield assert_array_almost_equal, quaternion[index], \
+            mahony.run_batch(data[index], ki=ki[index]), 12
+
+
+def test_filter():
+    """ Test the mahony_ahrs filter class
+    """
+    z = calibrated_record()[0:600]
+    filters = [mahony.mahony_ahrs(ki=0.1), mahony.mahony_ahrs(0.1, 0.01)]
+    # interleaved updates of two filters with their own integral errors
+    quaternion = np.array([[filt.update(val) for filt in filters]
+                           for val in z[0:300]])
+    yield assert_equal, mahony.obj.eInt, 0
+    yield assert_array_almost_equal, quaternion[:, 0], \
+        mahony.run_batch(z[0:300], ki=0.1), 12
+    yield assert_array_almost_equal, quaternion[:, 1], \
+        mahony.run_batch(z[0:300], kp=0.1, ki=0.01), 12
+    # run_batch goes on from a restored state
+    state = json.loads(json.dumps(filters[0].get_state()))
+    filt = mahony.mahony_ahrs()
+    filt.set_state(state)
+    yield assert_equal, filt.ki, 0.1
+    yield assert_array_almost_equal, filt.run_batch(z[300:]), \
+        mahony.run_batch(z, ki=0.1)[300:], 12
+
+
 if __name__ == '__main__':
     test_mahony_ahrs()
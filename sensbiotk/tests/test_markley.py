@@ -26,6 +26,8 @@ import numpy as np
 import sensbiotk.algorithms.markley as markley
 from sensbiotk.io.iofox import load_foxcsvfile
 import sensbiotk.calib.calib as calib
+from numpy.testing import assert_array_almost_equal
+from nose.tools import assert_raises
 
 def test_markley():
 
@@ -56,6 +58,33 @@ def test_markley():
     return quaternion        
 
 
+def test_compute_batch():
+    """ Test compute_batch against compute
+    """
+    [_, accx, accy, accz, mx, my, mz, _, _, _] = \
+        load_foxcsvfile("data/3D_validation/3/3_IMU4_WAND.csv")
+    z = np.column_stack([accx, accy, accz, mx, my, mz])
+    quaternion = np.array([markley.compute(val) for val in z])
+    yield assert_array_almost_equal, markley.compute_batch(z), quaternion
+    # N x 9 AHRS arrays, the gyrometer values are ignored
+    z9 = np.column_stack([z, np.ones((len(z), 3))])
+    yield assert_array_almost_equal, markley.compute_batch(z9), quaternion
+    yield assert_raises, ValueError, markley.compute_batch, z[:, 0:5]
+
+    # references giving the four isave values
+    z = np.random.RandomState(0).randn(1000, 6)
+    refs = [markley.G_REF, markley.H_REF]
+    try:
+        markley.G_REF = np.array([0.2, 1, 0.1])
+        markley.H_REF = np.array([0.5, 0.5, -0.7])
+        quat_batch = markley.compute_batch(z, np.array([0.3, 0.7]))
+        quaternion_a = np.array([markley.compute(val, np.array([0.3, 0.7]))
+                                 for val in z])
+    finally:
+        [markley.G_REF, markley.H_REF] = refs
+    yield assert_array_almost_equal, quat_batch, quaternion_a
+
+
 #if __name__ == '__main__':
 #   test_markley() 
 
@@ -20,9 +20,13 @@ TEST MARTIN SALAUN AHRS
 """
 
 import numpy as np
-from nose.tools import assert_equal
+import json
+import functools
+from nose.tools import assert_equal, assert_raises
+from numpy.testing import assert_array_almost_equal
 from sensbiotk.io.iofox import load_foxcsvfile
 import sensbiotk.calib.calib as calib
+from sensbiotk.tests.ahrs_record import calibrated_record
 import sensbiotk.algorithms.martin_ahrs as martin
 import sensbiotk.transforms3d.quaternions as nq
 
@@ -81,5 +85,77 @@ def test_martin_ahrs():
 
     yield assert_equal, quaternion_corr.all() == quat_verif.all(), "OK"
 
+
+def test_run_batch():
+    """ Test run_batch against the update loop
+    """
+    z = calibrated_record()[0:1000]
+    observer = martin.martin_ahrs()
+    q_init = observer.init_observer(np.mean(z[0:200], 0))
+    quaternion = np.array([observer.update(val, 0.005) for val in z])
+    quat_batch = martin.run_batch(z, 200, q_init)
+    yield assert_equal, quat_batch.shape, (len(z), 4)
+    yield assert_array_almost_equal, quat_batch, quaternion, 12
+    # the observer state is kept between calls
+    observer = martin.martin_ahrs()
+    observer.init_observer(np.mean(z[0:200], 0))
+    quat_batch = np.vstack([observer.run_batch(z[0:500]),
+                            observer.run_batch(z[500:])])
+    yield assert_array_almost_equal, quat_batch, quaternion, 12
+    yield assert_raises, TypeError, functools.partial(martin.run_batch,
+                                                      beta=0.1), z
+
+
+def test_multi():
+    """ Test martin_ahrs_multi against martin_ahrs on each IMU
+    """
+    z = calibrated_record()[0:500]
+    data = np.array([z, z[::-1], 2 * z])
+    observers = martin.martin_ahrs_multi(len(data))
+    observers.init_observer(np.mean(data[:, 0:200], 1))
+    quaternion = observers.run_batch(data)
+    yield assert_equal, quaternion.shape, (3, len(z), 4)
+    for index in range(len(data)):
+        observer = martin.martin_ahrs()
+        observer.init_observer(np.mean(data[index, 0:200], 0))
+        yield assert_array_almost_equal, quaternion[index], \
+            observer.run_batch(data[index]), 12
+        yield assert_array_almost_equal, observers.wb[index], \
+            observer.wb[1:4], 12
+        yield assert_array_almost_equal, \
+            [observers.a_s[index], observers.c_s[index]], \
+            [observer.a_s, observer.c_s], 12
+
+
+def test_state():
+    """ Test the serialization of the observer state
+    """
+    z = calibrated_record()[0:600]
+    observer = martin.martin_ahrs()
+    observer.la = 0.5
+    observer.init_observer(np.mean(z[0:200], 0))
+    quaternion = observer.run_batch(z)
+    observer = martin.martin_ahrs()
+    observer.la = 0.5
+    observer.init_observer(np.mean(z[0:200], 0))
+    observer.run_batch(z[0:300])
+    state = json.loads(json.dumps(observer.get_state()))
+    observer = martin.martin_ahrs()
+    observer.set_state(state)
+    yield assert_equal, observer.la, 0.5
+    yield assert_array_almost_equal, observer.run_batch(z[300:]), \
+        quaternion[300:], 12
+
+
+def test_init_vertical():
+    """ Test the observer initialization with an already aligned sensor
+    """
+    observer = martin.martin_ahrs()
+    quat = np.copy(observer.init_observer([0, 0, 9.81, 1, 0, 0, 0, 0, 0]))
+    yield assert_array_almost_equal, quat, [1, 0, 0, 0]
+    quat = observer.update([0, 0, 9.81, 1, 0, 0, 0, 0, 0], 0.005)
+    yield assert_array_almost_equal, nq.norm(quat), 1
+
+
 if __name__ == '__main__':
     test_martin_ahrs()
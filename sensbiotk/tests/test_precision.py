@@ -0,0 +1,131 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for the float32 mode of the sensors pipelines
+"""
+
+import numpy as np
+from sensbiotk import precision
+from sensbiotk.io import iofox as fox
+from sensbiotk.io import cache
+from sensbiotk.calib import calib
+from sensbiotk.algorithms import basic as algo
+from sensbiotk.algorithms import madgwick_ahrs, mahony_ahrs
+from sensbiotk.tests.ahrs_record import calibrated_record
+from numpy.testing import assert_array_almost_equal
+
+from nose.tools import assert_equal, assert_raises
+
+# pylint:disable= I0011, E1101
+# E1101 no-member false positif
+
+CALIB = "data/test_madgwick_ahrs/CalibrationFileIMU6.txt"
+DATA = "data/test_madgwick_ahrs/1_IMU6_RIGHT_FOOT.csv"
+
+
+def test_policy():
+    """ Test the package dtype setting
+    """
+    yield assert_equal, precision.get_dtype(), np.float64
+    yield assert_equal, precision.get_dtype(np.float32), np.float32
+    with precision.float_dtype(np.float32):
+        yield assert_equal, precision.get_dtype(), np.float32
+        yield assert_equal, precision.get_dtype("float64"), np.float64
+    yield assert_equal, precision.get_dtype(), np.float64
+    yield assert_raises, ValueError, precision.get_dtype, np.int16
+
+
+def test_loaders():
+    """ Test the loaders in float32
+    """
+    with precision.float_dtype(np.float32):
+        [time, acc] = fox.load_foxacc_csvfile("data/imutest_acc.csv")
+        sensors = fox.load_sensors_rawfile("data/gpiotest.raw")
+        imu = fox.load_foximu_csvfile("data/imutest_acc.csv",
+                                      "data/imutest_mag.csv",
+                                      "data/imutest_gyr.csv", 0.01,
+                                      use_cache=False)
+        [_, imus] = fox.load_multi_imu(["data/imutest.raw"], 0.01,
+                                       workers=1)
+    yield assert_equal, time.dtype, np.float64
+    yield assert_equal, acc.dtype, np.float32
+    yield assert_array_almost_equal, acc, \
+        fox.load_foxacc_csvfile("data/imutest_acc.csv")[1], 5
+    for name in ['acc', 'mag', 'gyr']:
+        yield assert_equal, sensors[name][0].dtype, np.float64
+        yield assert_equal, sensors[name][1].dtype, np.float32
+    yield assert_equal, imu[0].dtype, np.float64
+    for values in imu[1:]:
+        yield assert_equal, values.dtype, np.float32
+    yield assert_equal, imus.dtype, np.float32
+
+
+def test_cache_dtype():
+    """ Test the cache entries of each dtype
+    """
+    config = dict(cache.CACHE)
+    cache.set_cache(True, "tmpdata/cache_precision", 1 << 30)
+    cache.clear()
+    data = fox.load_foxcsvfile(DATA)
+    with precision.float_dtype(np.float32):
+        data32 = fox.load_foxcsvfile(DATA)
+        data32_cached = fox.load_foxcsvfile(DATA)
+    yield assert_equal, data[1].dtype, np.float64
+    yield assert_equal, data32[1].dtype, np.float32
+    yield assert_equal, data32_cached[1].dtype, np.float32
+    cache.clear()
+    cache.CACHE.update(config)
+
+
+def test_basic():
+    """ Test the basic filters in float32
+    """
+    sig = np.sin(np.linspace(0, 20, 1000))
+    for filt in [lambda sig, dtype: algo.lowpass_filter(sig, 5.0, 100.0,
+                                                          dtype),
+                 lambda sig, dtype: algo.moving_average(sig, 5, dtype),
+                 lambda sig, dtype: algo.moving_average2(sig, 5, dtype)]:
+        sig32 = filt(sig, np.float32)
+        yield assert_equal, sig32.dtype, np.float32
+        yield assert_array_almost_equal, sig32, filt(sig, None), 5
+
+
+def test_ahrs():
+    """ Test the AHRS accuracy in float32
+    """
+    # Calibration apply as in test_madgwick_ahrs
+    params = calib.load_param(CALIB)
+    data = fox.load_foxcsvfile(DATA, use_cache=False)
+    acc = np.column_stack(data[1:4])
+    ref = np.array([np.dot(params[0][1:4], val - params[0][0])
+                    for val in acc])
+    yield assert_array_almost_equal, calib.apply_param(acc, params[0]), \
+        ref, 12
+
+    z64 = calibrated_record(np.float64)
+    z32 = calibrated_record(np.float32)
+    yield assert_equal, z32.dtype, np.float32
+    for ahrs in [madgwick_ahrs, mahony_ahrs]:
+        quats = []
+        for [z, dtype] in [[z64, np.float64], [z32, np.float32]]:
+            quat = np.zeros((1000, 4), dtype=dtype)
+            quat[0] = [1, 0, 0, 0]
+            for i in range(len(quat) - 1):
+                quat[i + 1] = ahrs.update(quat[i], z[i])
+            quats.append(quat)
+        yield assert_array_almost_equal, quats[0], quats[1], 4
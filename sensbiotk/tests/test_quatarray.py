@@ -0,0 +1,78 @@
+''' Test the quaternion time series container '''
+
+import numpy as np
+
+from nose.tools import assert_raises, assert_true, assert_equal
+
+from numpy.testing import assert_array_almost_equal
+
+from sensbiotk.transforms3d import quaternions as nq
+from sensbiotk.transforms3d import eulerangles as nea
+from sensbiotk.transforms3d.quatarray import QuaternionArray
+
+
+def _rotation_z(time, rate):
+    ''' Quaternions of a rotation around z at a constant rate '''
+    angle = rate * np.asarray(time)
+    return np.column_stack([np.cos(angle / 2), np.zeros(len(angle)),
+                            np.zeros(len(angle)), np.sin(angle / 2)])
+
+
+def test_container():
+    quat = np.random.RandomState(0).randn(10, 4)
+    qarr = QuaternionArray(quat, np.arange(10) * 0.1)
+    # no copy of the buffer, views for slices
+    yield assert_true, np.may_share_memory(np.asarray(qarr), quat)
+    yield assert_true, np.may_share_memory(qarr[2:8].quat, quat)
+    yield assert_true, np.may_share_memory(qarr[2:8].time, qarr.time)
+    yield assert_equal, len(qarr[2:8]), 6
+    yield assert_array_almost_equal, qarr[3], quat[3]
+    yield assert_equal, QuaternionArray([1, 0, 0, 0]).quat.shape, (1, 4)
+    yield assert_equal, QuaternionArray(quat, dtype=np.float32).quat.dtype, \
+        np.float32
+    yield assert_raises, ValueError, QuaternionArray, quat, np.arange(5)
+
+
+def test_operators():
+    quat = np.random.RandomState(0).randn(10, 4)
+    quat2 = np.random.RandomState(1).randn(10, 4)
+    qarr = QuaternionArray(quat)
+    yield assert_array_almost_equal, (qarr * quat2).quat, \
+        [nq.mult(q1, q2) for q1, q2 in zip(quat, quat2)]
+    yield assert_array_almost_equal, (quat2[0] * qarr).quat, \
+        [nq.mult(quat2[0], q) for q in quat]
+    yield assert_array_almost_equal, qarr.conjugate().quat, \
+        [nq.conjugate(q) for q in quat]
+    yield assert_array_almost_equal, qarr.inverse().quat, \
+        [nq.inverse(q) for q in quat]
+    yield assert_array_almost_equal, qarr.norm(), [nq.norm(q) for q in quat]
+    yield assert_array_almost_equal, qarr.normalize().norm(), np.ones(10)
+    yield assert_array_almost_equal, \
+        qarr.relative(QuaternionArray(quat2)).quat, \
+        [nq.mult(nq.conjugate(q1), q2) for q1, q2 in zip(quat, quat2)]
+    quat = qarr.normalize().quat
+    yield assert_array_almost_equal, qarr.normalize().rotate(quat2[:, 1:]), \
+        [nq.rotate_vector(v, q) for v, q in zip(quat2[:, 1:], quat)]
+    yield assert_array_almost_equal, qarr.to_euler(), \
+        [nea.quat2euler(q) for q in quat]
+
+
+def test_resampling():
+    # rotation around z at 0.5 rad/s, with sign changes between samples
+    time = np.arange(0, 4, 0.1)
+    quat = _rotation_z(time, 0.5)
+    quat[1::2] *= -1
+    qarr = QuaternionArray(quat, time)
+    time_new = np.arange(0, 3.9, 0.03)
+    for qarr_new in [qarr.slerp(time_new), qarr.squad(time_new)]:
+        quat_new = qarr_new.quat * np.sign(qarr_new.quat[:, 0:1])
+        yield assert_array_almost_equal, quat_new, _rotation_z(time_new, 0.5)
+        yield assert_array_almost_equal, qarr_new.time, time_new
+    # squad goes through the samples of any rotation
+    quat = nq.normalize_array(np.random.RandomState(0).randn(len(time), 4))
+    qarr_new = QuaternionArray(quat, time).squad(time)
+    yield assert_array_almost_equal, \
+        qarr_new.quat * np.sign(qarr_new.quat[:, 0:1] * quat[:, 0:1]), quat
+    yield assert_array_almost_equal, qarr.angular_velocity(), \
+        np.tile([0, 0, 0.5], (len(time) - 1, 1))
+    yield assert_raises, ValueError, qarr[0:1].slerp, time_new
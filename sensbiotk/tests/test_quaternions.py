@@ -149,6 +149,38 @@ def test_qrotate():
             yield assert_array_almost_equal, vdash, vM
 
 
+def test_array():
+    # Arrays of quaternions against one quaternion at a time
+    quats = np.array(eg_quats) * 2
+    other = np.roll(quats, 1, 0)
+    vecs = np.random.RandomState(0).randn(len(quats), 3)
+    yield assert_array_almost_equal, nq.mult_array(quats, other), \
+        [nq.mult(q1, q2) for q1, q2 in zip(quats, other)]
+    yield assert_array_almost_equal, nq.mult_array(quats[0], other), \
+        [nq.mult(quats[0], q2) for q2 in other]
+    for func, func_array in [(nq.conjugate, nq.conjugate_array),
+                             (nq.norm, nq.norm_array),
+                             (nq.normalize, nq.normalize_array),
+                             (nq.inverse, nq.inverse_array),
+                             (nq.quat2mat, nq.quat2mat_array)]:
+        yield assert_array_almost_equal, func_array(quats), \
+            [func(q) for q in quats]
+    yield assert_array_almost_equal, nq.rotate_vector_array(vecs, quats), \
+        [nq.rotate_vector(v, q) for v, q in zip(vecs, quats)]
+    yield assert_array_almost_equal, \
+        nq.rotate_vector_array(vecs[0], quats), \
+        [nq.rotate_vector(vecs[0], q) for q in quats]
+    # leading dimensions
+    quats = quats[:24].reshape(2, 3, 4, 4)
+    yield assert_equal, nq.quat2mat_array(quats).shape, (2, 3, 4, 3, 3)
+    yield assert_array_almost_equal, \
+        nq.mult_array(quats, nq.inverse_array(quats)), \
+        np.tile([1, 0, 0, 0], (2, 3, 4, 1))
+    yield assert_array_almost_equal, \
+        nq.quat2mat_array([[0, 0, 0, 0], [0, 1, 0, 0]]), \
+        [np.eye(3), np.diag([1, -1, -1])]
+
+
 def test_quaternion_reconstruction():
     # Test reconstruction of arbitrary unit quaternions
     for q in unit_quats:
@@ -0,0 +1,72 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2014  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for rawreader module
+"""
+
+# pylint:disable= I0011, E1101, E0611
+# E1101 no-member false positif
+# E0611 no-name false positif
+
+import os
+import shutil
+import numpy as np
+from sensbiotk.io import iofox as fox
+from sensbiotk.io.rawreader import FoxRawReader, INDEX_SUFFIX
+from numpy.testing import assert_array_equal
+
+from nose.tools import assert_equal
+
+
+def test_read():
+    """ Test FoxRawReader read function
+    """
+    sensors = fox.load_sensors_rawfile("data/gpiotest.raw")
+    reader = FoxRawReader("data/gpiotest.raw", index_step=100,
+                          sidecar=False)
+    [tmin, tmax] = reader.time_range()
+    for [time0, timef] in [[tmin, tmax], [tmin + 3.3, tmin + 9.1],
+                           [tmax - 2.0, tmax + 1.0]]:
+        window = reader.read(time0, timef)
+        yield assert_equal, sorted(window.keys()), sorted(sensors.keys())
+        for name in sensors:
+            time = sensors[name][0][:, 0]
+            mask = (time >= time0) & (time <= timef)
+            for [val, val_window] in zip(sensors[name], window[name]):
+                yield assert_array_equal, val[mask], val_window
+
+    window = reader.read(tmin + 3.3, tmin + 9.1, sensors=('acc', 'gyr'))
+    yield assert_equal, sorted(window.keys()), ['acc', 'gyr']
+    window = reader.read(tmax + 1.0, tmax + 2.0)
+    yield assert_equal, window, {}
+    reader.close()
+
+
+def test_index():
+    """ Test FoxRawReader index sidecar file
+    """
+    shutil.copy("data/imutest.raw", "tmpdata/imutest.raw")
+    if os.path.isfile("tmpdata/imutest.raw" + INDEX_SUFFIX):
+        os.remove("tmpdata/imutest.raw" + INDEX_SUFFIX)
+    with FoxRawReader("tmpdata/imutest.raw", index_step=50) as reader:
+        index = reader.index
+    yield assert_equal, os.path.isfile("tmpdata/imutest.raw" +
+                                       INDEX_SUFFIX), True
+    with FoxRawReader("tmpdata/imutest.raw", index_step=50) as reader:
+        for field in index:
+            yield assert_array_equal, reader.index[field], index[field]
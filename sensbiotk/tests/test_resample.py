@@ -0,0 +1,75 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for resample module
+"""
+
+# pylint:disable= I0011, E1101, E0611
+# E1101 no-member false positif
+# E0611 no-name false positif
+
+import numpy as np
+from sensbiotk.algorithms import resample
+from numpy.testing import assert_array_almost_equal
+
+from nose.tools import assert_equal
+
+
+def test_interpolation():
+    """ Test linear and cubic resampling
+    """
+    time = np.cumsum(0.005 + 0.001 * np.random.rand(1000))
+    values = np.column_stack([2 * time - 1, 3 * time, -time])
+    time_new = np.arange(time[0], time[-1], 0.01)
+    resp = resample.resample(time, values, time_new)
+    yield assert_array_almost_equal, resp, \
+        np.column_stack([2 * time_new - 1, 3 * time_new, -time_new])
+
+    # cubic is exact for a quadratic signal on a regular grid
+    time = np.arange(0, 10, 0.005)
+    time_new = np.arange(0, 9.99, 0.0123)
+    resp = resample.resample(time, time ** 2, time_new, "cubic")
+    yield assert_array_almost_equal, resp, time_new ** 2
+    yield assert_equal, resp.shape, time_new.shape
+
+
+def test_polyphase():
+    """ Test anti-aliased resampling
+    """
+    time = np.arange(0, 20, 0.005)
+    values = np.column_stack([np.sin(2 * np.pi * time),
+                              np.sin(2 * np.pi * 90 * time)])
+    time_new = np.arange(1, 19, 0.02)
+    resp = resample.resample(time, values, time_new, "polyphase")
+    yield assert_array_almost_equal, resp[:, 0], \
+        np.sin(2 * np.pi * time_new), 2
+    # 90 Hz is above the new Nyquist frequency (25 Hz)
+    yield assert_equal, np.max(np.abs(resp[:, 1])) < 0.01, True
+
+
+def test_trim():
+    """ Test trim and common_window functions
+    """
+    time1 = np.arange(0, 10, 0.1)
+    time2 = np.arange(2, 12, 0.1)
+    [tmin, tmax] = resample.common_window([time1, time2])
+    yield assert_equal, [tmin, tmax], [time2[0], time1[-1]]
+    [time, values] = resample.trim(time1, time1, tmin, tmax, margin=0)
+    yield assert_equal, time[0] <= tmin and time[1] > tmin, True
+    yield assert_equal, time[-1] == time1[-1], True
+    yield assert_equal, len(values), len(time)
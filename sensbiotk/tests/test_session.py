@@ -0,0 +1,92 @@
+# -*- coding: utf-8; -*-
+# This file is a part of sensbiotk
+# Contact : sensbio@inria.fr
+# Copyright (C) 2015  INRIA (Contact: sensbiotk@inria.fr)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests Unit for session module
+"""
+
+# pylint:disable= I0011, E1101, E0611
+# E1101 no-member false positif
+# E0611 no-name false positif
+
+from sensbiotk.io import iofox as fox
+from sensbiotk.io import session
+from numpy.testing import assert_array_equal
+
+from nose.tools import assert_equal
+
+
+def test_save_load():
+    """ Test save_session, append_session and load_session functions
+    """
+    sensors = fox.load_sensors_rawfile("data/gpiotest.raw")
+    sensors['imu'] = fox.load_sensors_rawfile("data/gpiotest.raw", 0.01)
+    resp = session.save_session("tmpdata/gpiotest.session", sensors,
+                                {'imu_id': 4, 'fs': 100})
+    yield assert_equal, resp, "OK"
+
+    [loaded, metadata] = session.load_session("tmpdata/gpiotest.session")
+    yield assert_equal, metadata, {'imu_id': 4, 'fs': 100}
+    yield assert_equal, sorted(loaded.keys()), sorted(sensors.keys())
+    for name in sensors:
+        for [val, val_loaded] in zip(sensors[name], loaded[name]):
+            yield assert_equal, val.dtype, val_loaded.dtype
+            yield assert_array_equal, val, val_loaded
+
+    resp = session.append_session("tmpdata/gpiotest.session",
+                                  {'acc': sensors['acc']}, {'location': 'X'})
+    yield assert_equal, resp, "OK"
+    [loaded, metadata] = session.load_session("tmpdata/gpiotest.session")
+    yield assert_equal, metadata['location'], 'X'
+    yield assert_equal, len(loaded['acc'][0]), 2 * len(sensors['acc'][0])
+    yield assert_array_equal, loaded['gyr'][1], sensors['gyr'][1]
+
+
+def test_convert():
+    """ Test convert_rawfile_to_session function
+    """
+    sensors = fox.load_sensors_rawfile("data/gpiotest.raw")
+    resp = session.convert_rawfile_to_session("data/gpiotest.raw",
+                                              "tmpdata/gpiotest.session",
+                                              {'imu_id': 4}, 1000)
+    yield assert_equal, resp, "OK"
+    [loaded, metadata] = session.load_session("tmpdata/gpiotest.session")
+    yield assert_equal, metadata['imu_id'], 4
+    yield assert_equal, metadata['version'] >= 4, True
+    for name in sensors:
+        for [val, val_loaded] in zip(sensors[name], loaded[name]):
+            yield assert_array_equal, val, val_loaded
+
+
+def test_follow():
+    """ Test follow_rawfile_to_session function on a growing RAW file
+    """
+    sensors = fox.load_sensors_rawfile("data/gpiotest.raw")
+    with open("data/gpiotest.raw", "rb") as fid:
+        raw = fid.read()
+    state = None
+    for end in [10, 2001, 30002, len(raw)]:
+        with open("tmpdata/follow_session.raw", "wb") as fid:
+            fid.write(raw[:end])
+        state = session.follow_rawfile_to_session("tmpdata/follow_session.raw",
+                                                  "tmpdata/follow.session",
+                                                  state, {'imu_id': 4}, 1000)
+    [loaded, metadata] = session.load_session("tmpdata/follow.session")
+    yield assert_equal, metadata['imu_id'], 4
+    for name in sensors:
+        for [val, val_loaded] in zip(sensors[name], loaded[name]):
+            yield assert_array_equal, val, val_loaded
@@ -526,6 +526,296 @@ def quat2euler5(q):
          
     return [yaw, pitch, roll]     
 
+def _angles(angles):
+    ''' First, second and third angles along the last axis '''
+    angles = np.asarray(angles, dtype=float)
+    return angles[..., 0], angles[..., 1], angles[..., 2]
+
+
+def _stack(columns):
+    ''' Array of the columns along the last axis '''
+    columns = np.broadcast_arrays(*columns)
+    out = np.empty(columns[0].shape + (len(columns),))
+    for index, column in enumerate(columns):
+        out[..., index] = column
+    return out
+
+
+def unwrap_angles(angles):
+    ''' Continuous angles, without the 2 pi jumps between samples
+
+    Parameters
+    ----------
+    angles : (N, 3) or (..., N, 3) array
+       angles of N successive samples in radians, a single (3,)
+       sample is returned unchanged
+
+    Returns
+    -------
+    angles : array
+       unwrapped angles, the first sample is unchanged
+    '''
+    if np.ndim(angles) < 2:
+        return angles
+    return np.unwrap(angles, axis=-2)
+
+
+def euler2mat_array(angles):
+    ''' Rotation matrices of an array of Euler angles, see euler2mat
+
+    Parameters
+    ----------
+    angles : (..., 3) array-like
+       z, y, x rotation angles in radians
+
+    Returns
+    -------
+    M : (..., 3, 3) array
+    '''
+    z, y, x = _angles(angles)
+    cz, sz = np.cos(z), np.sin(z)
+    cy, sy = np.cos(y), np.sin(y)
+    cx, sx = np.cos(x), np.sin(x)
+    M = np.empty(z.shape + (3, 3))
+    M[..., 0, 0] = cy*cz
+    M[..., 0, 1] = -cy*sz
+    M[..., 0, 2] = sy
+    M[..., 1, 0] = cx*sz + cz*sx*sy
+    M[..., 1, 1] = cx*cz - sx*sy*sz
+    M[..., 1, 2] = -cy*sx
+    M[..., 2, 0] = sx*sz - cx*cz*sy
+    M[..., 2, 1] = cz*sx + cx*sy*sz
+    M[..., 2, 2] = cx*cy
+    return M
+
+
+def mat2euler_array(M, cy_thresh=None, unwrap=False):
+    ''' Euler angles of an array of rotation matrices, see mat2euler
+
+    The matrices with cos(y) close to zero are selected by a mask.
+
+    Parameters
+    ----------
+    M : (..., 3, 3) array-like
+    cy_thresh : None or scalar, optional
+       threshold below which to give up on straightforward arctan for
+       estimating x rotation, see mat2euler
+    unwrap : bool, optional
+       unwrap the angles along the samples axis (see unwrap_angles)
+
+    Returns
+    -------
+    angles : (..., 3) array
+       z, y, x rotation angles in radians
+    '''
+    M = np.asarray(M)
+    if cy_thresh is None:
+        try:
+            cy_thresh = np.finfo(M.dtype).eps * 4
+        except ValueError:
+            cy_thresh = _FLOAT_EPS_4
+    [r11, r12, r13] = [M[..., 0, 0], M[..., 0, 1], M[..., 0, 2]]
+    [r21, r22, r23] = [M[..., 1, 0], M[..., 1, 1], M[..., 1, 2]]
+    r33 = M[..., 2, 2]
+    cy = np.sqrt(r33*r33 + r23*r23)
+    # cos(y) (close to) zero: x -> 0.0, r21 -> sin(z), r22 -> cos(z)
+    standard = cy > cy_thresh
+    z = np.where(standard, np.arctan2(-r12, r11), np.arctan2(r21, r22))
+    y = np.arctan2(r13, cy)
+    x = np.where(standard, np.arctan2(-r23, r33), 0.0)
+    angles = _stack([z, y, x])
+    return unwrap_angles(angles) if unwrap else angles
+
+
+def euler2quat_array(angles):
+    ''' Quaternions of an array of Euler angles, see euler2quat
+
+    Parameters
+    ----------
+    angles : (..., 3) array-like
+       z, y, x rotation angles in radians
+
+    Returns
+    -------
+    quat : (..., 4) array
+       Quaternions in w, x, y z (real, then vector) format
+    '''
+    z, y, x = _angles(angles)
+    cz, sz = np.cos(z/2.0), np.sin(z/2.0)
+    cy, sy = np.cos(y/2.0), np.sin(y/2.0)
+    cx, sx = np.cos(x/2.0), np.sin(x/2.0)
+    return _stack([cx*cy*cz - sx*sy*sz,
+                   cx*sy*sz + cy*cz*sx,
+                   cx*cz*sy - sx*cy*sz,
+                   cx*cy*sz + sx*cz*sy])
+
+
+def euler2quat2_array(angles):
+    ''' Quaternions of an array of Euler angles, see euler2quat2
+
+    Parameters
+    ----------
+    angles : (..., 3) array-like
+       yaw, pitch, roll angles in radians
+
+    Returns
+    -------
+    quat : (..., 4) array
+       Quaternions in w, x, y z (real, then vector) format
+    '''
+    yaw, pitch, roll = _angles(angles)
+    c1, s1 = np.cos(yaw / 2), np.sin(yaw / 2)
+    c2, s2 = np.cos(pitch / 2), np.sin(pitch / 2)
+    c3, s3 = np.cos(roll / 2), np.sin(roll / 2)
+    c1c2 = c1 * c2
+    s1s2 = s1 * s2
+    return _stack([c1c2 * c3 - s1s2 * s3,
+                   c1c2 * s3 + s1s2 * c3,
+                   s1 * c2 * c3 + c1 * s2 * s3,
+                   c1 * s2 * c3 - s1 * c2 * s3])
+
+
+def quat2euler_array(q, unwrap=False):
+    ''' Euler angles of an array of quaternions, see quat2euler
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+       w, x, y, z of quaternions
+    unwrap : bool, optional
+       unwrap the angles along the samples axis (see unwrap_angles)
+
+    Returns
+    -------
+    angles : (..., 3) array
+       z, y, x rotation angles in radians
+    '''
+    # delayed import to avoid cyclic dependencies
+    import sensbiotk.transforms3d.quaternions as nq
+    return mat2euler_array(nq.quat2mat_array(q), unwrap=unwrap)
+
+
+def quat2euler2_array(q, unwrap=False):
+    ''' Euler angles of an array of quaternions, see quat2euler2
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+       w, x, y, z of quaternions
+    unwrap : bool, optional
+       unwrap the angles along the samples axis (see unwrap_angles)
+
+    Returns
+    -------
+    angles : (..., 3) array
+       yaw, pitch, roll angles in radians
+    '''
+    # delayed import to avoid cyclic dependencies
+    import sensbiotk.transforms3d.quaternions as nq
+    q0, q1, q2, q3 = nq._components(np.asarray(q, dtype=float))
+    angles = _stack([
+        np.arctan2(2 * (q0 * q1 + q2 * q3), 1 - 2 * (q1 * q1 + q2 * q2)),
+        np.arcsin(2 * (q0 * q2 - q3 * q1)),
+        np.arctan2(2 * (q0 * q3 + q1 * q2), 1 - 2 * (q2 * q2 + q3 * q3))])
+    return unwrap_angles(angles) if unwrap else angles
+
+
+def quat2euler3_array(q, unwrap=False):
+    ''' Euler angles of an array of quaternions, see quat2euler3
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+       w, x, y, z of quaternions
+    unwrap : bool, optional
+       unwrap the angles along the samples axis (see unwrap_angles)
+
+    Returns
+    -------
+    angles : (..., 3) array
+       yaw, pitch, roll angles in radians
+    '''
+    # delayed import to avoid cyclic dependencies
+    import sensbiotk.transforms3d.quaternions as nq
+    q0, q1, q2, q3 = nq._components(np.asarray(q, dtype=float))
+    angles = _stack([
+        np.arctan2(q0 * q2 - q1 * q3, q1 * q2 + q0 * q3),
+        np.cos(-q0 * q0 - q1 * q1 + q2 * q2 + q3 * q3),
+        np.arctan2(q0 * q2 + q1 * q3, -(q1 * q2 - q0 * q3))])
+    return unwrap_angles(angles) if unwrap else angles
+
+
+def _quat2euler_poles(q, unit, yaw_den, roll_den):
+    ''' quat2euler4/5 angles, the singularities selected by masks '''
+    q0, q1, q2, q3 = q
+    test = q1*q2 + q3*q0
+    north = test > 0.499 * unit
+    south = test < -0.499 * unit
+    pole = north | south
+    yaw = np.where(pole, np.where(north, 2, -2) * np.arctan2(q1, q0),
+                   np.arctan2(2 * q2 * q0 - 2 * q1 * q3, yaw_den))
+    pitch = np.where(north, np.pi/2, np.where(
+        south, -np.pi/2, np.arcsin(np.clip(2 * test / unit, -1, 1))))
+    roll = np.where(pole, 0.0,
+                    np.arctan2(2 * q1 * q0 - 2 * q2 * q3, roll_den))
+    return _stack([yaw, pitch, roll])
+
+
+def quat2euler4_array(q, unwrap=False):
+    ''' Euler angles of an array of unit quaternions, see quat2euler4
+
+    The samples at the north and south singularities are selected by
+    masks.
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+       w, x, y, z of quaternions
+    unwrap : bool, optional
+       unwrap the angles along the samples axis (see unwrap_angles)
+
+    Returns
+    -------
+    angles : (..., 3) array
+       yaw, pitch, roll angles in radians
+    '''
+    # delayed import to avoid cyclic dependencies
+    import sensbiotk.transforms3d.quaternions as nq
+    q0, q1, q2, q3 = nq._components(np.asarray(q, dtype=float))
+    angles = _quat2euler_poles([q0, q1, q2, q3], 1.0,
+                               1 - 2 * q2 * q2 - 2 * q3 * q3,
+                               1 - 2 * q1 * q1 - 2 * q3 * q3)
+    return unwrap_angles(angles) if unwrap else angles
+
+
+def quat2euler5_array(q, unwrap=False):
+    ''' Euler angles of an array of quaternions, see quat2euler5
+
+    The samples at the north and south singularities are selected by
+    masks.
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+       w, x, y, z of quaternions, not necessarily normalised
+    unwrap : bool, optional
+       unwrap the angles along the samples axis (see unwrap_angles)
+
+    Returns
+    -------
+    angles : (..., 3) array
+       yaw, pitch, roll angles in radians
+    '''
+    # delayed import to avoid cyclic dependencies
+    import sensbiotk.transforms3d.quaternions as nq
+    q0, q1, q2, q3 = nq._components(np.asarray(q, dtype=float))
+    [sqw, sqx, sqy, sqz] = [q0 * q0, q1 * q1, q2 * q2, q3 * q3]
+    angles = _quat2euler_poles([q0, q1, q2, q3], sqx + sqy + sqz + sqw,
+                               sqx - sqy - sqz + sqw,
+                               -sqx + sqy - sqz + sqw)
+    return unwrap_angles(angles) if unwrap else angles
+
+
 def euler2angle_axis(z=0, y=0, x=0):
     ''' Return angle, axis corresponding to these Euler angles
 
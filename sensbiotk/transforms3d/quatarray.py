@@ -0,0 +1,271 @@
+''' Container of a quaternion time series
+
+A QuaternionArray holds N quaternions ``w, x, y, z`` in one contiguous
+(N, 4) float buffer and, optionally, their N sample times:
+
+>>> quat = QuaternionArray(madgwick_ahrs.run_batch(data), time)
+>>> quat_ref = quat[0:200]              # view, no copy
+>>> joint = quat_ref.conjugate() * quat  # vectorized products
+>>> quat_100 = quat.slerp(np.arange(time[0], time[-1], 0.01))
+>>> gyr = quat.angular_velocity()
+
+The container is accepted wherever an (N, 4) array is expected
+(``np.asarray(quat)`` returns the buffer itself), e.g. by
+sensbiotk.io.ahrs.save_ahrs_csvfile. The operations rely on the
+``*_array`` functions of sensbiotk.transforms3d.quaternions.
+'''
+
+import numpy as np
+
+from sensbiotk import precision
+from sensbiotk.algorithms import resample
+import sensbiotk.transforms3d.quaternions as nq
+import sensbiotk.transforms3d.eulerangles as nea
+
+# Below this sin(angle), slerp falls back to the linear interpolation
+SLERP_EPS = 1e-8
+
+
+def _slerp(q1, q2, h):
+    ''' Spherical linear interpolation of (N, 4) unit quaternions
+
+    `h` is the (N,) interpolation parameter, q2 is taken on the
+    hemisphere of q1 (shortest path).
+    '''
+    cosom = np.einsum('...i,...i', q1, q2)
+    q2 = np.where((cosom < 0)[..., np.newaxis], -q2, q2)
+    cosom = np.abs(cosom)
+    omega = np.arccos(np.minimum(cosom, 1.0))
+    sinom = np.sin(omega)
+    small = sinom < SLERP_EPS
+    sinom = np.where(small, 1.0, sinom)
+    w1 = np.where(small, 1.0 - h, np.sin((1.0 - h) * omega) / sinom)
+    w2 = np.where(small, h, np.sin(h * omega) / sinom)
+    return w1[..., np.newaxis] * q1 + w2[..., np.newaxis] * q2
+
+
+def _log(q):
+    ''' Vector part of the logarithm of (N, 4) unit quaternions '''
+    vnorm = np.sqrt(np.einsum('...i,...i', q[..., 1:], q[..., 1:]))
+    angle = np.arctan2(vnorm, q[..., 0])
+    scale = np.where(vnorm < SLERP_EPS, 1.0,
+                     angle / np.where(vnorm < SLERP_EPS, 1.0, vnorm))
+    return q[..., 1:] * scale[..., np.newaxis]
+
+
+def _exp(v):
+    ''' Unit quaternions exponential of (N, 3) vectors '''
+    angle = np.sqrt(np.einsum('...i,...i', v, v))
+    scale = np.where(angle < SLERP_EPS, 1.0,
+                     np.sin(angle) / np.where(angle < SLERP_EPS, 1.0, angle))
+    q = np.empty(v.shape[:-1] + (4,), dtype=v.dtype)
+    q[..., 0] = np.cos(angle)
+    q[..., 1:] = v * scale[..., np.newaxis]
+    return q
+
+
+def _continuous(q):
+    ''' (N, 4) quaternions with the sign changes between samples removed '''
+    dots = np.einsum('...i,...i', q[1:], q[:-1])
+    signs = np.cumprod(np.where(dots < 0, -1.0, 1.0))
+    return np.concatenate([q[0:1], q[1:] * signs[:, np.newaxis]])
+
+
+class QuaternionArray(object):
+    ''' Time series of N quaternions
+
+    Parameters
+    ----------
+    quat : (N, 4) or (4,) array-like or QuaternionArray
+       w, x, y, z of the quaternions, not copied if it is a
+       C-contiguous array of the requested dtype
+    time : (N,) array-like, optional
+       sample times in seconds, the sample indices if None
+    dtype : numpy dtype
+       dtype of the quaternions, None for the package dtype
+
+    Attributes
+    ----------
+    quat : (N, 4) numpy array
+    time : (N,) numpy array or None
+    '''
+    # numpy defers the operators with arrays (array * QuaternionArray)
+    __array_ufunc__ = None
+    __array_priority__ = 10.0
+
+    def __init__(self, quat, time=None, dtype=None):
+        if isinstance(quat, QuaternionArray):
+            if time is None:
+                time = quat.time
+            quat = quat.quat
+        quat = precision.asfloat(quat, dtype)
+        self.quat = np.ascontiguousarray(quat.reshape(-1, 4))
+        self.time = None if time is None \
+            else np.asarray(time, dtype=float).reshape(-1)
+        if self.time is not None and len(self.time) != len(self.quat):
+            raise ValueError("%d sample times for %d quaternions" %
+                             (len(self.time), len(self.quat)))
+
+    def _new(self, quat, time=None):
+        ''' QuaternionArray of the same dtype '''
+        return QuaternionArray(quat, time, self.quat.dtype)
+
+    def __len__(self):
+        return len(self.quat)
+
+    def __repr__(self):
+        return "QuaternionArray(%d quaternions, %s)" % (len(self),
+                                                        self.quat.dtype)
+
+    def __array__(self, dtype=None):
+        return self.quat if dtype is None else self.quat.astype(dtype)
+
+    def __getitem__(self, key):
+        ''' Quaternion i as a (4,) view, a QuaternionArray otherwise
+
+        Slices return views on the buffers, index arrays return copies.
+        '''
+        if isinstance(key, (int, np.integer)):
+            return self.quat[key]
+        time = None if self.time is None else self.time[key]
+        return self._new(self.quat[key], time)
+
+    def __mul__(self, other):
+        ''' Products self * other, other being broadcast against self '''
+        return self._new(nq.mult_array(self.quat, np.asarray(other)),
+                         self.time)
+
+    def __rmul__(self, other):
+        return self._new(nq.mult_array(np.asarray(other), self.quat),
+                         self.time)
+
+    @property
+    def times(self):
+        ''' Sample times, or sample indices without time vector '''
+        if self.time is None:
+            return np.arange(len(self), dtype=float)
+        return self.time
+
+    def copy(self):
+        ''' Copy of the quaternions and times '''
+        time = None if self.time is None else self.time.copy()
+        return self._new(self.quat.copy(), time)
+
+    def norm(self):
+        ''' (N,) squared norms of the quaternions '''
+        return nq.norm_array(self.quat)
+
+    def conjugate(self):
+        ''' Conjugated quaternions '''
+        return self._new(nq.conjugate_array(self.quat), self.time)
+
+    def inverse(self):
+        ''' Inverse quaternions '''
+        return self._new(nq.inverse_array(self.quat), self.time)
+
+    def normalize(self):
+        ''' Unit quaternions '''
+        return self._new(nq.normalize_array(self.quat), self.time)
+
+    def relative(self, other):
+        ''' Rotations from self to other, conj(self) * other
+
+        Parameters
+        ----------
+        other : QuaternionArray, (N, 4) or (4,) array-like
+           e.g. the attitude of a second segment or a reference attitude
+
+        Returns
+        -------
+        quat : QuaternionArray
+        '''
+        return self._new(nq.mult_array(nq.conjugate_array(self.quat),
+                                       np.asarray(other)), self.time)
+
+    def rotate(self, vectors):
+        ''' (N, 3) vectors rotated by the quaternions '''
+        return nq.rotate_vector_array(vectors, self.quat)
+
+    def to_mat(self):
+        ''' (N, 3, 3) rotation matrices '''
+        return nq.quat2mat_array(self.quat)
+
+    def to_euler(self, unwrap=False):
+        ''' (N, 3) z, y, x Euler angles, see eulerangles.quat2euler '''
+        return nea.quat2euler_array(self.quat, unwrap)
+
+    def angular_velocity(self):
+        ''' Angular velocities between consecutive samples
+
+        Returns
+        -------
+        gyr : (N - 1, 3) numpy array
+           angular velocities in rad/s (rad/sample without time
+           vector) expressed in the rotated frame, like a gyrometer
+        '''
+        dquat = nq.mult_array(nq.conjugate_array(self.quat[:-1]),
+                              self.quat[1:])
+        # shortest rotation
+        dquat *= np.where(dquat[:, 0:1] < 0, -1.0, 1.0)
+        dquat = nq.normalize_array(dquat)
+        dtime = np.diff(self.times)[:, np.newaxis]
+        return 2 * _log(dquat) / dtime
+
+    def slerp(self, time_new):
+        ''' Spherical linear interpolation at new sample times
+
+        Parameters
+        ----------
+        time_new : (M,) array-like
+           increasing sample times, clipped to the time window
+
+        Returns
+        -------
+        quat : QuaternionArray
+           M unit quaternions with the times time_new
+        '''
+        [time, quat, index, h] = self._resample_grid(time_new)
+        return self._new(_slerp(quat[index], quat[index + 1], h), time)
+
+    def squad(self, time_new):
+        ''' Spherical cubic (squad) interpolation at new sample times
+
+        The interpolation is smooth at the samples (continuous angular
+        velocity), unlike slerp.
+
+        Parameters
+        ----------
+        time_new : (M,) array-like
+           increasing sample times, clipped to the time window
+
+        Returns
+        -------
+        quat : QuaternionArray
+           M unit quaternions with the times time_new
+        '''
+        [time, quat, index, h] = self._resample_grid(time_new)
+        quat = _continuous(quat)
+        # Control points s_i = q_i exp(-(log(q_i* q_i+1) + log(q_i* q_i-1))/4)
+        # and s_i = q_i at both ends
+        qinv = nq.conjugate_array(quat[1:-1])
+        tangent = np.zeros((len(quat), 3), dtype=quat.dtype)
+        tangent[1:-1] = _log(nq.mult_array(qinv, quat[2:])) + \
+            _log(nq.mult_array(qinv, quat[:-2]))
+        ctrl = nq.mult_array(quat, _exp(-tangent / 4))
+        quat_new = _slerp(_slerp(quat[index], quat[index + 1], h),
+                          _slerp(ctrl[index], ctrl[index + 1], h),
+                          2 * h * (1 - h))
+        return self._new(quat_new, time)
+
+    def _resample_grid(self, time_new):
+        ''' New times, unit quaternions, intervals and positions '''
+        if len(self) < 2:
+            raise ValueError("At least 2 quaternions are needed")
+        time = self.times
+        time_new = np.asarray(time_new, dtype=float).reshape(-1)
+        index = resample.interval(time, time_new)
+        step = time[index + 1] - time[index]
+        step[step == 0] = 1.0
+        h = np.clip((time_new - time[index]) / step, 0.0, 1.0)
+        return [time_new, nq.normalize_array(self.quat), index,
+                h.astype(self.quat.dtype)]
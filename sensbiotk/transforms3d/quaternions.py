@@ -7,6 +7,13 @@ pair as a specification for rotation.
 Quaternions here consist of 4 values ``w, x, y, z``, where ``w`` is the
 real (scalar) part, and ``x, y, z`` are the complex (vector) part.
 
+The ``*_array`` functions operate on arrays of quaternions (and
+vectors) stored along the last axis, e.g. (N, 4) attitude records, and
+broadcast over the leading dimensions:
+
+>>> q12 = mult_array(q1, q2) # (N, 4) x (N, 4) or (4,) x (N, 4)
+>>> acc_earth = rotate_vector_array(acc, q) # (N, 3) by (N, 4)
+
 Note - rotation matrices here apply to column vectors, that is,
 they are applied on the left of the vector.  For example:
 
@@ -516,3 +523,142 @@ def quat2angle_axis(quat, identity_thresh=None):
         # if vec is nearly 0,0,0, this is an identity rotation
         return 0.0, np.array([1.0, 0, 0])
     return  2 * math.acos(w), vec / n
+
+
+def _components(q):
+    ''' w, x, y, z components of quaternions along the last axis '''
+    q = np.asarray(q)
+    return q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+
+
+def quat2mat_array(q):
+    ''' Rotation matrices of an array of quaternions, see quat2mat
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+
+    Returns
+    -------
+    M : (..., 3, 3) array
+      Rotation matrix of each quaternion, the identity for the
+      quaternions with a norm below FLOAT_EPS
+    '''
+    w, x, y, z = _components(q)
+    Nq = w*w + x*x + y*y + z*z
+    small = Nq < FLOAT_EPS
+    s = np.where(small, 0.0, 2.0/np.where(small, 1.0, Nq))
+    X = x*s
+    Y = y*s
+    Z = z*s
+    wX = w*X; wY = w*Y; wZ = w*Z
+    xX = x*X; xY = x*Y; xZ = x*Z
+    yY = y*Y; yZ = y*Z; zZ = z*Z
+    M = np.empty(np.shape(Nq) + (3, 3))
+    M[..., 0, 0] = 1.0-(yY+zZ); M[..., 0, 1] = xY-wZ; M[..., 0, 2] = xZ+wY
+    M[..., 1, 0] = xY+wZ; M[..., 1, 1] = 1.0-(xX+zZ); M[..., 1, 2] = yZ-wX
+    M[..., 2, 0] = xZ-wY; M[..., 2, 1] = yZ+wX; M[..., 2, 2] = 1.0-(xX+yY)
+    return M
+
+
+def mult_array(q1, q2):
+    ''' Multiply arrays of quaternions, see mult
+
+    Parameters
+    ----------
+    q1 : (..., 4) array-like
+    q2 : (..., 4) array-like
+
+    Returns
+    -------
+    q12 : (..., 4) array
+      broadcast products q1 * q2
+    '''
+    w1, x1, y1, z1 = _components(q1)
+    w2, x2, y2, z2 = _components(q2)
+    w = w1*w2 - x1*x2 - y1*y2 - z1*z2
+    q12 = np.empty(np.shape(w) + (4,), dtype=w.dtype)
+    q12[..., 0] = w
+    q12[..., 1] = w1*x2 + x1*w2 + y1*z2 - z1*y2
+    q12[..., 2] = w1*y2 + y1*w2 + z1*x2 - x1*z2
+    q12[..., 3] = w1*z2 + z1*w2 + x1*y2 - y1*x2
+    return q12
+
+
+def conjugate_array(q):
+    ''' Conjugates of an array of quaternions
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+
+    Returns
+    -------
+    conjq : (..., 4) array
+    '''
+    return np.asarray(q) * np.array([1.0, -1, -1, -1])
+
+
+def norm_array(q):
+    ''' Norms of an array of quaternions, see norm
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+
+    Returns
+    -------
+    n : (...) array
+    '''
+    q = np.asarray(q)
+    return np.einsum('...i,...i', q, q)
+
+
+def normalize_array(q):
+    ''' Normalized array of quaternions
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+
+    Returns
+    -------
+    n : (..., 4) array
+    '''
+    return q / np.sqrt(norm_array(q))[..., np.newaxis]
+
+
+def inverse_array(q):
+    ''' Multiplicative inverses of an array of quaternions
+
+    Parameters
+    ----------
+    q : (..., 4) array-like
+
+    Returns
+    -------
+    invq : (..., 4) array
+    '''
+    return conjugate_array(q) / norm_array(q)[..., np.newaxis]
+
+
+def rotate_vector_array(v, q):
+    ''' Apply the transformations of quaternions `q` to vectors `v`
+
+    Parameters
+    ----------
+    v : (..., 3) array-like
+       3 dimensional vectors
+    q : (..., 4) array-like
+       w, i, j, k of quaternions
+
+    Returns
+    -------
+    vdash : (..., 3) array
+       broadcast vectors `v` rotated by quaternions `q`, see
+       rotate_vector
+    '''
+    v = np.asarray(v)
+    varr = np.zeros(v.shape[:-1] + (4,), dtype=np.result_type(v, float))
+    varr[..., 1:] = v
+    return mult_array(q, mult_array(varr, conjugate_array(q)))[..., 1:]
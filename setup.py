@@ -86,6 +86,7 @@ def setup_package():
           url = URL,
           classifiers = CLASSIFIERS,
           platforms=PLATFORMS,
+          scripts=['bin/fox_convert_tree'],
           configuration=configuration
           )
 